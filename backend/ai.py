@@ -7,8 +7,9 @@ AI Module for Personality Analysis and Event Matching
 
 This module contains AI-powered functionality for:
 1. Analyzing personality test results
-2. Calculating match scores between users and events
-3. Calculating compatibility between users
+2. Calculating match scores between users and events (pairwise and in batches,
+   per user or per event)
+3. Calculating compatibility between users (pairwise and in batches)
 4. Recommending events based on personality traits
 5. Recommending connections for the Gathr Circle
 """
@@ -16,8 +17,12 @@ import numpy as np
 import pandas as pd
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import MinMaxScaler
+from sklearn.preprocessing import MinMaxScaler, normalize
+from scipy.sparse import csr_matrix
 
+from metrics import ai_timed
+
+@ai_timed
 def analyze_personality(answers):
     """
     Analyzes personality test answers to determine traits
@@ -48,6 +53,7 @@ def analyze_personality(answers):
     
     return top_traits
 
+@ai_timed
 def calculate_match_score(user_traits, event_categories):
     """
     Calculates compatibility score between user and event
@@ -98,6 +104,7 @@ def calculate_match_score(user_traits, event_categories):
     
     return match_score
 
+@ai_timed
 def calculate_user_compatibility(user1_traits, user2_traits):
     """
     Calculates compatibility score between two users
@@ -143,6 +150,214 @@ def calculate_user_compatibility(user1_traits, user2_traits):
     
     return compatibility_score
 
+def _mean_trait_vectors(vectorizer, trait_groups):
+    """
+    Builds one averaged word-count vector per group of traits
+    
+    Args:
+        vectorizer: Fitted CountVectorizer
+        trait_groups: List of non-empty trait lists
+    
+    Returns:
+        Dense matrix with one row per group
+    """
+    flat_traits = [trait for traits in trait_groups for trait in traits]
+    vectors = vectorizer.transform(flat_traits)
+    
+    # Sparse summing matrix: row i selects group i's traits
+    lengths = np.array([len(traits) for traits in trait_groups])
+    rows = np.repeat(np.arange(len(trait_groups)), lengths)
+    summing = csr_matrix(
+        (np.ones(len(flat_traits)), (rows, np.arange(len(flat_traits)))),
+        shape=(len(trait_groups), len(flat_traits))
+    )
+    
+    # Sum then divide, as np.mean does, so scores match the pairwise ones
+    return np.asarray((summing @ vectors).todense()) / lengths[:, None]
+
+def _cosine_to_first(vectors):
+    """
+    Cosine similarity of the first row against every other row
+    
+    Rows are normalized before the dot product, as cosine_similarity
+    does, so truncated scores agree with the pairwise calculation.
+    Similarities involving a zero vector are 0.
+    
+    Args:
+        vectors: Dense matrix with at least one row
+    
+    Returns:
+        Array of similarities, one per row after the first
+    """
+    unit = normalize(vectors)
+    return unit[1:] @ unit[0]
+
+@ai_timed
+def batch_user_compatibility(user_traits, other_traits_list):
+    """
+    Calculates compatibility between one user and many others in one pass
+    
+    Produces the same scores as calling calculate_user_compatibility
+    for every pair (barring float rounding on exact integer boundaries),
+    but fits a single vectorizer and scores all pairs with matrix
+    operations.
+    
+    Args:
+        user_traits: List of personality traits of the user
+        other_traits_list: List of trait lists, one per other user
+    
+    Returns:
+        List of compatibility scores (0-100), aligned with other_traits_list
+    """
+    scores = np.full(len(other_traits_list), 50, dtype=int)
+    if not user_traits:
+        return scores.tolist()
+    
+    # Only users with personality data get a calculated score
+    scored = [i for i, traits in enumerate(other_traits_list) if traits]
+    if not scored:
+        return scores.tolist()
+    others = [list(other_traits_list[i]) for i in scored]
+    user_traits = list(user_traits)
+    
+    # Direct trait matches via exact-trait membership
+    own_traits = set(user_traits)
+    common_counts = np.array([len(own_traits.intersection(traits)) for traits in others])
+    max_lengths = np.maximum(len(user_traits), np.array([len(traits) for traits in others]))
+    direct_scores = common_counts / max_lengths * 100
+    
+    try:
+        vectorizer = CountVectorizer()
+        vectorizer.fit(user_traits + [trait for traits in others for trait in traits])
+        
+        vectors = _mean_trait_vectors(vectorizer, [user_traits] + others)
+        norms = np.linalg.norm(vectors, axis=1)
+        
+        # Cosine similarity of the user against every other user at once
+        similarity_scores = _cosine_to_first(vectors) * 100
+        
+        final_scores = (direct_scores * 0.7) + (similarity_scores * 0.3)
+        
+        # Pairs without any vocabulary fall back to direct matches, as in
+        # the pairwise calculation
+        no_vocabulary = (norms[0] == 0) & (norms[1:] == 0)
+        final_scores = np.where(no_vocabulary, direct_scores, final_scores)
+    except ValueError:
+        # Fallback if vectorization fails
+        final_scores = direct_scores
+    
+    scores[scored] = np.clip(final_scores.astype(int), 0, 100)
+    return scores.tolist()
+
+@ai_timed
+def batch_match_scores(user_traits, event_categories_list):
+    """
+    Calculates match scores between one user and many events in one pass
+    
+    Produces the same scores as calling calculate_match_score for every
+    event (barring float rounding on exact integer boundaries), but fits
+    a single vectorizer and scores all events with matrix operations.
+    
+    Args:
+        user_traits: List of personality traits of the user
+        event_categories_list: List of category lists, one per event
+    
+    Returns:
+        List of match scores (0-100), aligned with event_categories_list
+    """
+    scores = np.full(len(event_categories_list), 50, dtype=int)
+    if not user_traits:
+        return scores.tolist()
+    
+    # Only events with categories get a calculated score
+    scored = [i for i, categories in enumerate(event_categories_list) if categories]
+    if not scored:
+        return scores.tolist()
+    events = [list(event_categories_list[i]) for i in scored]
+    user_traits = list(user_traits)
+    
+    try:
+        vectorizer = CountVectorizer()
+        vectorizer.fit(user_traits + [category for categories in events for category in categories])
+    except ValueError:
+        # Fallback if vectorization fails
+        return scores.tolist()
+    
+    vectors = _mean_trait_vectors(vectorizer, [user_traits] + events)
+    norms = np.linalg.norm(vectors, axis=1)
+    
+    # Cosine similarity of the user against every event at once
+    similarities = _cosine_to_first(vectors)
+    event_scores = np.clip((similarities * 100).astype(int), 0, 100)
+    
+    # Pairs without any vocabulary keep the default score, as in the
+    # pairwise calculation
+    no_vocabulary = (norms[0] == 0) & (norms[1:] == 0)
+    scores[scored] = np.where(no_vocabulary, 50, event_scores)
+    return scores.tolist()
+
+@ai_timed
+def batch_event_match_scores(user_traits_list, event_categories):
+    """
+    Calculates match scores between many users and one event in one pass
+    
+    The counterpart of batch_match_scores for fanning one event out to
+    many users: produces the scores calculate_match_score would give for
+    every user (barring float rounding on exact integer boundaries).
+    
+    Args:
+        user_traits_list: List of trait lists, one per user
+        event_categories: List of categories/tags of the event
+    
+    Returns:
+        List of match scores (0-100), aligned with user_traits_list
+    """
+    scores = np.full(len(user_traits_list), 50, dtype=int)
+    if not event_categories:
+        return scores.tolist()
+    
+    # Only users with personality data get a calculated score
+    scored = [i for i, traits in enumerate(user_traits_list) if traits]
+    if not scored:
+        return scores.tolist()
+    users = [list(user_traits_list[i]) for i in scored]
+    event_categories = list(event_categories)
+    
+    try:
+        vectorizer = CountVectorizer()
+        vectorizer.fit(event_categories + [trait for traits in users for trait in traits])
+    except ValueError:
+        # Fallback if vectorization fails
+        return scores.tolist()
+    
+    vectors = _mean_trait_vectors(vectorizer, [event_categories] + users)
+    norms = np.linalg.norm(vectors, axis=1)
+    
+    # Cosine similarity of the event against every user at once
+    similarities = _cosine_to_first(vectors)
+    user_scores = np.clip((similarities * 100).astype(int), 0, 100)
+    
+    # Pairs without any vocabulary keep the default score
+    no_vocabulary = (norms[0] == 0) & (norms[1:] == 0)
+    scores[scored] = np.where(no_vocabulary, 50, user_scores)
+    return scores.tolist()
+
+def warm_up():
+    """
+    Runs every scoring path once
+    
+    Called before serving (and before forking workers) so the numeric
+    libraries are imported and initialized up front rather than on the
+    first request.
+    """
+    traits = ["social", "creative"]
+    calculate_match_score(traits, ["music"])
+    calculate_user_compatibility(traits, ["social"])
+    batch_match_scores(traits, [["music"], ["social"]])
+    batch_event_match_scores([traits, ["calm"]], ["music"])
+    batch_user_compatibility(traits, [["social"], ["calm"]])
+
+@ai_timed
 def recommend_events(user_traits, events, limit=10):
     """
     Recommends events for a user based on personality traits
@@ -172,6 +387,7 @@ def recommend_events(user_traits, events, limit=10):
     
     return recommended_event_ids
 
+@ai_timed
 def recommend_connections(user_traits, other_users, limit=10):
     """
     Recommends potential connections for a user based on personality traits
@@ -204,6 +420,23 @@ def recommend_connections(user_traits, other_users, limit=10):
     
     return recommended_user_ids
 
+def message_recipient_count(attendee_count, percentage=10, min_count=1):
+    """
+    Number of attendees that can be messaged out of attendee_count
+    
+    Args:
+        attendee_count: Number of attendees to choose from
+        percentage: Percentage of attendees that can be messaged (default 10%)
+        min_count: Minimum number of attendees to select
+    
+    Returns:
+        Number of attendees to select, at most attendee_count
+    """
+    if attendee_count <= 0:
+        return 0
+    return min(max(min_count, int(attendee_count * percentage / 100)), attendee_count)
+
+@ai_timed
 def select_message_recipients(attendees, percentage=10, min_count=1):
     """
     Selects a percentage of attendees that can be messaged
@@ -219,11 +452,7 @@ def select_message_recipients(attendees, percentage=10, min_count=1):
     if not attendees:
         return []
     
-    # Calculate number of attendees to select
-    count = max(min_count, int(len(attendees) * percentage / 100))
-    
-    # Limit to actual attendee count
-    count = min(count, len(attendees))
+    count = message_recipient_count(len(attendees), percentage, min_count)
     
     # Select random attendees
     selected_indices = np.random.choice(len(attendees), count, replace=False)
@@ -231,6 +460,7 @@ def select_message_recipients(attendees, percentage=10, min_count=1):
     # Return selected attendee IDs
     return [attendees[i].id for i in selected_indices]
 
+@ai_timed
 def process_event_feedback(event_id, user_ratings, content_ratings, enjoyment_factors):
     """
     Process feedback data for an event to improve future recommendations
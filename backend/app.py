@@ -8,26 +8,65 @@ This is the main entry point for the Gathr backend Flask API.
 It provides the endpoints for authentication, event management,
 personality analysis, social connections, and messaging.
 """
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.middleware.proxy_fix import ProxyFix
+from flask_jwt_extended import (
+    JWTManager, create_access_token, jwt_required, get_jwt_identity, decode_token, verify_jwt_in_request
+)
 from datetime import timedelta, datetime
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select, union_all, literal, exists, String
+from sqlalchemy.orm import aliased
 import os
 from flask_socketio import SocketIO, emit, join_room, leave_room
 import time
 import secrets
+import csv
 
 # Import modules
-from database import db_session, init_db, backup_to_json, restore_from_json
-from models import User, Event, Attendance, Connection, Message, Feedback
+from database import db_session, engine, init_db, backup_to_json, restore_from_json
+from models import (
+    User, Event, Attendance, Connection, Message, MessagingGrant, Feedback,
+    event_search_vector
+)
 from ai import (
     analyze_personality, 
     calculate_match_score, 
+    batch_match_scores,
     calculate_user_compatibility,
-    select_message_recipients
+    batch_user_compatibility
+)
+from passwords import hash_password, verify_password, HashingBusy
+from ratelimit import RateLimiter
+from pubsub import make_client_manager, make_room_registry
+from identity import get_current_user, get_current_profile, invalidate_profile, profile_cache
+from stats import StatsSnapshot, compute_admin_stats
+from search import NGramIndex, InvertedIndex
+from geo import apply_nearby_filter, encode_geohash, parse_coordinates, parse_near
+from event_filters import parse_event_filters, apply_event_filters
+from event_import import IMPORT_FORMATS, iter_csv, iter_ndjson, import_events
+from booking import (
+    reserve_seats,
+    bookable_user_ids,
+    parse_id,
+    parse_id_list,
+    join_waitlist,
+    leave_waitlist,
+    cancel_booking,
+    ALREADY_BOOKED,
+    EVENT_NOT_FOUND,
+    INSUFFICIENT_CAPACITY,
+    SEATS_AVAILABLE,
+    WAITLISTED
 )
+from export import EXPORT_FORMATS, export_response, user_row, event_row, feedback_row
+from messaging import top_up_messaging_grants
+from message_writer import MessageWriter
+from broadcast import RoomBroadcaster
+from event_push import push_new_event
+from presence import make_presence_tracker, PresenceBroadcaster
+import metrics
+import profiling
 
 # Create Flask application
 app = Flask(__name__)
@@ -40,11 +79,160 @@ app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=1)
 # Initialize JWT
 jwt = JWTManager(app)
 
+# Reverse proxies in front of the app whose X-Forwarded-For is trusted, so
+# per-IP throttling sees client addresses instead of the proxy's
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+if TRUSTED_PROXY_COUNT > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_COUNT, x_proto=TRUSTED_PROXY_COUNT)
+
+# Request latency, SQL statement counts and database time per request
+metrics.instrument_app(app)
+metrics.instrument_engine(engine)
+metrics.register_pool(engine)
+metrics.register_cache('profile', profile_cache)
+
+# Token required to scrape /api/metrics (unset leaves it open)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+def caller_is_admin():
+    """Whether the request carries a valid JWT of an admin user"""
+    try:
+        verify_jwt_in_request()
+    except Exception:
+        return False
+    user = get_current_user()
+    return bool(user and getattr(user, 'is_admin', False))
+
+# On-demand and sampled request profiling (see profiling.py)
+request_profiler = profiling.init_app(app, caller_is_admin)
+
+# Message queue fanning Socket.IO emits out across workers and nodes
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+client_manager = make_client_manager(SOCKETIO_MESSAGE_QUEUE)
+
 # Initialize Socket.IO for real-time communication
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(
+    app,
+    cors_allowed_origins="*",
+    **({'client_manager': client_manager} if client_manager else {})
+)
+
+# Room registry for active connections, shared across workers when a
+# presence store is configured
+PRESENCE_STORE_URL = os.environ.get('PRESENCE_STORE_URL', SOCKETIO_MESSAGE_QUEUE)
+active_rooms = make_room_registry(PRESENCE_STORE_URL)
+
+# Online status of users, with debounced announcements to their followers
+presence = make_presence_tracker(
+    PRESENCE_STORE_URL,
+    ttl=int(os.environ.get('PRESENCE_TTL_SECONDS', 90))
+)
+presence_broadcaster = PresenceBroadcaster(
+    presence,
+    debounce=float(os.environ.get('PRESENCE_DEBOUNCE_SECONDS', 5))
+)
+
+# Upper bound on user IDs in one presence query
+MAX_PRESENCE_QUERY = 5000
+
+# Authenticated user ID of each Socket.IO session on this worker
+socket_users = {}
+
+def broadcast_to_room(room, data):
+    """Send a chat message to everyone in a room"""
+    room_broadcaster.start(socketio)
+    room_broadcaster.publish(room, data)
+
+def acknowledge_messages(stored, rejected):
+    """
+    Tell senders which real-time messages were persisted
+    
+    Stored messages are only now relayed to their room, so recipients
+    never see a message that was rejected.
+    """
+    for message, message_id in stored:
+        socketio.emit('message_stored', {
+            'clientId': message['client_id'],
+            'id': message_id,
+            'sentAt': message['sent_at'].isoformat()
+        }, to=message['sid'])
+        broadcast_to_room(message['room'], {**message['payload'], 'id': message_id})
+    for message, error in rejected:
+        socketio.emit('message_rejected', {
+            'clientId': message['client_id'],
+            'error': error
+        }, to=message['sid'])
+
+# Write-behind persistence of real-time chat messages
+message_writer = MessageWriter(
+    batch_size=int(os.environ.get('CHAT_FLUSH_BATCH_SIZE', 100)),
+    flush_interval=int(os.environ.get('CHAT_FLUSH_INTERVAL_MS', 50)) / 1000,
+    max_pending=int(os.environ.get('CHAT_MAX_PENDING', 10000)),
+    on_flushed=acknowledge_messages
+)
+
+# Room chat broadcasts, skipping and eventually dropping slow clients.
+# Coalescing into batch frames is opt-in, since clients must handle
+# message_batch (0 emits each message)
+ROOM_COALESCE_WINDOW_MS = int(os.environ.get('ROOM_COALESCE_WINDOW_MS', 0))
+room_broadcaster = RoomBroadcaster(
+    window=ROOM_COALESCE_WINDOW_MS / 1000,
+    max_queued=int(os.environ.get('SOCKET_MAX_QUEUED_PACKETS', 256)),
+    max_dropped=int(os.environ.get('SOCKET_MAX_DROPPED_FRAMES', 50))
+)
+
+# Minimum match score for pushing a new event to an online user
+NEW_EVENT_MATCH_THRESHOLD = int(os.environ.get('NEW_EVENT_MATCH_THRESHOLD', 70))
+
+# Token bucket throttling chat messages per Socket.IO session
+socket_message_limiter = RateLimiter(
+    rate=float(os.environ.get('SOCKET_MESSAGE_RATE_PER_SECOND', 5)),
+    burst=int(os.environ.get('SOCKET_MESSAGE_BURST', 20))
+)
 
-# Room registry for active connections
-active_rooms = {}
+# Token buckets throttling authentication attempts
+auth_ip_limiter = RateLimiter(
+    rate=float(os.environ.get('AUTH_IP_RATE_PER_MINUTE', 30)) / 60,
+    burst=int(os.environ.get('AUTH_IP_BURST', 20))
+)
+login_email_limiter = RateLimiter(
+    rate=float(os.environ.get('LOGIN_EMAIL_RATE_PER_MINUTE', 10)) / 60,
+    burst=int(os.environ.get('LOGIN_EMAIL_BURST', 5))
+)
+
+# Upper bound on (event, user) pairs in one group booking
+MAX_GROUP_BOOKING_ITEMS = 100
+
+# In-process user search index for databases without pg_trgm
+user_search_index = NGramIndex()
+
+# In-process event full-text index for databases without tsvector search
+event_search_index = InvertedIndex()
+
+# Admin dashboard statistics, refreshed in the background
+admin_stats_snapshot = StatsSnapshot(
+    compute_admin_stats,
+    interval=int(os.environ.get('ADMIN_STATS_REFRESH_SECONDS', 60))
+)
+
+def escape_like(term):
+    """Escape LIKE wildcards so user input matches literally"""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def throttled_response(limiter, key):
+    """Build a 429 response telling the client when to retry"""
+    response = jsonify({"error": "Too many attempts, please retry later"})
+    response.headers['Retry-After'] = str(int(limiter.retry_after(key)) + 1)
+    return response, 429
+
+def event_attendee_count():
+    """Correlated attendee count for the Event row of the enclosing query"""
+    return (
+        select(func.count(Attendance.id))
+        .where(Attendance.event_id == Event.id)
+        .correlate(Event)
+        .scalar_subquery()
+    )
 
 # Initialize database
 @app.teardown_appcontext
@@ -54,33 +242,63 @@ def shutdown_session(exception=None):
 
 # Socket.IO event handlers
 @socketio.on('connect')
-def handle_connect():
-    """Handle client connection"""
+def handle_connect(auth=None):
+    """
+    Handle client connection
+    
+    Clients may authenticate with their access token, passed as
+    {"token": ...} in the connection auth payload or as a token query
+    parameter. Authenticated clients join their personal room (their
+    user ID) for targeted pushes and count towards presence. Anonymous connections are allowed but
+    cannot send persisted messages; an invalid token refuses the
+    connection.
+    """
+    token = (auth or {}).get('token') or request.args.get('token')
+    if token:
+        try:
+            user_id = int(decode_token(token)[app.config['JWT_IDENTITY_CLAIM']])
+        except Exception:
+            return False
+        socket_users[request.sid] = user_id
+        join_room(str(user_id))
+        active_rooms.join(request.sid, str(user_id))
+        
+        presence_broadcaster.start(socketio, lambda: set(socket_users.values()))
+        if presence.connect(user_id):
+            presence_broadcaster.changed(user_id)
     print(f"Client connected: {request.sid}")
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
     print(f"Client disconnected: {request.sid}")
-    # Remove user from any rooms they were in
-    for room_id, users in list(active_rooms.items()):
-        if request.sid in users:
-            users.remove(request.sid)
-            # Clean up empty rooms
-            if not users:
-                del active_rooms[room_id]
+    user_id = socket_users.pop(request.sid, None)
+    if user_id is not None and presence.disconnect(user_id):
+        presence_broadcaster.changed(user_id)
+    socket_message_limiter.reset(request.sid)
+    room_broadcaster.forget(request.sid)
+    # Remove user from the rooms they were in (empty rooms are dropped)
+    active_rooms.remove_sid(request.sid)
 
 @socketio.on('join')
 def handle_join(data):
-    """Handle client joining a room"""
+    """
+    Handle client joining a room
+    
+    Personal rooms (user IDs) are joined on connect and only by their
+    own user.
+    """
     room = data.get('room')
     if not room:
         return
+    if str(room).isdigit() and str(room) != str(socket_users.get(request.sid)):
+        return
     
     join_room(room)
-    if room not in active_rooms:
-        active_rooms[room] = []
-    active_rooms[room].append(request.sid)
+    if request.sid in socket_users:
+        presence.touch([socket_users[request.sid]])
+    if not active_rooms.join(request.sid, room):
+        return  # Already in the room
     
     print(f"Client {request.sid} joined room: {room}")
     emit('user_joined', {'user': request.sid}, room=room)
@@ -93,27 +311,124 @@ def handle_leave(data):
         return
     
     leave_room(room)
-    if room in active_rooms and request.sid in active_rooms[room]:
-        active_rooms[room].remove(request.sid)
-        # Clean up empty rooms
-        if not active_rooms[room]:
-            del active_rooms[room]
+    active_rooms.leave(request.sid, room)
     
     print(f"Client {request.sid} left room: {room}")
     emit('user_left', {'user': request.sid}, room=room)
 
 @socketio.on('message')
 def handle_message(data):
-    """Handle real-time messaging"""
+    """
+    Handle real-time messaging
+    
+    Senders must have joined the room, and messages are rate limited per
+    session. When coalescing is enabled (ROOM_COALESCE_WINDOW_MS),
+    messages arriving within one window are delivered to the room in a
+    single message_batch frame.
+    
+    Messages carrying a recipientId are direct messages: they are
+    persisted write-behind, after which the sender receives
+    message_stored (with the message ID) or message_rejected, echoing
+    the optional clientId it sent. Only stored messages are relayed to
+    the room, carrying their ID.
+    """
     room = data.get('room')
-    if not room or room not in active_rooms:
+    if not room:
+        return
+    if room not in active_rooms.rooms_of(request.sid):
+        emit('message_rejected', {'clientId': data.get('clientId'), 'error': 'Join the room first'})
+        return
+    
+    if not socket_message_limiter.allow(request.sid):
+        emit('message_rejected', {'clientId': data.get('clientId'), 'error': 'Too many messages, slow down'})
         return
     
     # Add server timestamp
     data['timestamp'] = time.time()
     
+    if data.get('recipientId') is not None:
+        client_id = data.get('clientId')
+        sender_id = socket_users.get(request.sid)
+        if sender_id is None:
+            emit('message_rejected', {'clientId': client_id, 'error': 'Authentication required'})
+            return
+        
+        try:
+            recipient_id = int(data['recipientId'])
+            event_id = int(data['eventId']) if data.get('eventId') is not None else None
+        except (TypeError, ValueError):
+            emit('message_rejected', {'clientId': client_id, 'error': 'Invalid recipient or event'})
+            return
+        
+        content = data.get('content')
+        if not content:
+            emit('message_rejected', {'clientId': client_id, 'error': 'Message content is required'})
+            return
+        
+        # Relayed to the room once stored (see acknowledge_messages)
+        data['senderId'] = sender_id
+        message_writer.start(socketio)
+        queued = message_writer.submit({
+            'sender_id': sender_id,
+            'recipient_id': recipient_id,
+            'content': content,
+            'event_id': event_id,
+            'sent_at': datetime.fromtimestamp(data['timestamp']),
+            'sid': request.sid,
+            'client_id': client_id,
+            'room': room,
+            'payload': data
+        })
+        if not queued:
+            emit('message_rejected', {'clientId': client_id, 'error': 'Server busy, please retry'})
+        return
+    
     # Broadcast message to the room
-    emit('message', data, room=room)
+    broadcast_to_room(room, data)
+
+@socketio.on('presence_query')
+def handle_presence_query(data):
+    """
+    Answer presence for many users with one presence_status event
+    
+    Only authenticated sessions may ask, and only about themselves and
+    members of their circle; other IDs are left out of the answer.
+    """
+    viewer_id = socket_users.get(request.sid)
+    if viewer_id is None:
+        emit('presence_status', {'statuses': [], 'error': 'Authentication required'})
+        return
+    try:
+        user_ids = [int(user_id) for user_id in (data or {}).get('userIds', [])][:MAX_PRESENCE_QUERY]
+    except (TypeError, ValueError):
+        return
+    emit('presence_status', {'statuses': presence_statuses(visible_presence_ids(viewer_id, user_ids))})
+
+def visible_presence_ids(viewer_id, user_ids):
+    """
+    Filters user IDs down to those whose presence the viewer may see
+    
+    Users can see their own presence and that of their circle, the same
+    people whose status changes are pushed to them.
+    """
+    viewer_id = int(viewer_id)
+    others = set(user_ids) - {viewer_id}
+    visible = {viewer_id} & set(user_ids)
+    if others:
+        visible |= set(db_session.execute(
+            select(Connection.connected_user_id).where(
+                Connection.user_id == viewer_id,
+                Connection.connected_user_id.in_(others)
+            )
+        ).scalars())
+    return [user_id for user_id in dict.fromkeys(user_ids) if user_id in visible]
+
+def presence_statuses(user_ids):
+    """Presence of many users as a list of {userId, online, lastSeen}"""
+    return [
+        {"userId": user_id, **status}
+        for user_id, status in presence.statuses(user_ids).items()
+    ]
 
 # Routes
 @app.route('/api/healthcheck', methods=['GET'])
@@ -121,6 +436,18 @@ def healthcheck():
     """Simple healthcheck endpoint to verify API is running"""
     return jsonify({"status": "ok", "message": "Gathr API is running"})
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Metrics of this worker in the Prometheus text format
+    
+    When METRICS_TOKEN is set, scrapers must send it as a bearer token.
+    """
+    if METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
 # Add a default root route to avoid 404 on "/"
 @app.route('/', methods=['GET'])
 def index():
@@ -141,7 +468,13 @@ def register():
     - JWT token for authentication
     - User data (id, name, email)
     """
-    data = request.json
+    data = request.get_json(silent=True) or {}
+    if not all(isinstance(data.get(field), str) and data[field] for field in ('name', 'email', 'password')):
+        return jsonify({"error": "Name, email and password are required"}), 400
+    
+    # Throttle registrations per client IP
+    if not auth_ip_limiter.allow(request.remote_addr):
+        return throttled_response(auth_ip_limiter, request.remote_addr)
     
     try:
         # Check if email already exists
@@ -152,13 +485,17 @@ def register():
         new_user = User(
             name=data['name'],
             email=data['email'],
-            password_hash=generate_password_hash(data['password'])
+            password_hash=hash_password(data['password'])
         )
         
         # Save to database
         db_session.add(new_user)
         db_session.commit()
         
+        # Keep the in-process search index current
+        if user_search_index.is_built:
+            user_search_index.add(new_user.id, new_user.name, new_user.email)
+        
         # Backup to JSON as fallback
         user_data = {
             "id": new_user.id,
@@ -170,7 +507,7 @@ def register():
         backup_to_json("users", user_data)
         
         # Create access token
-        access_token = create_access_token(identity=new_user.id)
+        access_token = create_access_token(identity=str(new_user.id))
         
         return jsonify({
             "token": access_token,
@@ -183,6 +520,9 @@ def register():
             }
         }), 201
     
+    except HashingBusy:
+        return jsonify({"error": "Server busy, please retry"}), 503
+    
     except Exception as e:
         print(f"Registration error: {str(e)}")
         return jsonify({"error": "Registration failed", "details": str(e)}), 500
@@ -200,7 +540,16 @@ def login():
     - JWT token for authentication
     - User data including personality test status
     """
-    data = request.json
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('email'), str) or not isinstance(data.get('password'), str):
+        return jsonify({"error": "Email and password are required"}), 400
+    
+    # Throttle attempts per client IP and per account
+    email_key = data['email'].lower()
+    if not auth_ip_limiter.allow(request.remote_addr):
+        return throttled_response(auth_ip_limiter, request.remote_addr)
+    if not login_email_limiter.allow(email_key):
+        return throttled_response(login_email_limiter, email_key)
     
     try:
         # Try to find the user in the database
@@ -209,11 +558,14 @@ def login():
         # If not found, check the JSON backup
         if not user:
             users = restore_from_json("users")
+            # The backup holds one user per registration record
+            if isinstance(users, dict):
+                users = [users]
             user_data = next((u for u in users if u["email"] == data['email']), None)
             
-            if user_data and check_password_hash(user_data["password_hash"], data['password']):
+            if user_data and verify_password(user_data["password_hash"], data['password']):
                 # Create access token
-                access_token = create_access_token(identity=user_data["id"])
+                access_token = create_access_token(identity=str(user_data["id"]))
                 
                 return jsonify({
                     "token": access_token,
@@ -227,11 +579,15 @@ def login():
                 }), 200
         
         # Check if user exists and password is correct
-        if not user or not check_password_hash(user.password_hash, data['password']):
+        if not user or not verify_password(user.password_hash, data['password']):
             return jsonify({"error": "Invalid email or password"}), 401
         
+        # Record activity for the admin active-user statistics
+        user.last_active = datetime.now()
+        db_session.commit()
+        
         # Create access token
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=str(user.id))
         
         return jsonify({
             "token": access_token,
@@ -244,6 +600,9 @@ def login():
             }
         }), 200
     
+    except HashingBusy:
+        return jsonify({"error": "Server busy, please retry"}), 503
+    
     except Exception as e:
         print(f"Login error: {str(e)}")
         return jsonify({"error": "Login failed", "details": str(e)}), 500
@@ -272,11 +631,12 @@ def submit_personality_test():
         personality_traits = analyze_personality(answers)
         
         # Update user in database
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         if user:
             user.personality_tags = personality_traits
             user.has_completed_personality_test = True
             db_session.commit()
+            invalidate_profile(user.id)
             
             # Backup to JSON
             user_data = {
@@ -311,69 +671,108 @@ def get_events():
     
     Query parameters:
     - page: Page number for pagination
-    - limit: Number of events per page
-    - category: Filter by category
+    - limit: Number of events per page (1-100)
+    - categories: Categories to filter by (repeated or comma separated;
+      "category" is accepted as an alias)
+    - categoryMatch: "any" (default) or "all" of the categories
+    - dateFrom: Only events on or after this ISO date/datetime
+    - dateTo: Only events before this ISO datetime (or on/before this date)
+    - hasSpots: Only events with free spots
+    - creatorId: Only events created by this user
+    - near: "lat,lng" center for a nearby search
+    - radius: Search radius in kilometers (default 10, used with near)
     
     Returns:
-    - List of events with match scores
+    - List of events with match scores (and distances for nearby searches)
     - Pagination metadata
     """
     current_user_id = get_jwt_identity()
     
     try:
-        user = User.query.get(current_user_id)
+        user = get_current_profile()
         
-        # Get pagination parameters
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 10))
-        category = request.args.get('category', None)
+        # Get pagination and filter parameters
+        near = request.args.get('near', None)
+        try:
+            page = max(int(request.args.get('page', 1)), 1)
+            limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+        except ValueError:
+            return jsonify({"error": "page and limit must be integers"}), 400
+        try:
+            filters = parse_event_filters(request.args)
+            if near:
+                latitude, longitude, radius = parse_near(near, request.args.get('radius', 10))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        # Base query
-        query = Event.query
+        # All facets compile into a single indexed query
+        query = apply_event_filters(db_session.query(Event), db_session, filters)
         
-        # Apply category filter if provided
-        if category:
-            query = query.filter(Event.categories.contains([category]))
+        # Apply nearby filter if provided, closest events first
+        distance = None
+        if near:
+            query, distance = apply_nearby_filter(query, db_session, latitude, longitude, radius)
+            query = query.order_by(distance)
+        else:
+            query = query.order_by(Event.date, Event.id)
         
-        # Paginate results
-        events_page = query.paginate(page=page, per_page=limit, error_out=False)
+        # Paginate results, with creator name and attendee count in the same query
+        total = query.count()
+        pages = (total + limit - 1) // limit
+        query = (
+            query
+            .join(User, User.id == Event.creator_id)
+            .add_columns(User.name, event_attendee_count())
+        )
+        if distance is not None:
+            query = query.add_columns(distance)
+        rows = [
+            tuple(row) if distance is not None else tuple(row) + (None,)
+            for row in query.offset((page - 1) * limit).limit(limit).all()
+        ]
+        
+        # Calculate match scores if user has completed personality test
+        match_scores = [0] * len(rows)
+        if user and user.has_completed_personality_test and user.personality_tags:
+            match_scores = batch_match_scores(
+                user.personality_tags, [event.categories for event, _, _, _ in rows]
+            )
         
-        # Format and add match scores
+        # Format event data
         events_data = []
-        for event in events_page.items:
-            # Calculate match score if user has completed personality test
-            match_score = 0
-            if user and user.has_completed_personality_test and user.personality_tags:
-                match_score = calculate_match_score(user.personality_tags, event.categories)
-                
-            # Format event data
-            events_data.append({
+        for (event, creator_name, attendees, event_distance), match_score in zip(rows, match_scores):
+            event_data = {
                 "id": event.id,
                 "title": event.title,
                 "description": event.description,
                 "date": event.date.strftime("%Y-%m-%d"),
                 "time": event.time.strftime("%H:%M"),
                 "location": event.location,
+                "latitude": event.latitude,
+                "longitude": event.longitude,
                 "imageUrl": event.image_url,
                 "capacity": event.capacity,
-                "attendees": event.attendees.count(),
+                "attendees": attendees,
                 "categories": event.categories,
                 "creator": {
-                    "id": event.creator.id,
-                    "name": event.creator.name
+                    "id": event.creator_id,
+                    "name": creator_name
                 },
                 "matchScore": match_score
-            })
+            }
+            if event_distance is not None:
+                event_data["distanceKm"] = round(event_distance, 3)
+            events_data.append(event_data)
         
         return jsonify({
             "events": events_data,
             "pagination": {
                 "page": page,
                 "limit": limit,
-                "total": events_page.total,
-                "pages": events_page.pages,
-                "hasNext": events_page.has_next,
-                "hasPrev": events_page.has_prev
+                "total": total,
+                "pages": pages,
+                "hasNext": page < pages,
+                "hasPrev": page > 1
             }
         }), 200
     
@@ -396,6 +795,8 @@ def create_event():
     - imageUrl: URL to event image
     - capacity: Maximum attendees
     - categories: Array of category tags
+    - latitude: Optional latitude of the venue
+    - longitude: Optional longitude of the venue
     
     Returns:
     - Created event data
@@ -403,6 +804,16 @@ def create_event():
     current_user_id = get_jwt_identity()
     data = request.json
     
+    # Geohash the venue when coordinates are provided
+    latitude = data.get('latitude')
+    longitude = data.get('longitude')
+    has_coordinates = latitude is not None and longitude is not None
+    if has_coordinates:
+        try:
+            latitude, longitude = parse_coordinates(latitude, longitude)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    
     # Create new event
     new_event = Event(
         title=data['title'],
@@ -413,6 +824,9 @@ def create_event():
         image_url=data.get('imageUrl', ''),
         capacity=data['capacity'],
         categories=data['categories'],
+        latitude=latitude if has_coordinates else None,
+        longitude=longitude if has_coordinates else None,
+        geohash=encode_geohash(latitude, longitude) if has_coordinates else None,
         creator_id=current_user_id
     )
     
@@ -420,22 +834,198 @@ def create_event():
     db_session.add(new_event)
     db_session.commit()
     
-    return jsonify({
+    # Keep the in-process search index current
+    if event_search_index.is_built:
+        event_search_index.add(new_event.id, new_event.title, new_event.description, new_event.location)
+    
+    event_data = {
         "id": new_event.id,
         "title": new_event.title,
         "description": new_event.description,
         "date": new_event.date.strftime("%Y-%m-%d"),
         "time": new_event.time.strftime("%H:%M"),
         "location": new_event.location,
+        "latitude": new_event.latitude,
+        "longitude": new_event.longitude,
         "imageUrl": new_event.image_url,
         "capacity": new_event.capacity,
         "attendees": 0,
         "categories": new_event.categories,
         "creator": {
             "id": current_user_id,
-            "name": User.query.get(current_user_id).name
+            "name": get_current_profile().name
         }
-    }), 201
+    }
+    
+    # Push the event to matching online users without delaying the response
+    online_user_ids = presence.online_user_ids() - {int(current_user_id)}
+    if online_user_ids:
+        socketio.start_background_task(
+            push_new_event, socketio, event_data, list(new_event.categories or []),
+            online_user_ids, NEW_EVENT_MATCH_THRESHOLD
+        )
+    
+    return jsonify(event_data), 201
+
+@app.route('/api/events/bulk', methods=['POST'])
+@jwt_required()
+def bulk_import_events():
+    """
+    Bulk import events from an NDJSON or CSV upload
+    
+    The request body is parsed as a stream and inserted in batches.
+    Rows use the same fields as event creation (CSV categories are
+    separated by semicolons).
+    
+    Headers:
+    - Content-Type: application/x-ndjson or text/csv
+    
+    Returns:
+    - Number of imported and failed rows
+    - Per-row errors (line numbers refer to the upload)
+    """
+    current_user_id = get_jwt_identity()
+    
+    import_format = IMPORT_FORMATS.get(request.mimetype)
+    if not import_format:
+        return jsonify({"error": "Upload must be application/x-ndjson or text/csv"}), 415
+    
+    records = iter_csv(request.stream) if import_format == "csv" else iter_ndjson(request.stream)
+    
+    # Keep the in-process search index current
+    def on_inserted(event_id, row):
+        if event_search_index.is_built:
+            event_search_index.add(event_id, row["title"], row["description"], row["location"])
+    
+    try:
+        summary = import_events(db_session, records, current_user_id, on_inserted)
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": "Malformed upload", "details": str(e)}), 400
+    
+    status = 201 if summary["imported"] else 400
+    return jsonify(summary), status
+
+@app.route('/api/events/search', methods=['GET'])
+@jwt_required()
+def search_events():
+    """
+    Full-text search over event title, description and location
+    
+    Query parameters:
+    - q: Search query (all words must match)
+    - page: Page number for pagination
+    - limit: Number of events per page
+    - blend: Weight (0-1) of the personality match score in the ranking
+    
+    Returns:
+    - List of events ranked by relevance, with match scores
+    """
+    current_user_id = get_jwt_identity()
+    
+    try:
+        user = get_current_profile()
+        
+        # Get search parameters
+        search_query = request.args.get('q', '').strip()
+        page = int(request.args.get('page', 1))
+        limit = int(request.args.get('limit', 10))
+        blend = min(max(float(request.args.get('blend', 0)), 0.0), 1.0)
+        
+        if not search_query:
+            return jsonify({"events": []}), 200
+        
+        # Blending re-ranks a wider window of the most relevant events;
+        # one extra row tells whether a next page exists
+        window = page * limit * (5 if blend else 1) + 1
+        
+        if engine.dialect.name == 'postgresql':
+            # tsvector search served by the ix_events_search GIN index
+            ts_query = func.websearch_to_tsquery('english', search_query)
+            relevance = func.ts_rank_cd(event_search_vector(), ts_query, 32)
+            rows = (
+                db_session.query(
+                    Event,
+                    User.name,
+                    event_attendee_count(),
+                    relevance
+                )
+                .join(User, User.id == Event.creator_id)
+                .filter(event_search_vector().op('@@')(ts_query))
+                .order_by(relevance.desc(), Event.id)
+                .limit(window)
+                .all()
+            )
+        else:
+            # Fall back to the in-process inverted index on other databases
+            event_search_index.ensure_built(
+                lambda: db_session.query(
+                    Event.id, Event.title, Event.description, Event.location
+                ).yield_per(1000)
+            )
+            ranked = event_search_index.search(search_query, limit=window)
+            relevance_by_id = dict(ranked)
+            found = {
+                event.id: (event, creator_name, attendees)
+                for event, creator_name, attendees in (
+                    db_session.query(Event, User.name, event_attendee_count())
+                    .join(User, User.id == Event.creator_id)
+                    .filter(Event.id.in_(relevance_by_id))
+                )
+            }
+            rows = [
+                found[event_id] + (relevance_by_id[event_id],)
+                for event_id, _ in ranked if event_id in found
+            ]
+        
+        # Score all candidates against the user's personality in one batch
+        match_scores = [0] * len(rows)
+        if user and user.has_completed_personality_test and user.personality_tags:
+            match_scores = batch_match_scores(
+                user.personality_tags, [event.categories for event, _, _, _ in rows]
+            )
+        
+        # Blend text relevance with the personality match score
+        results = [
+            ((1 - blend) * relevance + blend * match_score / 100, event, creator_name, attendees, match_score)
+            for (event, creator_name, attendees, relevance), match_score in zip(rows, match_scores)
+        ]
+        if blend:
+            results.sort(key=lambda result: result[0], reverse=True)
+        
+        events_data = []
+        for score, event, creator_name, attendees, match_score in results[(page - 1) * limit:page * limit]:
+            events_data.append({
+                "id": event.id,
+                "title": event.title,
+                "description": event.description,
+                "date": event.date.strftime("%Y-%m-%d"),
+                "time": event.time.strftime("%H:%M"),
+                "location": event.location,
+                "imageUrl": event.image_url,
+                "capacity": event.capacity,
+                "attendees": attendees,
+                "categories": event.categories,
+                "creator": {
+                    "id": event.creator_id,
+                    "name": creator_name
+                },
+                "matchScore": match_score,
+                "relevance": round(score, 4)
+            })
+        
+        return jsonify({
+            "events": events_data,
+            "pagination": {
+                "page": page,
+                "limit": limit,
+                "hasNext": len(results) > page * limit,
+                "hasPrev": page > 1
+            }
+        }), 200
+    
+    except Exception as e:
+        print(f"Search events error: {str(e)}")
+        return jsonify({"error": "Failed to search events", "details": str(e)}), 500
 
 @app.route('/api/events/<event_id>/book', methods=['POST'])
 @jwt_required()
@@ -446,38 +1036,174 @@ def book_event(event_id):
     URL parameters:
     - event_id: ID of the event to book
     
+    Request body (optional):
+    - joinWaitlist: Join the waitlist if the event is full
+    
     Returns:
     - Booking confirmation
     """
     current_user_id = get_jwt_identity()
     
+    # Reserve the seat under the event row lock
+    _, results = reserve_seats(db_session, [(event_id, current_user_id)])
+    status = results[0]["status"]
+    
     # Check if event exists
-    event = Event.query.get(event_id)
-    if not event:
+    if status == EVENT_NOT_FOUND:
         return jsonify({"error": "Event not found"}), 404
     
-    # Check if event is full
-    if event.attendees.count() >= event.capacity:
+    # Check if event is full, optionally joining the waitlist instead
+    if status == INSUFFICIENT_CAPACITY:
+        if (request.get_json(silent=True) or {}).get('joinWaitlist'):
+            waitlist_status, position = join_waitlist(db_session, event_id, current_user_id)
+            if waitlist_status == SEATS_AVAILABLE:
+                return jsonify({"error": "A seat became available, please book again"}), 409
+            return jsonify({
+                "message": "Event is full, added to the waitlist",
+                "eventId": event_id,
+                "waitlistPosition": position
+            }), 202
         return jsonify({"error": "Event is at full capacity"}), 400
     
     # Check if user is already attending
-    existing_attendance = Attendance.query.filter_by(
-        user_id=current_user_id, event_id=event_id
-    ).first()
-    
-    if existing_attendance:
+    if status == ALREADY_BOOKED:
         return jsonify({"error": "Already booked for this event"}), 400
     
-    # Create attendance record
-    attendance = Attendance(user_id=current_user_id, event_id=event_id)
-    db_session.add(attendance)
-    db_session.commit()
-    
     return jsonify({
         "message": "Event successfully booked",
         "eventId": event_id
     }), 201
 
+@app.route('/api/events/<event_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_event_booking(event_id):
+    """
+    Cancel attendance for an event
+    
+    The freed seat goes to the head of the event's waitlist, who is
+    notified in real time.
+    
+    URL parameters:
+    - event_id: ID of the event
+    
+    Returns:
+    - Cancellation confirmation
+    """
+    current_user_id = get_jwt_identity()
+    
+    cancelled, promoted_user_id = cancel_booking(db_session, event_id, current_user_id)
+    if not cancelled:
+        return jsonify({"error": "No booking for this event"}), 404
+    
+    # Tell the promoted user their seat is confirmed
+    if promoted_user_id is not None:
+        socketio.emit('waitlist_promoted', {
+            "eventId": int(event_id),
+            "userId": promoted_user_id
+        }, room=str(promoted_user_id))
+    
+    return jsonify({
+        "message": "Booking cancelled",
+        "eventId": event_id
+    }), 200
+
+@app.route('/api/events/<event_id>/waitlist', methods=['POST'])
+@jwt_required()
+def join_event_waitlist(event_id):
+    """
+    Join the waitlist of an event
+    
+    URL parameters:
+    - event_id: ID of the event
+    
+    Returns:
+    - Place in the waitlist queue (1 is next in line; users ahead who
+      leave the queue are only skipped once it reaches them)
+    """
+    current_user_id = get_jwt_identity()
+    
+    status, position = join_waitlist(db_session, event_id, current_user_id)
+    if status == EVENT_NOT_FOUND:
+        return jsonify({"error": "Event not found"}), 404
+    if status == ALREADY_BOOKED:
+        return jsonify({"error": "Already booked for this event"}), 400
+    if status == SEATS_AVAILABLE:
+        return jsonify({"error": "Event has free seats, book it directly"}), 409
+    
+    return jsonify({
+        "message": "Added to the waitlist",
+        "eventId": event_id,
+        "waitlistPosition": position
+    }), 201 if status == WAITLISTED else 200
+
+@app.route('/api/events/<event_id>/waitlist', methods=['DELETE'])
+@jwt_required()
+def leave_event_waitlist(event_id):
+    """
+    Leave the waitlist of an event
+    
+    URL parameters:
+    - event_id: ID of the event
+    
+    Returns:
+    - Confirmation of the removal
+    """
+    current_user_id = get_jwt_identity()
+    
+    if not leave_waitlist(db_session, event_id, current_user_id):
+        return jsonify({"error": "Not on the waitlist for this event"}), 404
+    
+    return jsonify({
+        "message": "Removed from the waitlist",
+        "eventId": event_id
+    }), 200
+
+@app.route('/api/events/group-book', methods=['POST'])
+@jwt_required()
+def group_book_events():
+    """
+    Book several users for one event, or one user for several events,
+    in a single all-or-nothing transaction
+    
+    Request body (one of):
+    - eventId + userIds: Book the listed users (yourself and members of
+      your Gathr circle) for one event
+    - eventIds: Book yourself for each of the listed events
+    
+    Returns:
+    - Overall success flag
+    - Per-item results (booked, already_booked, event_not_found,
+      not_permitted, insufficient_capacity, not_booked)
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    
+    try:
+        if data.get('eventIds') is not None:
+            items = [(event_id, current_user_id) for event_id in parse_id_list(data['eventIds'], 'eventIds')]
+            permitted = None
+        elif data.get('eventId') is not None and data.get('userIds') is not None:
+            event_id = parse_id(data['eventId'], 'eventId')
+            user_ids = parse_id_list(data['userIds'], 'userIds')
+            items = [(event_id, user_id) for user_id in user_ids]
+            permitted = bookable_user_ids(db_session, current_user_id, user_ids)
+        else:
+            return jsonify({"error": "Provide eventIds, or eventId and userIds"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if len(items) > MAX_GROUP_BOOKING_ITEMS:
+        return jsonify({"error": f"At most {MAX_GROUP_BOOKING_ITEMS} bookings per request"}), 400
+    
+    success, results = reserve_seats(db_session, items, permitted)
+    
+    return jsonify({
+        "success": success,
+        "results": results
+    }), 201 if success else 409
+
 @app.route('/api/events/upcoming', methods=['GET'])
 @jwt_required()
 def get_upcoming_events():
@@ -492,41 +1218,51 @@ def get_upcoming_events():
     current_user_id = get_jwt_identity()
     current_date = datetime.now()
     
-    # Get events user is attending
-    attended_events = (
-        Event.query
-        .join(Attendance)
-        .filter(
+    # Tag every event the user relates to with a role in a single CTE
+    # (attending, created, or past events that still need feedback)
+    event_roles = union_all(
+        select(Attendance.event_id.label('event_id'), literal('attending', String).label('role'))
+        .select_from(Attendance)
+        .join(Event, Event.id == Attendance.event_id)
+        .where(
             Attendance.user_id == current_user_id,
             Event.date >= current_date
-        )
-        .all()
-    )
-    
-    # Get events user has created
-    created_events = Event.query.filter(
-        Event.creator_id == current_user_id,
-        Event.date >= current_date
-    ).all()
-    
-    # Get past events that need feedback
-    feedback_needed_events = (
-        Event.query
-        .join(Attendance)
+        ),
+        select(Event.id.label('event_id'), literal('created', String).label('role'))
+        .where(
+            Event.creator_id == current_user_id,
+            Event.date >= current_date
+        ),
+        select(Attendance.event_id.label('event_id'), literal('feedback', String).label('role'))
+        .select_from(Attendance)
+        .join(Event, Event.id == Attendance.event_id)
         .outerjoin(Feedback, and_(
-            Feedback.event_id == Event.id,
+            Feedback.event_id == Attendance.event_id,
             Feedback.user_id == current_user_id
         ))
-        .filter(
+        .where(
             Attendance.user_id == current_user_id,
             Event.date < current_date,
             Feedback.id == None  # No feedback given yet
         )
+    ).cte('event_roles')
+    
+    # One round trip: events with role flag, creator name and attendee count
+    rows = (
+        db_session.query(
+            Event,
+            event_roles.c.role,
+            User.name.label('creator_name'),
+            event_attendee_count().label('attendee_count')
+        )
+        .join(event_roles, event_roles.c.event_id == Event.id)
+        .join(User, User.id == Event.creator_id)
+        .order_by(Event.date, Event.id)
         .all()
     )
     
     # Format events
-    def format_event(event, is_creator):
+    def format_event(event, is_creator, creator_name, attendees):
         return {
             "id": event.id,
             "title": event.title,
@@ -536,23 +1272,25 @@ def get_upcoming_events():
             "location": event.location,
             "imageUrl": event.image_url,
             "capacity": event.capacity,
-            "attendees": event.attendees.count(),
+            "attendees": attendees,
             "categories": event.categories,
             "isCreator": is_creator,
             "creator": {
-                "id": event.creator.id,
-                "name": event.creator.name
+                "id": event.creator_id,
+                "name": creator_name
             }
         }
     
-    attended_events_data = [format_event(event, False) for event in attended_events]
-    created_events_data = [format_event(event, True) for event in created_events]
-    feedback_events_data = [format_event(event, False) for event in feedback_needed_events]
+    events_by_role = {"attending": [], "created": [], "feedback": []}
+    for event, role, creator_name, attendees in rows:
+        events_by_role[role].append(
+            format_event(event, role == "created", creator_name, attendees)
+        )
     
     return jsonify({
-        "attendingEvents": attended_events_data,
-        "createdEvents": created_events_data,
-        "feedbackEvents": feedback_events_data
+        "attendingEvents": events_by_role["attending"],
+        "createdEvents": events_by_role["created"],
+        "feedbackEvents": events_by_role["feedback"]
     }), 200
 
 @app.route('/api/events/<event_id>/attendees', methods=['GET'])
@@ -570,8 +1308,8 @@ def get_event_attendees(event_id):
     """
     current_user_id = get_jwt_identity()
     
-    # Get current user
-    user = User.query.get(current_user_id)
+    # Get current user profile (cached)
+    user = get_current_profile()
     
     # Check if user completed personality test
     if not user.has_completed_personality_test:
@@ -606,8 +1344,15 @@ def get_event_attendees(event_id):
         .all()
     )
     
-    # Calculate compatible users that can be messaged
-    messageable_ids = select_message_recipients(attendees)
+    # Users that can be messaged, topped up as attendance grows
+    top_up_messaging_grants(db_session, current_user_id, event_id)
+    db_session.commit()
+    messageable_ids = set(db_session.execute(
+        select(MessagingGrant.recipient_id).where(
+            MessagingGrant.user_id == current_user_id,
+            MessagingGrant.event_id == event_id
+        )
+    ).scalars())
     
     # Format attendees data with compatibility scores
     attendees_data = []
@@ -707,45 +1452,58 @@ def get_circle():
     """
     current_user_id = get_jwt_identity()
     
-    # Get current user
-    user = User.query.get(current_user_id)
+    # Get current user profile (cached)
+    user = get_current_profile()
     
-    # Get all connections
+    # Shared events per connection from one self-join on attendances
+    own_attendance = aliased(Attendance)
+    their_attendance = aliased(Attendance)
+    shared_events = (
+        select(
+            their_attendance.user_id.label('user_id'),
+            func.count(their_attendance.event_id).label('shared_count')
+        )
+        .select_from(own_attendance)
+        .join(their_attendance, their_attendance.event_id == own_attendance.event_id)
+        .join(Connection, and_(
+            Connection.user_id == current_user_id,
+            Connection.connected_user_id == their_attendance.user_id
+        ))
+        .where(own_attendance.user_id == current_user_id)
+        .group_by(their_attendance.user_id)
+        .subquery()
+    )
+    
+    # Get all connections together with their shared event counts
     connections = (
-        User.query
+        db_session.query(
+            User.id,
+            User.name,
+            User.personality_tags,
+            func.coalesce(shared_events.c.shared_count, 0)
+        )
         .join(Connection, Connection.connected_user_id == User.id)
+        .outerjoin(shared_events, shared_events.c.user_id == User.id)
         .filter(Connection.user_id == current_user_id)
         .all()
     )
     
+    # Score every connection in one vectorized batch
+    compatibility_scores = batch_user_compatibility(
+        user.personality_tags,
+        [personality_tags for _, _, personality_tags, _ in connections]
+    )
+    
     # Format connections data with compatibility scores
     connections_data = []
-    for connection in connections:
-        compatibility_score = 50  # Default score
-        
-        # Calculate compatibility if both users have personality data
-        if user.personality_tags and connection.personality_tags:
-            compatibility_score = calculate_user_compatibility(
-                user.personality_tags, 
-                connection.personality_tags
-            )
-        
-        # Get number of shared events
-        shared_events_count = db_session.query(func.count(Attendance.event_id)).filter(
-            Attendance.user_id == current_user_id,
-            Attendance.event_id.in_(
-                db_session.query(Attendance.event_id).filter(
-                    Attendance.user_id == connection.id
-                )
-            )
-        ).scalar()
-        
-        # Add to connections list
+    for (connection_id, name, personality_tags, shared_events_count), compatibility_score in zip(
+        connections, compatibility_scores
+    ):
         connections_data.append({
-            "id": connection.id,
-            "name": connection.name,
+            "id": connection_id,
+            "name": name,
             "personalityMatch": compatibility_score,
-            "personalityTags": connection.personality_tags or [],
+            "personalityTags": personality_tags or [],
             "eventsAttended": shared_events_count
         })
     
@@ -756,6 +1514,55 @@ def get_circle():
         "connections": connections_data
     }), 200
 
+@app.route('/api/circle/presence', methods=['GET'])
+@jwt_required()
+def get_circle_presence():
+    """
+    Get the online status of everyone in the user's Gathr circle
+    
+    Returns:
+    - Presence of each connection
+    """
+    current_user_id = get_jwt_identity()
+    
+    connected_user_ids = [
+        connected_user_id for (connected_user_id,) in
+        db_session.query(Connection.connected_user_id)
+        .filter(Connection.user_id == current_user_id)
+        .all()
+    ]
+    
+    return jsonify({
+        "statuses": presence_statuses(connected_user_ids)
+    }), 200
+
+@app.route('/api/presence', methods=['POST'])
+@jwt_required()
+def query_presence():
+    """
+    Get the online status of many users in one call
+    
+    Request body:
+    - userIds: Array of user IDs (at most 5000)
+    
+    Returns:
+    - Presence of each requested user the caller may see (themselves
+      and their circle)
+    """
+    current_user_id = get_jwt_identity()
+    
+    user_ids = (request.get_json(silent=True) or {}).get('userIds', [])
+    if not isinstance(user_ids, list) or len(user_ids) > MAX_PRESENCE_QUERY:
+        return jsonify({"error": f"userIds must be a list of at most {MAX_PRESENCE_QUERY} IDs"}), 400
+    try:
+        user_ids = [int(user_id) for user_id in user_ids]
+    except (TypeError, ValueError):
+        return jsonify({"error": "userIds must be integers"}), 400
+    
+    return jsonify({
+        "statuses": presence_statuses(visible_presence_ids(current_user_id, user_ids))
+    }), 200
+
 @app.route('/api/circle/add', methods=['POST'])
 @jwt_required()
 def add_to_circle():
@@ -863,42 +1670,47 @@ def send_message():
     
     # If event is provided, check messaging permissions
     if event_id:
+        # Both attendances and the materialized grant in one indexed lookup
+        user_attending = exists().where(
+            Attendance.user_id == current_user_id,
+            Attendance.event_id == Event.id
+        )
+        recipient_attending = exists().where(
+            Attendance.user_id == recipient_id,
+            Attendance.event_id == Event.id
+        )
+        has_grant = exists().where(
+            MessagingGrant.user_id == current_user_id,
+            MessagingGrant.event_id == Event.id,
+            MessagingGrant.recipient_id == recipient_id
+        )
+        permission = db_session.query(
+            Event.date,
+            user_attending.label('user_attending'),
+            recipient_attending.label('recipient_attending'),
+            has_grant.label('has_grant')
+        ).filter(Event.id == event_id).first()
+        
         # Check if event exists
-        event = Event.query.get(event_id)
-        if not event:
+        if not permission:
             return jsonify({"error": "Event not found"}), 404
         
         # Check if both users are attending the event
-        user_attending = Attendance.query.filter_by(
-            user_id=current_user_id, event_id=event_id
-        ).first() is not None
-        
-        recipient_attending = Attendance.query.filter_by(
-            user_id=recipient_id, event_id=event_id
-        ).first() is not None
-        
-        if not (user_attending and recipient_attending):
+        if not (permission.user_attending and permission.recipient_attending):
             return jsonify({"error": "Both users must be attending the event"}), 403
         
         # Check if the event is within 24 hours
-        time_to_event = event.date - datetime.now()
+        time_to_event = permission.date - datetime.now()
         if time_to_event.total_seconds() > 24 * 60 * 60:
             return jsonify({"error": "Messaging available only within 24 hours of event"}), 403
         
-        # Check if recipient is in messageable users list
-        attendees = (
-            User.query
-            .join(Attendance)
-            .filter(
-                Attendance.event_id == event_id,
-                User.id != current_user_id
-            )
-            .all()
-        )
-        
-        messageable_ids = select_message_recipients(attendees)
-        if recipient_id not in messageable_ids:
-            return jsonify({"error": "Cannot message this user for this event"}), 403
+        # Check if recipient is in messageable users list; without a grant
+        # the sender may still be owed grants if attendance has grown
+        if not permission.has_grant:
+            granted = top_up_messaging_grants(db_session, current_user_id, event_id)
+            db_session.commit()
+            if int(recipient_id) not in granted:
+                return jsonify({"error": "Cannot message this user for this event"}), 403
     
     # Create message
     message = Message(
@@ -922,21 +1734,43 @@ def send_message():
 @jwt_required()
 def get_messages(user_id):
     """
-    Get messages between current user and another user
+    Get messages between current user and another user, newest first
     
     URL parameters:
     - user_id: ID of the other user
     
+    Query parameters:
+    - limit: Number of messages per page (default 50, max 200)
+    - before: Cursor from a previous page; returns messages older than it
+    - markRead: Whether to mark received messages as read (default true)
+    
     Returns:
-    - List of messages between the two users
+    - Page of messages between the two users
+    - Cursor for the next (older) page
+    - Number of messages marked as read
     """
     current_user_id = get_jwt_identity()
     
-    # Get all messages between the two users
-    messages = Message.query.filter(
+    # Get pagination parameters
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+        before = int(request.args['before']) if request.args.get('before') else None
+    except ValueError:
+        return jsonify({"error": "limit and before must be integers"}), 400
+    mark_read = request.args.get('markRead', 'true').lower() not in ('false', '0', 'no')
+    
+    # Messages in either direction, keyset-paginated on id (insertion order)
+    query = Message.query.filter(
         ((Message.sender_id == current_user_id) & (Message.recipient_id == user_id)) |
         ((Message.sender_id == user_id) & (Message.recipient_id == current_user_id))
-    ).order_by(Message.sent_at).all()
+    )
+    if before is not None:
+        query = query.filter(Message.id < before)
+    
+    # Fetch one extra row to know whether an older page exists
+    messages = query.order_by(Message.id.desc()).limit(limit + 1).all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
     
     # Format messages
     messages_data = []
@@ -951,20 +1785,21 @@ def get_messages(user_id):
             "readAt": message.read_at.isoformat() if message.read_at else None
         })
     
-    # Mark received messages as read
-    unread_messages = Message.query.filter(
-        Message.recipient_id == current_user_id,
-        Message.sender_id == user_id,
-        Message.read_at == None
-    ).all()
-    
-    for message in unread_messages:
-        message.read_at = datetime.now()
-    
-    db_session.commit()
+    # Mark received messages as read with one set-based UPDATE
+    marked_read = 0
+    if mark_read:
+        marked_read = Message.query.filter(
+            Message.recipient_id == current_user_id,
+            Message.sender_id == user_id,
+            Message.read_at == None
+        ).update({Message.read_at: datetime.now()}, synchronize_session=False)
+        db_session.commit()
     
     return jsonify({
-        "messages": messages_data
+        "messages": messages_data,
+        "nextCursor": str(messages[-1].id) if has_more else None,
+        "hasMore": has_more,
+        "markedRead": marked_read
     }), 200
 
 # Admin routes
@@ -978,56 +1813,20 @@ def admin_stats():
     - User statistics
     - Event statistics
     - Security metrics
+    - Age of the statistics snapshot in seconds
     """
     current_user_id = get_jwt_identity()
     
     # Check if user is an admin
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     if not user or not getattr(user, 'is_admin', False):
         return jsonify({"error": "Unauthorized access"}), 403
     
     try:
-        # Get user statistics
-        total_users = User.query.count()
-        active_users = User.query.filter(User.last_active > (datetime.now() - timedelta(days=30))).count()
-        premium_users = User.query.filter(User.tier.in_(["premium", "enterprise"])).count()
-        
-        # Get event statistics
-        total_events = Event.query.count()
-        upcoming_events = Event.query.filter(Event.date > datetime.now()).count()
-        past_events = Event.query.filter(Event.date <= datetime.now()).count()
-        
-        # Calculate user growth by month
-        user_growth = []
-        for i in range(6, -1, -1):
-            month_start = datetime.now().replace(day=1) - timedelta(days=30*i)
-            month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
-            
-            count = User.query.filter(
-                User.created_at >= month_start,
-                User.created_at < month_end
-            ).count()
-            
-            user_growth.append({
-                "month": month_start.strftime("%b"),
-                "users": count
-            })
-        
-        return jsonify({
-            "userStats": {
-                "totalUsers": total_users,
-                "activeUsers": active_users,
-                "premiumUsers": premium_users,
-                "conversionRate": (premium_users / total_users * 100) if total_users > 0 else 0
-            },
-            "eventStats": {
-                "totalEvents": total_events,
-                "upcomingEvents": upcoming_events,
-                "pastEvents": past_events
-            },
-            "userGrowth": user_growth,
-            "securityAlerts": 3  # Placeholder for security alerts count
-        }), 200
+        # Served from the periodically refreshed snapshot
+        admin_stats_snapshot.start(socketio)
+        stats = admin_stats_snapshot.get()
+        return jsonify({**stats, "snapshotAgeSeconds": round(admin_stats_snapshot.age(), 1)}), 200
     
     except Exception as e:
         print(f"Admin stats error: {str(e)}")
@@ -1051,7 +1850,7 @@ def admin_get_users():
     current_user_id = get_jwt_identity()
     
     # Check if user is an admin
-    user = User.query.get(current_user_id)
+    user = get_current_user()
     if not user or not getattr(user, 'is_admin', False):
         return jsonify({"error": "Unauthorized access"}), 403
     
@@ -1059,24 +1858,51 @@ def admin_get_users():
         # Get pagination parameters
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 10))
-        search = request.args.get('search', '')
+        search = request.args.get('search', '').strip()
         
         # Base query
         query = User.query
         
-        # Apply search filter if provided
-        if search:
-            query = query.filter(
-                (User.name.ilike(f'%{search}%')) |
-                (User.email.ilike(f'%{search}%'))
+        # Apply indexed, ranked search if provided
+        if search and engine.dialect.name == 'postgresql':
+            if '@' in search:
+                # Email prefix lookup served by the text_pattern_ops index
+                query = query.filter(func.lower(User.email).like(f'{escape_like(search.lower())}%'))
+            else:
+                # Substring match served by the pg_trgm GIN indexes
+                pattern = f'%{escape_like(search)}%'
+                query = query.filter(
+                    (User.name.ilike(pattern)) |
+                    (User.email.ilike(pattern))
+                )
+            query = query.order_by(
+                func.greatest(
+                    func.similarity(User.name, search),
+                    func.similarity(User.email, search)
+                ).desc(),
+                User.id
             )
+            total = query.count()
+            users = query.offset((page - 1) * limit).limit(limit).all()
+        elif search:
+            # Fall back to the in-process trigram index on other databases
+            user_search_index.ensure_built(
+                lambda: db_session.query(User.id, User.name, User.email).yield_per(1000)
+            )
+            matching_ids = user_search_index.search(search)
+            total = len(matching_ids)
+            page_ids = matching_ids[(page - 1) * limit:page * limit]
+            users_by_id = {u.id: u for u in query.filter(User.id.in_(page_ids)).all()}
+            users = [users_by_id[user_id] for user_id in page_ids if user_id in users_by_id]
+        else:
+            total = query.count()
+            users = query.order_by(User.id).offset((page - 1) * limit).limit(limit).all()
         
-        # Paginate results
-        users_page = query.paginate(page=page, per_page=limit, error_out=False)
+        pages = (total + limit - 1) // limit
         
         # Format user data
         users_data = []
-        for user in users_page.items:
+        for user in users:
             users_data.append({
                 "id": user.id,
                 "name": user.name,
@@ -1093,10 +1919,10 @@ def admin_get_users():
             "pagination": {
                 "page": page,
                 "limit": limit,
-                "total": users_page.total,
-                "pages": users_page.pages,
-                "hasNext": users_page.has_next,
-                "hasPrev": users_page.has_prev
+                "total": total,
+                "pages": pages,
+                "hasNext": page < pages,
+                "hasPrev": page > 1
             }
         }), 200
     
@@ -1104,28 +1930,122 @@ def admin_get_users():
         print(f"Admin get users error: {str(e)}")
         return jsonify({"error": "Failed to retrieve users", "details": str(e)}), 500
 
+@app.route('/api/admin/export/<resource>', methods=['GET'])
+@jwt_required()
+def admin_export(resource):
+    """
+    Stream a full listing for the admin panel
+    
+    URL parameters:
+    - resource: One of users, events or feedback
+    
+    Query parameters:
+    - format: ndjson (default) or csv
+    
+    Returns:
+    - Streaming NDJSON or CSV download
+    """
+    current_user_id = get_jwt_identity()
+    
+    # Check if user is an admin
+    user = get_current_user()
+    if not user or not getattr(user, 'is_admin', False):
+        return jsonify({"error": "Unauthorized access"}), 403
+    
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "Unsupported export format"}), 400
+    
+    exports = {
+        "users": (
+            db_session.query(
+                User.id, User.name, User.email,
+                User.has_completed_personality_test, User.personality_tags
+            ).order_by(User.id),
+            user_row
+        ),
+        "events": (
+            db_session.query(
+                Event.id, Event.title, Event.date, Event.time, Event.location,
+                Event.capacity, Event.categories, Event.creator_id
+            ).order_by(Event.id),
+            event_row
+        ),
+        "feedback": (
+            db_session.query(
+                Feedback.id, Feedback.event_id, Feedback.user_id, Feedback.rating,
+                Feedback.enjoyed_most, Feedback.comment, Feedback.submitted_at
+            ).order_by(Feedback.id),
+            feedback_row
+        )
+    }
+    if resource not in exports:
+        return jsonify({"error": "Unknown export resource"}), 404
+    
+    query, format_row = exports[resource]
+    return export_response(query, format_row, export_format, resource)
+
 # Debug/admin route: List all users (for development/testing)
 @app.route('/api/users', methods=['GET'])
 def list_users():
     """
     List all registered users.
+    
+    Query parameters:
+    - format: json (default), or ndjson/csv to stream the listing
+    
     Returns:
     - List of user objects (id, name, email, hasCompletedPersonalityTest, personalityTags)
     """
-    users = User.query.all()
-    users_data = []
-    for user in users:
-        users_data.append({
-            "id": user.id,
-            "name": user.name,
-            "email": user.email,
-            "hasCompletedPersonalityTest": getattr(user, "has_completed_personality_test", False),
-            "personalityTags": getattr(user, "personality_tags", []),
-        })
+    export_format = request.args.get('format', 'json')
+    users = db_session.query(
+        User.id, User.name, User.email,
+        User.has_completed_personality_test, User.personality_tags
+    ).order_by(User.id)
+    
+    # Stream with constant memory for large listings
+    if export_format in EXPORT_FORMATS:
+        return export_response(users, user_row, export_format, "users")
+    
+    users_data = [user_row(user) for user in users]
     return jsonify({"users": users_data}), 200
 
-# Main entry point
+# Time every Socket.IO handler registered above
+metrics.instrument_socketio(socketio)
+metrics.register_gauge(
+    'gathr_socketio_authenticated_sessions', 'Authenticated Socket.IO sessions on this worker',
+    lambda: len(socket_users)
+)
+metrics.register_gauge(
+    'gathr_chat_write_backlog', 'Chat messages waiting to be persisted',
+    lambda: len(message_writer)
+)
+
+def drain():
+    """
+    Finishes this worker's real-time work before it exits
+    
+    Stores every buffered chat message, sends pending room batches,
+    disconnects the worker's sockets so clients reconnect elsewhere and
+    announces the resulting offline statuses.
+    """
+    message_writer.flush()
+    room_broadcaster.flush()
+    for sid, _ in list(socketio.server.manager.get_participants('/', None)):
+        socketio.server.disconnect(sid)
+    presence_broadcaster.flush(socketio)
+
+# Main entry point (development server; see run.py for production)
 if __name__ == '__main__':
+    if os.environ.get('GATHR_ENV') == 'production':
+        # Production needs eventlet and psycopg2 patched before this module
+        # is imported, which only run.py does
+        raise SystemExit("GATHR_ENV=production: start the server with `python run.py --production`")
     init_db()
     # Run with Socket.IO
-    socketio.run(app, debug=True, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
+    socketio.run(
+        app,
+        debug=True,
+        host='0.0.0.0',
+        port=int(os.environ.get('PORT', 5000))
+    )
@@ -0,0 +1,97 @@
+"""
+@file bench_metrics_overhead.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Benchmark for the cost of metrics instrumentation
+
+End-to-end timings of a sub-millisecond endpoint vary by more than the
+instrumentation costs, so this times the metrics hooks themselves (the
+before/after/teardown request hooks and the cursor listener pair) in a
+tight loop and reports them against the median latency of the cheapest
+endpoint (the healthcheck) and of a trivial SQL statement. Real
+endpoints run queries and take milliseconds, so their relative overhead
+is lower. The cost of the timing loop itself, measured with the hooks
+left out, is subtracted. Exits non-zero if either overhead reaches the
+2% budget.
+
+Usage:
+    DATABASE_URL=sqlite:// python bench_metrics_overhead.py [runs]
+"""
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from common import time_calls
+
+from app import app, engine
+
+# Largest acceptable hook cost, as a share of the baseline latency
+OVERHEAD_BUDGET = 0.02
+
+
+def hook(functions, name):
+    """Finds a registered metrics hook by function name"""
+    return next(f for f in functions if f.__name__ == name)
+
+
+def per_call_us(func, runs):
+    """Average cost of func in microseconds over runs calls"""
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def report_overhead(name, baseline_us, hook_us):
+    """Prints the overhead; returns True if it is within the budget"""
+    overhead = hook_us / baseline_us
+    print(f"{name:<12} median={baseline_us:8.1f}us hooks={hook_us:6.2f}us "
+          f"overhead={overhead * 100:5.2f}%")
+    return overhead < OVERHEAD_BUDGET
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    # Request hooks around the cheapest endpoint
+    start_request = hook(app.before_request_funcs[None], 'start_request_metrics')
+    record_request = hook(app.after_request_funcs[None], 'record_request_metrics')
+    finish_request = hook(app.teardown_request_funcs[None], 'finish_request_metrics')
+    client = app.test_client()
+    healthcheck_us = np.median(time_calls(lambda: client.get('/api/healthcheck'), runs=runs // 10)) * 1000
+
+    with app.test_request_context('/api/healthcheck'):
+        response = app.response_class()
+        request_hooks_us = per_call_us(
+            lambda: (start_request(), record_request(response), finish_request()), runs
+        ) - per_call_us(lambda: (), runs)
+    within_budget = report_overhead("healthcheck", healthcheck_us, request_hooks_us)
+
+    # Cursor listeners around a trivial statement (the metrics listeners
+    # are the only ones registered)
+    before_cursor = list(engine.dispatch.before_cursor_execute)
+    after_cursor = list(engine.dispatch.after_cursor_execute)
+    with engine.connect() as connection:
+        select_us = np.median(time_calls(lambda: connection.execute(text("SELECT 1")), runs=runs // 10)) * 1000
+
+        class Context:
+            """Stand-in for the statement's execution context"""
+
+        def listeners(before=before_cursor, after=after_cursor):
+            context = Context()
+            for listener in before:
+                listener(connection, None, "SELECT 1", (), context, False)
+            for listener in after:
+                listener(connection, None, "SELECT 1", (), context, False)
+
+        with app.test_request_context('/'):
+            start_request()
+            listener_us = per_call_us(listeners, runs) - per_call_us(lambda: listeners((), ()), runs)
+    within_budget &= report_overhead("SELECT 1", select_us, listener_us)
+
+    if not within_budget:
+        print(f"FAIL: metrics overhead exceeds {OVERHEAD_BUDGET:.0%}")
+        sys.exit(1)
+    print(f"OK: metrics overhead within {OVERHEAD_BUDGET:.0%}")
@@ -0,0 +1,98 @@
+"""
+@file bench_nearby_events.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Benchmark for nearby-event queries
+
+Seeds a catalog of events scattered over a metropolitan-sized area and
+a sparser worldwide background, then times the nearby filter (geohash
+and bounding-box pruning plus exact distance refinement) for random
+search centers. Each call runs the endpoint's queries: the total count
+and the first page ordered by distance.
+
+Usage:
+    DATABASE_URL=postgresql://... python bench_nearby_events.py [events] [radius_km]
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from common import report, time_calls
+
+from database import db_session, init_db
+from geo import apply_nearby_filter, encode_geohash
+from models import User, Event
+
+# Dense cluster around a city center plus a worldwide background
+CITY_CENTER = (1.3521, 103.8198)
+CITY_SPREAD_DEGREES = 0.5
+BATCH_SIZE = 10000
+
+
+def random_location(rng):
+    """Returns a coordinate, 80% of them inside the dense city cluster"""
+    if rng.random() < 0.8:
+        return (
+            CITY_CENTER[0] + rng.uniform(-CITY_SPREAD_DEGREES, CITY_SPREAD_DEGREES),
+            CITY_CENTER[1] + rng.uniform(-CITY_SPREAD_DEGREES, CITY_SPREAD_DEGREES)
+        )
+    return rng.uniform(-80, 80), rng.uniform(-179, 179)
+
+
+def seed(event_count, rng):
+    """
+    Bulk inserts synthetic events with coordinates
+
+    Args:
+        event_count: Number of events to create
+        rng: Random number generator
+    """
+    host = User(name="Bench Host", email=f"bench-geo-{datetime.now().timestamp()}@gathr.test",
+                password_hash="x")
+    db_session.add(host)
+    db_session.commit()
+
+    now = datetime.now()
+    for start in range(0, event_count, BATCH_SIZE):
+        rows = []
+        for i in range(start, min(start + BATCH_SIZE, event_count)):
+            latitude, longitude = random_location(rng)
+            date = now + timedelta(hours=i % 2000)
+            rows.append({
+                "title": f"Bench event {i}", "description": "Synthetic event",
+                "date": date, "time": date, "location": "Somewhere", "capacity": 50,
+                "categories": ["social"], "creator_id": host.id,
+                "latitude": latitude, "longitude": longitude,
+                "geohash": encode_geohash(latitude, longitude)
+            })
+        db_session.execute(insert(Event), rows)
+        db_session.commit()
+
+
+if __name__ == '__main__':
+    event_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    radius_km = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    rng = random.Random(42)
+
+    init_db()
+    seed(event_count, rng)
+    db_session.execute(Event.__table__.select().limit(0))  # Warm the connection
+
+    centers = [random_location(rng) for _ in range(200)]
+    matches = []
+
+    def call():
+        # Same shape as GET /api/events?near=: total count, then the first
+        # page ordered by distance
+        latitude, longitude = centers[len(matches) % len(centers)]
+        query, distance = apply_nearby_filter(db_session.query(Event), db_session, latitude, longitude, radius_km)
+        query = query.order_by(distance)
+        total = query.count()
+        query.add_columns(distance).limit(50).all()
+        matches.append(total)
+
+    samples = time_calls(call, runs=200)
+    report(f"nearby events ({event_count} events, {radius_km}km)", samples)
+    print(f"average matches per query: {sum(matches) / len(matches):.1f}")
@@ -0,0 +1,120 @@
+"""
+@file bench_room_registry.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Benchmark for the Socket.IO room registry
+
+Simulates 100k connections churning through event rooms (joins,
+rejoins, leaves and disconnects) against RoomRegistry and against the
+previous dict-of-lists bookkeeping, and reports throughput of each.
+No database or Socket.IO server is needed.
+
+Usage:
+    python bench_room_registry.py [connections] [rooms] [operations]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rooms import RoomRegistry
+
+
+class ListRooms:
+    """The previous dict-of-lists room bookkeeping, kept as a baseline"""
+
+    def __init__(self):
+        self.active_rooms = {}
+
+    def join(self, sid, room):
+        self.active_rooms.setdefault(room, []).append(sid)
+
+    def leave(self, sid, room):
+        if room in self.active_rooms and sid in self.active_rooms[room]:
+            self.active_rooms[room].remove(sid)
+            if not self.active_rooms[room]:
+                del self.active_rooms[room]
+
+    def remove_sid(self, sid):
+        for room_id, users in list(self.active_rooms.items()):
+            if sid in users:
+                users.remove(sid)
+                if not users:
+                    del self.active_rooms[room_id]
+
+    def room_size(self, room):
+        return len(self.active_rooms.get(room, ()))
+
+
+def make_workload(connections, rooms, operations, seed=1):
+    """
+    Builds a reproducible churn workload
+
+    Every connection joins a few rooms up front; the churn phase then
+    mixes joins (including rejoins), leaves, size queries, and
+    disconnects followed by reconnects.
+
+    Returns:
+        Tuple of (warm-up operations, churn operations)
+    """
+    rng = random.Random(seed)
+    hot_rooms = max(1, rooms // 100)
+
+    def pick_room():
+        # A few hot rooms (events about to start) and a long tail
+        if rng.random() < 0.3:
+            return f"event-{rng.randrange(hot_rooms)}"
+        return f"event-{rng.randrange(rooms)}"
+
+    warmup = [("join", f"sid-{c}", pick_room()) for c in range(connections) for _ in range(3)]
+
+    churn = []
+    for _ in range(operations):
+        sid = f"sid-{rng.randrange(connections)}"
+        roll = rng.random()
+        if roll < 0.4:
+            churn.append(("join", sid, pick_room()))
+        elif roll < 0.7:
+            churn.append(("leave", sid, pick_room()))
+        elif roll < 0.9:
+            churn.append(("size", sid, pick_room()))
+        else:
+            churn.append(("disconnect", sid, None))
+    return warmup, churn
+
+
+def run(registry, operations):
+    """Applies operations to a registry and returns elapsed seconds"""
+    start = time.perf_counter()
+    for operation, sid, room in operations:
+        if operation == "join":
+            registry.join(sid, room)
+        elif operation == "leave":
+            registry.leave(sid, room)
+        elif operation == "size":
+            registry.room_size(room)
+        else:
+            registry.remove_sid(sid)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rooms = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    operations = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+
+    warmup, churn = make_workload(connections, rooms, operations)
+
+    registry = RoomRegistry()
+    run(registry, warmup)
+    elapsed = run(registry, churn)
+    print(f"RoomRegistry: {len(churn) / elapsed:12,.0f} ops/s ({elapsed:.2f}s for {len(churn):,} ops)")
+
+    # The baseline scans every room per disconnect, so give it a slice
+    baseline_ops = churn[: max(1, len(churn) // 100)]
+    baseline = ListRooms()
+    run(baseline, warmup)
+    elapsed = run(baseline, baseline_ops)
+    print(f"dict of lists: {len(baseline_ops) / elapsed:12,.0f} ops/s ({elapsed:.2f}s for {len(baseline_ops):,} ops)")
@@ -0,0 +1,77 @@
+"""
+@file bench_upcoming_events.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Benchmark for GET /api/events/upcoming
+
+Seeds a user with hundreds of past events (half of them still waiting
+for feedback) plus upcoming bookings and created events, then measures
+endpoint latency and the number of SQL statements per request.
+
+Usage:
+    DATABASE_URL=postgresql://... python bench_upcoming_events.py [past_events]
+"""
+import sys
+from datetime import datetime, timedelta
+
+from common import auth_headers, count_queries, report, time_calls
+
+from app import app
+from database import db_session, engine, init_db
+from models import User, Event, Attendance, Feedback
+
+
+def seed(past_events):
+    """
+    Create the benchmark user and their event history
+
+    Args:
+        past_events: Number of past events the user attended
+
+    Returns:
+        ID of the benchmark user
+    """
+    now = datetime.now()
+    user = User(name="Bench User", email=f"bench-upcoming-{now.timestamp()}@gathr.test",
+                password_hash="x", personality_tags=["adventurous", "social"])
+    host = User(name="Bench Host", email=f"bench-host-{now.timestamp()}@gathr.test",
+                password_hash="x")
+    db_session.add_all([user, host])
+    db_session.flush()
+
+    def make_event(creator_id, date):
+        return Event(title="Bench event", description="Synthetic event", date=date,
+                     time=date, location="Bench Hall", capacity=100,
+                     categories=["music", "social"], creator_id=creator_id)
+
+    past = [make_event(host.id, now - timedelta(days=i + 1)) for i in range(past_events)]
+    upcoming = [make_event(host.id, now + timedelta(days=i + 1)) for i in range(20)]
+    created = [make_event(user.id, now + timedelta(days=i + 1)) for i in range(10)]
+    db_session.add_all(past + upcoming + created)
+    db_session.flush()
+
+    db_session.add_all(Attendance(user_id=user.id, event_id=e.id) for e in past + upcoming)
+    db_session.add_all(
+        Feedback(event_id=e.id, user_id=user.id, rating=5)
+        for e in past[: past_events // 2]
+    )
+    db_session.commit()
+    return user.id
+
+
+if __name__ == '__main__':
+    past_events = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    init_db()
+    user_id = seed(past_events)
+    headers = auth_headers(app, user_id)
+    client = app.test_client()
+
+    def call():
+        response = client.get('/api/events/upcoming', headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    with count_queries(engine) as queries:
+        call()
+
+    report(f"upcoming events ({past_events} past)", time_calls(call), queries["count"])
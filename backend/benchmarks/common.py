@@ -0,0 +1,103 @@
+"""
+@file common.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Shared helpers for the Gathr backend benchmarks
+
+The benchmark scripts seed data directly through the ORM and then drive
+the real Flask endpoints through the test client, so the numbers include
+JWT handling, query execution and JSON serialization.
+
+Point DATABASE_URL at a disposable database before running them: they
+create tables and insert synthetic rows.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy import event
+
+# Make the backend modules importable when running from this directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@contextmanager
+def count_queries(engine):
+    """
+    Count SQL statements executed on an engine inside the block
+
+    Args:
+        engine: SQLAlchemy engine to observe
+
+    Yields:
+        Dictionary whose "count" key holds the number of statements run
+    """
+    counter = {"count": 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def auth_headers(app, user_id):
+    """
+    Build an Authorization header for a user
+
+    Args:
+        app: Flask application
+        user_id: ID of the user to authenticate as
+
+    Returns:
+        Dictionary of request headers
+    """
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def time_calls(func, runs=50, warmup=5):
+    """
+    Time repeated calls of a function
+
+    Args:
+        func: Zero-argument callable to time
+        runs: Number of timed calls
+        warmup: Number of untimed calls made first
+
+    Returns:
+        NumPy array of latencies in milliseconds
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.array(samples)
+
+
+def report(name, samples, queries=None):
+    """
+    Print a one-line latency summary
+
+    Args:
+        name: Label for the measurement
+        samples: Latencies in milliseconds
+        queries: Optional number of SQL statements per call
+    """
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    line = f"{name:<40} p50={p50:8.2f}ms p95={p95:8.2f}ms p99={p99:8.2f}ms"
+    if queries is not None:
+        line += f" queries={queries}"
+    print(line)
@@ -0,0 +1,106 @@
+"""
+@file explain_event_filters.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Query plan check for the multi-facet event filters
+
+Seeds a catalog of events, compiles a categories + date window filter
+exactly as GET /api/events does, and asserts that PostgreSQL's plan
+uses the GIN index on events.categories and the B-tree index on
+events.date. Exits non-zero if either index is missing from the plan.
+
+Usage:
+    DATABASE_URL=postgresql://... python explain_event_filters.py [events]
+"""
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+from werkzeug.datastructures import MultiDict
+
+from common import report, time_calls
+
+from database import db_session, engine, init_db
+from event_filters import parse_event_filters, apply_event_filters
+from models import User, Event
+
+CATEGORIES = [f"category-{i}" for i in range(200)]
+BATCH_SIZE = 10000
+
+
+def seed(event_count, rng):
+    """
+    Bulk inserts events spread over two years with random categories
+
+    Args:
+        event_count: Number of events to create
+        rng: Random number generator
+    """
+    host = User(name="Bench Host", email=f"bench-filters-{datetime.now().timestamp()}@gathr.test",
+                password_hash="x")
+    db_session.add(host)
+    db_session.commit()
+
+    now = datetime.now()
+    for start in range(0, event_count, BATCH_SIZE):
+        rows = []
+        for i in range(start, min(start + BATCH_SIZE, event_count)):
+            date = now + timedelta(minutes=rng.randrange(0, 2 * 365 * 24 * 60))
+            rows.append({
+                "title": f"Bench event {i}", "description": "Synthetic event",
+                "date": date, "time": date, "location": "Somewhere", "capacity": 50,
+                "categories": rng.sample(CATEGORIES, 3), "creator_id": host.id
+            })
+        db_session.execute(insert(Event), rows)
+        db_session.commit()
+
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE events"))
+
+
+def plan_indexes(plan):
+    """Collects every index name referenced in an EXPLAIN (FORMAT JSON) plan"""
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= plan_indexes(child)
+    return names
+
+
+if __name__ == '__main__':
+    event_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    rng = random.Random(7)
+
+    if engine.dialect.name != 'postgresql':
+        print("FAIL: the plan check needs PostgreSQL (set DATABASE_URL)")
+        sys.exit(1)
+
+    init_db()
+    seed(event_count, rng)
+
+    window_start = datetime.now() + timedelta(days=30)
+    args = MultiDict({
+        "categories": "category-3,category-42",
+        "categoryMatch": "all",
+        "dateFrom": window_start.date().isoformat(),
+        "dateTo": (window_start + timedelta(days=7)).date().isoformat()
+    })
+    query = apply_event_filters(db_session.query(Event.id), db_session, parse_event_filters(args))
+
+    compiled = query.statement.compile(engine, compile_kwargs={"literal_binds": True})
+    plan_json = db_session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    plan = (json.loads(plan_json) if isinstance(plan_json, str) else plan_json)[0]["Plan"]
+    used = plan_indexes(plan)
+    print(f"indexes used: {sorted(used)}")
+
+    samples = time_calls(lambda: query.all())
+    report(f"filtered events ({event_count} events)", samples)
+
+    missing = {"ix_events_categories", "ix_events_date"} - used
+    if missing:
+        print(f"FAIL: plan does not use {sorted(missing)}")
+        sys.exit(1)
+    print("OK: category GIN index and date B-tree index are used")
@@ -0,0 +1,423 @@
+"""
+@file loadtest.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+End-to-end load test against a seeded database
+
+Virtual users, each authenticated with its own JWT, loop over weighted
+scenarios until the run ends:
+- browse: GET /api/events (a random page), /api/events/upcoming and
+  /api/circle
+- book: POST /api/events/<id>/book on one of the small hot events, then
+  cancel half of the successful bookings so seats keep churning
+- chat: over a persistent Socket.IO connection, send a direct message to
+  a circle member in a shared room and wait for message_stored
+
+A --spike window switches every virtual user to booking at once. The
+report gives count, errors (5xx, exceptions and timeouts), p50/p95/p99
+latency and throughput per endpoint. --save-baseline stores it as JSON
+and --baseline compares a run against a stored one.
+
+By default requests go through the Flask and Socket.IO test clients in
+this process (use a file-based SQLite database or Postgres, seeded with
+seed.py). With --url they go to a running server instead; JWT_SECRET_KEY
+and DATABASE_URL must then match the server's, since tokens are minted
+and user IDs read locally.
+
+Usage:
+    DATABASE_URL=sqlite:///gathr_load.db python loadtest.py [--duration S]
+        [--users N] [--mix browse=6,book=2,chat=2] [--think-ms MS]
+        [--spike START:SECONDS] [--url URL] [--save-baseline FILE]
+        [--baseline FILE] [--max-regression PCT]
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import select
+
+import common  # noqa: F401  (makes the backend importable)
+
+from app import app, socketio
+from database import db_session
+from flask_jwt_extended import create_access_token
+from models import User, Event, Connection
+from seed import SEED_EMAIL_DOMAIN
+
+# Seconds to wait for message_stored or message_rejected
+CHAT_ACK_TIMEOUT = 10
+
+# Virtual users sharing each chat room
+CHAT_ROOM_SIZE = 10
+
+
+class Recorder:
+    """Collects latencies and errors per endpoint from many threads"""
+
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, latency, error=False):
+        """
+        Records one call
+
+        Args:
+            name: Endpoint label
+            latency: Seconds taken
+            error: Whether the call failed
+        """
+        with self._lock:
+            self._samples[name].append(latency * 1000)
+            if error:
+                self._errors[name] += 1
+
+    def summary(self, elapsed):
+        """
+        Summarizes the run
+
+        Args:
+            elapsed: Run length in seconds
+
+        Returns:
+            Dictionary of endpoint -> {count, errors, p50, p95, p99, rps}
+        """
+        with self._lock:
+            samples = {name: list(latencies) for name, latencies in self._samples.items()}
+            errors = dict(self._errors)
+        summary = {}
+        for name, latencies in sorted(samples.items()):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            summary[name] = {
+                "count": len(latencies),
+                "errors": errors.get(name, 0),
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+                "rps": round(len(latencies) / elapsed, 2)
+            }
+        return summary
+
+
+class LocalTransport:
+    """Calls the app in this process through the Flask and Socket.IO test clients"""
+
+    def __init__(self, token):
+        self._client = app.test_client()
+        self._headers = {"Authorization": f"Bearer {token}"}
+        self._token = token
+        self._socket = None
+        self._pending = []
+
+    def request(self, method, path, json=None):
+        """Returns the response status code"""
+        response = self._client.open(path, method=method, headers=self._headers, json=json)
+        db_session.remove()
+        return response.status_code
+
+    def connect(self, room):
+        self._socket = socketio.test_client(app, auth={"token": self._token})
+        self._socket.emit('join', {"room": room})
+
+    def send(self, data):
+        self._socket.emit('message', data)
+
+    def wait_for_ack(self, client_id, timeout):
+        """Returns the ack event name, or None on timeout"""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            self._pending.extend(
+                packet for packet in self._socket.get_received()
+                if packet["name"] in ('message_stored', 'message_rejected')
+            )
+            for packet in self._pending:
+                if packet["args"][0].get("clientId") == client_id:
+                    self._pending.remove(packet)
+                    return packet["name"]
+            time.sleep(0.002)
+        return None
+
+    def close(self):
+        if self._socket is not None and self._socket.is_connected():
+            self._socket.disconnect()
+
+
+class RemoteTransport:
+    """Calls a running server over HTTP and Socket.IO"""
+
+    def __init__(self, token, url):
+        import requests
+
+        self._url = url.rstrip('/')
+        self._token = token
+        self._session = requests.Session()
+        self._session.headers["Authorization"] = f"Bearer {token}"
+        self._socket = None
+        self._acks = {}
+        self._acks_lock = threading.Lock()
+
+    def request(self, method, path, json=None):
+        """Returns the response status code"""
+        return self._session.request(method, self._url + path, json=json, timeout=30).status_code
+
+    def connect(self, room):
+        import socketio as socketio_client
+
+        self._socket = socketio_client.Client()
+
+        def on_ack(name):
+            def handler(data):
+                with self._acks_lock:
+                    waiter = self._acks.get(data.get("clientId"))
+                if waiter:
+                    waiter[1] = name
+                    waiter[0].set()
+            return handler
+
+        self._socket.on('message_stored', on_ack('message_stored'))
+        self._socket.on('message_rejected', on_ack('message_rejected'))
+        self._socket.connect(self._url, auth={"token": self._token})
+        self._socket.emit('join', {"room": room})
+
+    def send(self, data):
+        with self._acks_lock:
+            self._acks[data["clientId"]] = [threading.Event(), None]
+        self._socket.emit('message', data)
+
+    def wait_for_ack(self, client_id, timeout):
+        """Returns the ack event name, or None on timeout"""
+        with self._acks_lock:
+            waiter = self._acks[client_id]
+        waiter[0].wait(timeout)
+        with self._acks_lock:
+            self._acks.pop(client_id, None)
+        return waiter[1]
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.disconnect()
+
+
+class VirtualUser:
+    """
+    One simulated user running scenarios in a loop
+
+    Attributes:
+        user_id: Seeded user acted as
+        circle: IDs of the user's connections (chat recipients)
+        room: Shared chat room joined on first chat
+    """
+
+    def __init__(self, user_id, circle, room, transport, recorder, hot_event_ids, rng):
+        self.user_id = user_id
+        self.circle = circle
+        self.room = room
+        self.transport = transport
+        self.recorder = recorder
+        self.hot_event_ids = hot_event_ids
+        self.rng = rng
+        self._connected = False
+        self._message_ids = itertools.count()
+
+    def call(self, name, method, path, json=None):
+        """Makes and records one HTTP call, returning its status code"""
+        start = time.perf_counter()
+        try:
+            status = self.transport.request(method, path, json=json)
+        except Exception as e:
+            self.recorder.record(name, time.perf_counter() - start, error=True)
+            print(f"{name} error: {str(e)}")
+            return None
+        self.recorder.record(name, time.perf_counter() - start, error=status >= 500)
+        return status
+
+    def browse(self):
+        self.call("GET /api/events", 'GET', f"/api/events?page={self.rng.randint(1, 5)}&limit=20")
+        self.call("GET /api/events/upcoming", 'GET', "/api/events/upcoming")
+        self.call("GET /api/circle", 'GET', "/api/circle")
+
+    def book(self):
+        if not self.hot_event_ids:
+            return
+        event_id = self.rng.choice(self.hot_event_ids)
+        status = self.call("POST /api/events/<id>/book", 'POST', f"/api/events/{event_id}/book")
+        if status == 201 and self.rng.random() < 0.5:
+            self.call("POST /api/events/<id>/cancel", 'POST', f"/api/events/{event_id}/cancel")
+
+    def chat(self):
+        if not self.circle:
+            return
+        start = time.perf_counter()
+        try:
+            if not self._connected:
+                self.transport.connect(self.room)
+                self._connected = True
+                self.recorder.record("socket connect", time.perf_counter() - start)
+                start = time.perf_counter()
+
+            client_id = f"{self.user_id}-{next(self._message_ids)}"
+            self.transport.send({
+                "room": self.room,
+                "recipientId": self.rng.choice(self.circle),
+                "content": "Load test message",
+                "clientId": client_id
+            })
+            ack = self.transport.wait_for_ack(client_id, CHAT_ACK_TIMEOUT)
+        except Exception as e:
+            self.recorder.record("socket message", time.perf_counter() - start, error=True)
+            print(f"socket message error: {str(e)}")
+            return
+        self.recorder.record("socket message", time.perf_counter() - start, error=ack is None)
+
+
+def parse_mix(mix):
+    """Parses "browse=6,book=2,chat=2" into scenario names and weights"""
+    weights = dict(
+        (name.strip(), float(weight)) for name, weight in (part.split('=') for part in mix.split(','))
+    )
+    unknown = set(weights) - {"browse", "book", "chat"}
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return list(weights), list(weights.values())
+
+
+def load_population(count):
+    """
+    Reads seeded users, their circles and the hot events
+
+    Returns:
+        Tuple of (list of (user ID, circle IDs), hot event IDs)
+    """
+    user_ids = db_session.execute(
+        select(User.id).where(User.email.like(f"%@{SEED_EMAIL_DOMAIN}")).order_by(User.id).limit(count)
+    ).scalars().all()
+    circles = defaultdict(list)
+    for user_id, connected_user_id in db_session.execute(
+        select(Connection.user_id, Connection.connected_user_id).where(Connection.user_id.in_(user_ids))
+    ):
+        circles[user_id].append(connected_user_id)
+    hot_event_ids = db_session.execute(
+        select(Event.id).where(Event.title.like("Hot event %")).order_by(Event.id)
+    ).scalars().all()
+    db_session.remove()
+    return [(user_id, circles[user_id]) for user_id in user_ids], list(hot_event_ids)
+
+
+def run(args):
+    """Runs the load test and returns the summary"""
+    scenarios, weights = parse_mix(args.mix)
+    population, hot_event_ids = load_population(args.users)
+    if not population:
+        print("No seeded users found; run seed.py first")
+        sys.exit(1)
+    if len(population) < args.users:
+        print(f"Only {len(population)} seeded users, running that many virtual users")
+
+    spike_start, spike_length = (float(value) for value in args.spike.split(':')) if args.spike else (None, 0)
+
+    recorder = Recorder()
+    with app.app_context():
+        tokens = [create_access_token(identity=str(user_id)) for user_id, _ in population]
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    def worker(index):
+        user_id, circle = population[index]
+        rng = random.Random(args.seed * 100003 + index)
+        transport = RemoteTransport(tokens[index], args.url) if args.url else LocalTransport(tokens[index])
+        user = VirtualUser(
+            user_id, circle, f"loadtest-{index // CHAT_ROOM_SIZE}",
+            transport, recorder, hot_event_ids, rng
+        )
+        try:
+            while time.perf_counter() < deadline:
+                offset = time.perf_counter() - started
+                if spike_start is not None and spike_start <= offset < spike_start + spike_length:
+                    user.book()
+                    continue
+                getattr(user, rng.choices(scenarios, weights)[0])()
+                if args.think_ms:
+                    time.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+        finally:
+            transport.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(len(population))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder.summary(time.perf_counter() - started)
+
+
+def print_summary(summary, baseline=None):
+    """Prints the per-endpoint table, with changes against a baseline"""
+    print(f"{'endpoint':<32} {'count':>7} {'errors':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>8}")
+    for name, stats in summary.items():
+        line = (f"{name:<32} {stats['count']:>7} {stats['errors']:>6} {stats['p50']:>7.2f}ms "
+                f"{stats['p95']:>7.2f}ms {stats['p99']:>7.2f}ms {stats['rps']:>8.2f}")
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += (f"  p95 {percent_change(previous['p95'], stats['p95']):+6.1f}%"
+                     f"  rps {percent_change(previous['rps'], stats['rps']):+6.1f}%")
+        print(line)
+
+
+def percent_change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+
+def regressions(summary, baseline, max_regression):
+    """Endpoints whose p95 grew or throughput fell by more than max_regression percent"""
+    found = []
+    for name, stats in summary.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if percent_change(previous['p95'], stats['p95']) > max_regression:
+            found.append(f"{name} p95")
+        if -percent_change(previous['rps'], stats['rps']) > max_regression:
+            found.append(f"{name} throughput")
+    return found
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test the Gathr backend against seeded data")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    parser.add_argument("--mix", default="browse=6,book=2,chat=2", help="scenario weights")
+    parser.add_argument("--think-ms", type=float, default=100, help="mean pause between scenarios")
+    parser.add_argument("--spike", help="START:SECONDS window in which every user books")
+    parser.add_argument("--url", help="base URL of a running server (default: in process)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--baseline", metavar="FILE")
+    parser.add_argument("--max-regression", type=float, default=None, metavar="PCT",
+                        help="exit non-zero if p95 or throughput regress more than PCT against --baseline")
+    args = parser.parse_args()
+
+    summary = run(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_summary(summary, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if baseline and args.max_regression is not None:
+        found = regressions(summary, baseline, args.max_regression)
+        if found:
+            print(f"FAIL: regressed beyond {args.max_regression}%: " + ", ".join(found))
+            sys.exit(1)
+        print(f"OK: no regression beyond {args.max_regression}%")
@@ -0,0 +1,225 @@
+"""
+@file seed.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Synthetic dataset generator for local load testing
+
+Seeds users with personality tags, events spread around today (some
+starting within 24 hours, a few small "hot" events for booking spikes),
+attendances, circle connections and messages, using batched bulk
+inserts. The generator is deterministic for a given --seed.
+
+Every seeded user's password is SEED_PASSWORD (hashed once and shared,
+since hashing per user would dominate seeding time). Seeded emails end
+in @seed.gathr.test and hot events are titled "Hot event N", which is
+how loadtest.py finds them.
+
+Works against Postgres or SQLite (e.g. DATABASE_URL=sqlite:///gathr_load.db).
+Point DATABASE_URL at a disposable database: --reset drops every table.
+
+Usage:
+    python seed.py [--users N] [--events N] [--attendances-per-user N]
+                   [--connections-per-user N] [--messages N] [--hot-events N]
+                   [--seed N] [--reset]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import common  # noqa: F401  (makes the backend importable)
+
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from database import Base, engine, db_session, init_db
+from geo import encode_geohash
+from models import User, Event, Attendance, Connection, Message
+
+# Password of every seeded user
+SEED_PASSWORD = "loadtest-password"
+
+# Email domain marking seeded users
+SEED_EMAIL_DOMAIN = "seed.gathr.test"
+
+# Rows per bulk INSERT
+SEED_BATCH_SIZE = 5000
+
+PERSONALITY_TAGS = [
+    "adventurous", "social", "creative", "analytical", "calm", "outdoorsy",
+    "music lover", "foodie", "bookworm", "tech enthusiast", "sporty", "artistic"
+]
+
+EVENT_CATEGORIES = [
+    "music", "outdoor", "food", "tech", "art", "sports", "books",
+    "networking", "wellness", "nightlife", "social", "creative"
+]
+
+EVENT_KINDS = ["Meetup", "Workshop", "Night", "Hike", "Tasting", "Jam", "Talk", "Social"]
+
+# Venues are scattered around this point
+CITY_CENTER = (37.7749, -122.4194)
+
+
+def insert_returning_ids(model, rows):
+    """
+    Bulk inserts rows in batches
+
+    Args:
+        model: Mapped class
+        rows: List of column dictionaries
+
+    Returns:
+        List of new primary keys, aligned with rows
+    """
+    ids = []
+    for start in range(0, len(rows), SEED_BATCH_SIZE):
+        ids.extend(db_session.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            rows[start:start + SEED_BATCH_SIZE]
+        ).scalars().all())
+        db_session.commit()
+    return ids
+
+
+def insert_rows(model, rows):
+    """Bulk inserts rows in batches without fetching keys"""
+    for start in range(0, len(rows), SEED_BATCH_SIZE):
+        db_session.execute(insert(model), rows[start:start + SEED_BATCH_SIZE])
+        db_session.commit()
+
+
+def seed(users, events, attendances_per_user, connections_per_user, messages, hot_events, rng_seed):
+    """
+    Generates and inserts the synthetic dataset
+
+    Returns:
+        Dictionary of row counts per table
+    """
+    rng = random.Random(rng_seed)
+    now = datetime.now()
+    run = int(time.time())
+
+    password_hash = generate_password_hash(SEED_PASSWORD)
+    user_rows = []
+    for i in range(users):
+        tested = rng.random() < 0.85
+        user_rows.append({
+            "name": f"Seed User {i}",
+            "email": f"user{i}-{run}@{SEED_EMAIL_DOMAIN}",
+            "password_hash": password_hash,
+            "has_completed_personality_test": tested,
+            "personality_tags": rng.sample(PERSONALITY_TAGS, rng.randint(2, 5)) if tested else [],
+            "tier": rng.choices(["free", "premium", "enterprise"], weights=[85, 12, 3])[0],
+            "created_at": now - timedelta(days=rng.randint(0, 365)),
+            "last_active": now - timedelta(days=rng.expovariate(1 / 7))
+        })
+    user_ids = insert_returning_ids(User, user_rows)
+
+    event_rows = []
+    for i in range(events):
+        hot = i < hot_events
+        # Mostly upcoming, some past, and a slice starting within 24 hours
+        if hot or rng.random() < 0.1:
+            date = now + timedelta(hours=rng.uniform(1, 23))
+        else:
+            date = now + timedelta(days=rng.uniform(-30, 60))
+        latitude = CITY_CENTER[0] + rng.gauss(0, 0.08)
+        longitude = CITY_CENTER[1] + rng.gauss(0, 0.08)
+        categories = rng.sample(EVENT_CATEGORIES, rng.randint(1, 4))
+        event_rows.append({
+            "title": f"Hot event {i}" if hot else f"{categories[0].title()} {rng.choice(EVENT_KINDS)} {i}",
+            "description": f"A synthetic {' and '.join(categories)} event for load testing.",
+            "date": date,
+            "time": date,
+            "location": f"Venue {rng.randint(1, 500)}",
+            "image_url": "",
+            "capacity": rng.randint(10, 30) if hot else rng.randint(20, 500),
+            "categories": categories,
+            "latitude": latitude,
+            "longitude": longitude,
+            "geohash": encode_geohash(latitude, longitude),
+            "creator_id": rng.choice(user_ids)
+        })
+    event_ids = insert_returning_ids(Event, event_rows)
+
+    # Attendances within capacity; hot events start empty for booking spikes
+    seats = {event_id: row["capacity"] for event_id, row in zip(event_ids, event_rows)}
+    bookable = event_ids[hot_events:]
+    attendance_rows = []
+    for user_id in user_ids:
+        if not bookable:
+            break
+        for event_id in rng.sample(bookable, min(attendances_per_user, len(bookable))):
+            if seats[event_id] > 0:
+                seats[event_id] -= 1
+                attendance_rows.append({
+                    "user_id": user_id,
+                    "event_id": event_id,
+                    "registered_at": now - timedelta(days=rng.uniform(0, 30))
+                })
+    insert_rows(Attendance, attendance_rows)
+
+    connection_rows = []
+    circles = {}
+    for user_id in user_ids:
+        others = rng.sample(user_ids, min(connections_per_user + 1, len(user_ids)))
+        circle = [other for other in others if other != user_id][:connections_per_user]
+        circles[user_id] = circle
+        connection_rows.extend(
+            {"user_id": user_id, "connected_user_id": other, "created_at": now - timedelta(days=rng.randint(0, 180))}
+            for other in circle
+        )
+    insert_rows(Connection, connection_rows)
+
+    # Messages between circle members, newest within the last week
+    message_rows = []
+    senders = [user_id for user_id, circle in circles.items() if circle]
+    for _ in range(messages if senders else 0):
+        sender_id = rng.choice(senders)
+        sent_at = now - timedelta(minutes=rng.uniform(0, 7 * 24 * 60))
+        message_rows.append({
+            "sender_id": sender_id,
+            "recipient_id": rng.choice(circles[sender_id]),
+            "content": f"Synthetic message {rng.randint(0, 10 ** 6)}",
+            "sent_at": sent_at,
+            "read_at": sent_at + timedelta(minutes=5) if rng.random() < 0.7 else None
+        })
+    message_rows.sort(key=lambda row: row["sent_at"])
+    insert_rows(Message, message_rows)
+
+    return {
+        "users": len(user_rows),
+        "events": len(event_rows),
+        "attendances": len(attendance_rows),
+        "connections": len(connection_rows),
+        "messages": len(message_rows)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Seed a local database with synthetic Gathr data")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--attendances-per-user", type=int, default=5)
+    parser.add_argument("--connections-per-user", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--hot-events", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate every table first")
+    args = parser.parse_args()
+
+    if args.reset:
+        print(f"Dropping all tables on {engine.url.render_as_string(hide_password=True)}")
+        Base.metadata.drop_all(bind=engine)
+    init_db()
+
+    start = time.perf_counter()
+    counts = seed(
+        args.users, args.events, args.attendances_per_user,
+        args.connections_per_user, args.messages, args.hot_events, args.seed
+    )
+    elapsed = time.perf_counter() - start
+    print(", ".join(f"{count:,} {table}" for table, count in counts.items()) + f" in {elapsed:.1f}s")
+    sys.exit(0)
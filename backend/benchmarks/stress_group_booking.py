@@ -0,0 +1,126 @@
+"""
+@file stress_group_booking.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Concurrent stress test for group bookings
+
+Many threads race to group-book their circle into one small event
+through POST /api/events/group-book. Afterwards the script checks that
+every response was 201 (booked) or 409 (rejected), that capacity was
+never exceeded, that every group was booked completely or not at all,
+and that groups were only turned away once too few seats were left.
+Exits non-zero on any violation. Needs PostgreSQL: SQLite ignores the
+row locks the reservation relies on.
+
+Usage:
+    DATABASE_URL=postgresql://... python stress_group_booking.py [groups] [group_size] [capacity]
+"""
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from common import auth_headers
+
+from app import app
+from database import db_session, engine, init_db
+from models import User, Event, Attendance, Connection
+
+
+def seed(groups, group_size, capacity):
+    """
+    Creates the event and, per group, a leader with a circle of friends
+
+    Returns:
+        Tuple of (event ID, list of (leader ID, member IDs))
+    """
+    stamp = datetime.now().timestamp()
+    users = [
+        User(name=f"Stress {i}", email=f"stress-{stamp}-{i}@gathr.test", password_hash="x")
+        for i in range(groups * group_size)
+    ]
+    db_session.add_all(users)
+    db_session.flush()
+
+    date = datetime.now() + timedelta(days=3)
+    event = Event(title="Stress event", description="Popular event", date=date, time=date,
+                  location="Arena", capacity=capacity, categories=["music"],
+                  creator_id=users[0].id)
+    db_session.add(event)
+    db_session.flush()
+
+    teams = []
+    for g in range(groups):
+        members = [user.id for user in users[g * group_size:(g + 1) * group_size]]
+        leader = members[0]
+        db_session.add_all(Connection(user_id=leader, connected_user_id=m) for m in members[1:])
+        teams.append((leader, members))
+    db_session.commit()
+    return event.id, teams
+
+
+if __name__ == '__main__':
+    groups = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    group_size = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    capacity = int(sys.argv[3]) if len(sys.argv) > 3 else 60
+
+    if engine.dialect.name != 'postgresql':
+        print("FAIL: the stress test needs PostgreSQL row locks (set DATABASE_URL)")
+        sys.exit(1)
+
+    init_db()
+    event_id, teams = seed(groups, group_size, capacity)
+    outcomes = {}
+    barrier = threading.Barrier(len(teams))
+
+    def book(leader, members):
+        client = app.test_client()
+        headers = auth_headers(app, leader)
+        barrier.wait()
+        response = client.post('/api/events/group-book', headers=headers,
+                               json={"eventId": event_id, "userIds": members})
+        outcomes[leader] = response.status_code
+        db_session.remove()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=book, args=team) for team in teams]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    booked = dict(
+        db_session.query(Attendance.user_id, func.count(Attendance.id))
+        .filter(Attendance.event_id == event_id)
+        .group_by(Attendance.user_id)
+    )
+    total = sum(booked.values())
+    succeeded = sum(1 for status in outcomes.values() if status == 201)
+
+    print(f"{len(teams)} concurrent groups of {group_size} in {elapsed:.2f}s: "
+          f"{succeeded} booked, {len(teams) - succeeded} rejected, {total}/{capacity} seats")
+
+    failures = []
+    unexpected = sorted({status for status in outcomes.values() if status not in (201, 409)})
+    if unexpected or len(outcomes) != len(teams):
+        failures.append(f"unexpected responses {unexpected} ({len(outcomes)}/{len(teams)} answered)")
+    if succeeded != min(len(teams), capacity // group_size):
+        failures.append(f"{succeeded} groups booked, expected {min(len(teams), capacity // group_size)}")
+    if total > capacity:
+        failures.append("capacity exceeded")
+    if any(count > 1 for count in booked.values()):
+        failures.append("duplicate attendance rows")
+    for leader, members in teams:
+        seats = sum(1 for member in members if member in booked)
+        if seats not in (0, len(members)):
+            failures.append(f"partial booking for group led by {leader}")
+        if (seats == len(members)) != (outcomes.get(leader) == 201):
+            failures.append(f"response does not match bookings for group led by {leader}")
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK: no overbooking and no partial groups")
@@ -0,0 +1,329 @@
+"""
+@file booking.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Booking Module
+
+This module reserves event seats transactionally. A reservation covers
+any number of (event, user) pairs: the events involved are row-locked in
+id order, capacity and existing bookings are checked with one query
+each, and all new attendances are inserted in bulk. Either every seat is
+reserved or none is. New attendees get their messaging grants (see
+messaging.py) in the same transaction.
+
+Full events keep a position-ordered waitlist. Cancelling a booking
+promotes the head of the waitlist in the same transaction. Each event
+counts the positions handed out and the positions served, so a user's
+place in the queue never needs a count of the entries ahead.
+"""
+from collections import Counter
+
+from sqlalchemy import func, insert, tuple_, update
+
+from messaging import top_up_messaging_grants
+from models import Event, Attendance, Connection, WaitlistEntry
+
+# Per-item booking outcomes
+BOOKED = "booked"
+ALREADY_BOOKED = "already_booked"
+EVENT_NOT_FOUND = "event_not_found"
+NOT_PERMITTED = "not_permitted"
+INSUFFICIENT_CAPACITY = "insufficient_capacity"
+NOT_BOOKED = "not_booked"
+
+# Waitlist outcomes
+WAITLISTED = "waitlisted"
+ALREADY_WAITLISTED = "already_waitlisted"
+SEATS_AVAILABLE = "seats_available"
+
+def parse_id(value, name):
+    """
+    Validates an ID from a request body
+
+    Args:
+        value: Integer or digit string
+        name: Description used in the error message
+
+    Returns:
+        The ID as an integer
+
+    Raises:
+        ValueError: If value is not a non-negative integer ID
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdigit():
+        raise ValueError(f"{name} must be an integer ID")
+    return int(value)
+
+def parse_id_list(values, name):
+    """
+    Validates a list of IDs from a request body
+
+    Args:
+        values: List of integers or digit strings
+        name: Field name used in the error message
+
+    Returns:
+        List of integer IDs
+
+    Raises:
+        ValueError: If values is not a non-empty list of IDs
+    """
+    if not isinstance(values, list) or not values:
+        raise ValueError(f"{name} must be a non-empty list of IDs")
+    return [parse_id(value, f"Every entry of {name}") for value in values]
+
+def bookable_user_ids(session, current_user_id, user_ids):
+    """
+    Filters user IDs down to those the current user may book for
+
+    A user may book for themselves and for members of their Gathr circle.
+
+    Args:
+        session: Database session
+        current_user_id: ID of the booking user
+        user_ids: Candidate user IDs
+
+    Returns:
+        Set of permitted user IDs
+    """
+    # JWT identities are strings; user IDs are compared as integers
+    current_user_id = int(current_user_id)
+    user_ids = {int(user_id) for user_id in user_ids}
+    others = user_ids - {current_user_id}
+    permitted = {current_user_id} & user_ids
+    if others:
+        permitted |= {
+            user_id for (user_id,) in session.query(Connection.connected_user_id).filter(
+                Connection.user_id == current_user_id,
+                Connection.connected_user_id.in_(others)
+            )
+        }
+    return permitted
+
+def reserve_seats(session, items, permitted_user_ids=None):
+    """
+    Books a set of (event, user) pairs in one all-or-nothing transaction
+
+    Pairs that are already booked are reported and skipped. If any other
+    pair cannot be booked, nothing is booked. Booked users leave the
+    waitlists of those events.
+
+    Args:
+        session: Database session (committed or rolled back here)
+        items: List of (event_id, user_id) pairs
+        permitted_user_ids: Optional set of users the caller may book for
+
+    Returns:
+        Tuple of (success flag, list of per-item result dictionaries)
+    """
+    items = list(dict.fromkeys((int(event_id), int(user_id)) for event_id, user_id in items))
+    event_ids = sorted({event_id for event_id, _ in items})
+
+    try:
+        # Lock the events in id order so concurrent reservations serialize
+        # without deadlocking
+        events = {
+            event.id: event for event in
+            session.query(Event).filter(Event.id.in_(event_ids)).order_by(Event.id).with_for_update()
+        }
+
+        # Current bookings per event and already-booked pairs, one query each
+        booked_counts = dict(
+            session.query(Attendance.event_id, func.count(Attendance.id))
+            .filter(Attendance.event_id.in_(event_ids))
+            .group_by(Attendance.event_id)
+        )
+        already_booked = set(
+            session.query(Attendance.event_id, Attendance.user_id).filter(
+                tuple_(Attendance.event_id, Attendance.user_id).in_(items)
+            )
+        )
+
+        results = []
+        for event_id, user_id in items:
+            if event_id not in events:
+                status = EVENT_NOT_FOUND
+            elif permitted_user_ids is not None and user_id not in permitted_user_ids:
+                status = NOT_PERMITTED
+            elif (event_id, user_id) in already_booked:
+                status = ALREADY_BOOKED
+            else:
+                status = BOOKED
+            results.append({"eventId": event_id, "userId": user_id, "status": status})
+
+        # Single capacity check per event for all requested seats
+        requested = Counter(result["eventId"] for result in results if result["status"] == BOOKED)
+        full_events = {
+            event_id for event_id, seats in requested.items()
+            if booked_counts.get(event_id, 0) + seats > (events[event_id].capacity or 0)
+        }
+        for result in results:
+            if result["status"] == BOOKED and result["eventId"] in full_events:
+                result["status"] = INSUFFICIENT_CAPACITY
+
+        success = all(result["status"] in (BOOKED, ALREADY_BOOKED) for result in results)
+        new_attendances = [
+            {"event_id": result["eventId"], "user_id": result["userId"]}
+            for result in results if result["status"] == BOOKED
+        ]
+        if not success or not new_attendances:
+            session.rollback()
+            if not success:
+                # Nothing was booked, including the otherwise valid items
+                for result in results:
+                    if result["status"] == BOOKED:
+                        result["status"] = NOT_BOOKED
+            return success, results
+
+        session.execute(insert(Attendance), new_attendances)
+
+        # A booked user no longer waits for the event
+        session.query(WaitlistEntry).filter(
+            tuple_(WaitlistEntry.event_id, WaitlistEntry.user_id).in_(
+                [(row["event_id"], row["user_id"]) for row in new_attendances]
+            )
+        ).delete(synchronize_session=False)
+
+        # New attendees draw their messaging grants along with the seat
+        for row in new_attendances:
+            top_up_messaging_grants(session, row["user_id"], row["event_id"])
+        session.commit()
+        return True, results
+    except Exception:
+        session.rollback()
+        raise
+
+def join_waitlist(session, event_id, user_id):
+    """
+    Queues a user for a full event
+
+    Args:
+        session: Database session (committed here)
+        event_id: ID of the event
+        user_id: ID of the user
+
+    Returns:
+        Tuple of (status, place in the queue or None); status is one of
+        WAITLISTED, ALREADY_WAITLISTED, SEATS_AVAILABLE, ALREADY_BOOKED
+        or EVENT_NOT_FOUND. The place counts users who joined earlier and
+        are not served yet, including any who have left since.
+    """
+    try:
+        existing = (
+            session.query(WaitlistEntry.position, Event.waitlist_served)
+            .join(Event, Event.id == WaitlistEntry.event_id)
+            .filter(WaitlistEntry.event_id == event_id, WaitlistEntry.user_id == user_id)
+            .first()
+        )
+        if existing:
+            session.rollback()
+            return ALREADY_WAITLISTED, existing.position - existing.waitlist_served
+
+        if session.query(Attendance.id).filter_by(event_id=event_id, user_id=user_id).first():
+            session.rollback()
+            return ALREADY_BOOKED, None
+
+        # Only full events have a waitlist; checked under the event row lock
+        # so a cancellation cannot free a seat in between
+        event = session.query(Event).filter(Event.id == event_id).with_for_update().first()
+        if not event:
+            session.rollback()
+            return EVENT_NOT_FOUND, None
+        booked = session.query(func.count(Attendance.id)).filter(Attendance.event_id == event_id).scalar()
+        if booked < (event.capacity or 0):
+            session.rollback()
+            return SEATS_AVAILABLE, None
+
+        # Atomically hand out the next position from the per-event counter
+        position = session.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            .values(waitlist_seq=Event.waitlist_seq + 1)
+            .returning(Event.waitlist_seq)
+        ).scalar()
+
+        session.add(WaitlistEntry(event_id=event_id, user_id=user_id, position=position))
+        rank = position - event.waitlist_served
+        session.commit()
+        return WAITLISTED, rank
+    except Exception:
+        session.rollback()
+        raise
+
+def leave_waitlist(session, event_id, user_id):
+    """
+    Removes a user from an event's waitlist
+
+    Args:
+        session: Database session (committed here)
+        event_id: ID of the event
+        user_id: ID of the user
+
+    Returns:
+        True if the user was waiting
+    """
+    removed = session.query(WaitlistEntry).filter_by(
+        event_id=event_id, user_id=user_id
+    ).delete(synchronize_session=False)
+    session.commit()
+    return removed > 0
+
+def cancel_booking(session, event_id, user_id):
+    """
+    Cancels a booking and promotes the head of the waitlist
+
+    Both happen in one transaction under the event row lock, so the
+    freed seat cannot be taken by a concurrent direct booking first.
+
+    Args:
+        session: Database session (committed here)
+        event_id: ID of the event
+        user_id: ID of the cancelling user
+
+    Returns:
+        Tuple of (cancelled flag, promoted user ID or None)
+    """
+    try:
+        event = session.query(Event).filter(Event.id == event_id).with_for_update().first()
+        if not event:
+            session.rollback()
+            return False, None
+
+        cancelled = session.query(Attendance).filter_by(
+            event_id=event_id, user_id=user_id
+        ).delete(synchronize_session=False)
+        if not cancelled:
+            session.rollback()
+            return False, None
+
+        promoted_user_id = None
+        booked = session.query(func.count(Attendance.id)).filter(Attendance.event_id == event_id).scalar()
+        if booked < (event.capacity or 0):
+            # Index seek on (event_id, position) for the head of the queue,
+            # dropping entries of users who have since booked directly;
+            # every entry taken off the head advances the served counter
+            while promoted_user_id is None:
+                head = (
+                    session.query(WaitlistEntry)
+                    .filter(WaitlistEntry.event_id == event_id)
+                    .order_by(WaitlistEntry.position)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                    .first()
+                )
+                if not head:
+                    break
+                session.delete(head)
+                event.waitlist_served = head.position
+                session.flush()
+                if not session.query(Attendance.id).filter_by(event_id=event_id, user_id=head.user_id).first():
+                    promoted_user_id = head.user_id
+                    session.add(Attendance(event_id=event_id, user_id=promoted_user_id))
+                    session.flush()
+                    top_up_messaging_grants(session, promoted_user_id, event_id)
+
+        session.commit()
+        return True, promoted_user_id
+    except Exception:
+        session.rollback()
+        raise
@@ -0,0 +1,162 @@
+"""
+@file broadcast.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Room Broadcast Coalescing and Backpressure
+
+This module sends chat messages to rooms while bounding what each
+client can have queued. Before each frame is sent, clients whose
+outbound queue is already deep are skipped (the frame is dropped for
+them), and clients that keep falling behind are disconnected, so one
+slow consumer cannot grow server buffers without bound. Only clients
+connected to this worker are inspected; each worker protects its own
+send queues.
+
+Messages bound for the same room can also be batched into one frame per
+short window, so a busy event room sends a handful of frames per second
+to each client instead of one per message. Coalescing is opt-in
+(ROOM_COALESCE_WINDOW_MS) since clients must also handle message_batch
+frames; a window holding a single message still sends it as a plain
+message event. Without a window every message is sent at once.
+"""
+import threading
+from collections import defaultdict
+
+class RoomBroadcaster:
+    """
+    Sends room messages with per-client backpressure, optionally
+    coalescing them into periodic batch frames
+
+    With a window, each flush emits one message_batch event per room
+    with several pending messages, {"room": ..., "messages": [...]}, and
+    a plain message event for a room with just one.
+
+    Attributes:
+        window: Seconds messages are held to be coalesced (0 sends each
+            message immediately)
+        max_queued: Packets queued for a client beyond which frames are
+            dropped for that client
+        max_dropped: Consecutive dropped frames after which a client is
+            disconnected
+    """
+
+    def __init__(self, window=0, max_queued=256, max_dropped=50):
+        self.window = window
+        self.max_queued = max_queued
+        self.max_dropped = max_dropped
+        self._pending = defaultdict(list)
+        self._dropped = {}
+        self._lock = threading.Lock()
+        self._socketio = None
+        self._wakeup = None
+
+    def publish(self, room, message):
+        """
+        Sends a message to a room, or queues it for the room's next batch
+
+        Args:
+            room: Room name
+            message: JSON-serializable message payload
+        """
+        if not self.window:
+            self._emit(room, 'message', message)
+            return
+
+        with self._lock:
+            idle = not self._pending
+            self._pending[room].append(message)
+        if idle and self._wakeup is not None:
+            self._wakeup.set()
+
+    def forget(self, sid):
+        """
+        Drops the backpressure state of a disconnected session
+
+        Args:
+            sid: Socket.IO session ID
+        """
+        with self._lock:
+            self._dropped.pop(sid, None)
+
+    def flush(self):
+        """
+        Emits one batch frame per room with pending messages
+
+        Returns:
+            Number of frames emitted
+        """
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(list)
+
+        for room, messages in pending.items():
+            if len(messages) == 1:
+                self._emit(room, 'message', messages[0])
+            else:
+                self._emit(room, 'message_batch', {'room': room, 'messages': messages})
+        return len(pending)
+
+    def _emit(self, room, event, payload):
+        """Emits a frame to a room, skipping clients that are behind"""
+        self._socketio.emit(event, payload, to=room, skip_sid=self._lagging_sids(room) or None)
+
+    def _queue_size(self, eio_sid):
+        """Packets waiting in a client's engine.io send queue"""
+        socket = self._socketio.server.eio.sockets.get(eio_sid)
+        return socket.queue.qsize() if socket is not None else 0
+
+    def _lagging_sids(self, room):
+        """
+        Finds this worker's clients in a room that should skip the next frame
+
+        Clients over max_queued are skipped; those skipped more than
+        max_dropped times in a row are disconnected.
+        """
+        server = self._socketio.server
+        lagging, to_disconnect = [], []
+        with self._lock:
+            for sid, eio_sid in server.manager.get_participants('/', room):
+                if self._queue_size(eio_sid) <= self.max_queued:
+                    self._dropped.pop(sid, None)
+                    continue
+                lagging.append(sid)
+                self._dropped[sid] = self._dropped.get(sid, 0) + 1
+                if self._dropped[sid] > self.max_dropped:
+                    to_disconnect.append(sid)
+
+        for sid in to_disconnect:
+            print(f"Disconnecting slow client: {sid}")
+            server.disconnect(sid)
+        return lagging
+
+    def start(self, socketio):
+        """
+        Binds the Socket.IO server, starting the background flusher once
+        if coalescing is enabled
+
+        Args:
+            socketio: SocketIO instance used to emit and spawn the task
+        """
+        with self._lock:
+            if self._socketio is not None:
+                return
+            self._socketio = socketio
+            if not self.window:
+                return
+            self._wakeup = socketio.server.eio.create_event()
+        socketio.start_background_task(self._run)
+
+    def _run(self):
+        """
+        Background loop flushing pending batches
+
+        Sleeps until a message arrives, then holds it for one window so
+        messages published meanwhile share its frame.
+        """
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self._socketio.sleep(self.window)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Room broadcast error: {str(e)}")
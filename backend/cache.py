@@ -0,0 +1,82 @@
+"""
+@file cache.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+In-Process Caching Module
+
+This module provides a small thread-safe cache with a per-entry time to
+live and a bounded size (least recently used entries are evicted first).
+Hit and miss counters are kept for monitoring.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries expire after a fixed TTL
+
+    Attributes:
+        ttl: Seconds an entry stays valid
+        max_size: Maximum number of entries kept
+        hits: Number of successful lookups
+        misses: Number of lookups that found nothing valid
+    """
+
+    def __init__(self, ttl=30, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns a cached value, or None if missing or expired
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """
+        Stores a value, evicting the least recently used entry if full
+
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Drops a cached value if present
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drops every cached value"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,130 @@
+"""
+@file event_filters.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Event Filtering Module
+
+This module parses the multi-facet filters accepted by GET /api/events
+(categories, date window, free spots, creator) and compiles them into a
+single SQL query. On PostgreSQL, category filters use the array
+overlap/containment operators served by the GIN index on
+events.categories; other databases (the SQLite stand-in, which stores
+categories as JSON) match the array elements through json_each. The
+date window is served by the B-tree index on events.date.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from models import Event, Attendance
+
+def _parse_date(value, name):
+    """Parses an ISO date or datetime query parameter"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: expected an ISO date")
+
+def parse_event_filters(args):
+    """
+    Parses event filter query parameters
+
+    Args:
+        args: Request query arguments (werkzeug MultiDict)
+
+    Returns:
+        Dictionary of filters
+
+    Raises:
+        ValueError: If a parameter is malformed
+    """
+    # Categories may be repeated or comma separated; "category" is kept
+    # for older clients
+    categories = []
+    for value in args.getlist('categories') + args.getlist('category'):
+        categories.extend(category.strip() for category in value.split(',') if category.strip())
+
+    category_match = args.get('categoryMatch', 'any')
+    if category_match not in ('any', 'all'):
+        raise ValueError("Invalid categoryMatch: expected 'any' or 'all'")
+
+    date_from = args.get('dateFrom')
+    date_to = args.get('dateTo')
+    date_from = _parse_date(date_from, 'dateFrom') if date_from else None
+    date_to = _parse_date(date_to, 'dateTo') if date_to else None
+    # A bare end date includes the whole day
+    if date_to is not None and len(args.get('dateTo')) == 10:
+        date_to += timedelta(days=1)
+
+    creator_id = args.get('creatorId')
+
+    return {
+        "categories": list(dict.fromkeys(categories)),
+        "category_match": category_match,
+        "date_from": date_from,
+        "date_to": date_to,
+        "has_spots": args.get('hasSpots', 'false').lower() in ('true', '1', 'yes'),
+        "creator_id": int(creator_id) if creator_id else None
+    }
+
+def category_filter(session, categories, match_all):
+    """
+    Builds the condition matching events by category
+
+    Args:
+        session: Database session, used to pick the dialect
+        categories: Non-empty list of categories
+        match_all: Whether events need every category rather than any
+
+    Returns:
+        SQL condition over events
+    """
+    if session.get_bind().dialect.name == 'postgresql':
+        if match_all:
+            return Event.categories.contains(categories)
+        return Event.categories.overlap(categories)
+
+    # JSON arrays: count the distinct requested categories an event has
+    elements = func.json_each(Event.categories).table_valued('value')
+    matched = (
+        select(func.count(func.distinct(elements.c.value)))
+        .where(elements.c.value.in_(categories))
+        .scalar_subquery()
+    )
+    return matched == len(categories) if match_all else matched > 0
+
+def apply_event_filters(query, session, filters):
+    """
+    Applies parsed filters to an event query
+
+    Args:
+        query: SQLAlchemy query over events
+        session: Database session
+        filters: Dictionary returned by parse_event_filters
+
+    Returns:
+        Filtered query
+    """
+    if filters["categories"]:
+        query = query.filter(category_filter(
+            session, filters["categories"], filters["category_match"] == "all"
+        ))
+
+    if filters["date_from"] is not None:
+        query = query.filter(Event.date >= filters["date_from"])
+    if filters["date_to"] is not None:
+        query = query.filter(Event.date < filters["date_to"])
+
+    if filters["creator_id"] is not None:
+        query = query.filter(Event.creator_id == filters["creator_id"])
+
+    if filters["has_spots"]:
+        booked = (
+            select(func.count(Attendance.id))
+            .where(Attendance.event_id == Event.id)
+            .correlate(Event)
+            .scalar_subquery()
+        )
+        query = query.filter(Event.capacity > booked)
+
+    return query
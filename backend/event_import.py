@@ -0,0 +1,235 @@
+"""
+@file event_import.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Bulk Event Import Module
+
+This module imports events from NDJSON or CSV uploads. The upload is
+parsed incrementally as a stream, each row is validated, and valid rows
+are inserted in batches with SQLAlchemy bulk inserts, so memory stays
+bounded by the batch size regardless of upload size. A batch the
+database rejects is retried row by row, so only the failing rows are
+reported and the rest are still imported.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from geo import encode_geohash, parse_coordinates
+from models import Event
+
+# Rows inserted per bulk INSERT
+IMPORT_BATCH_SIZE = 1000
+
+# Per-row errors reported back to the client
+MAX_REPORTED_ERRORS = 1000
+
+# Supported upload formats by content type
+IMPORT_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonlines": "ndjson",
+    "text/csv": "csv"
+}
+
+def iter_ndjson(stream):
+    """
+    Yields one parsed record per NDJSON line
+
+    Args:
+        stream: Binary file-like upload stream
+
+    Yields:
+        Tuple of (line number, record dictionary or parse error)
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, ValueError(f"Invalid JSON: {e}")
+
+def iter_csv(stream):
+    """
+    Yields one record per CSV row (header row required)
+
+    Args:
+        stream: Binary file-like upload stream
+
+    Yields:
+        Tuple of (line number, record dictionary)
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+    for record in reader:
+        yield reader.line_num, record
+
+def _parse_datetime(value, field):
+    """Parses an ISO date/datetime, or passes a datetime through"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"Invalid {field}: expected an ISO date")
+
+def validate_event(record, creator_id):
+    """
+    Validates an imported record and converts it to an events row
+
+    Args:
+        record: Dictionary from the upload (create_event field names)
+        creator_id: ID of the importing user
+
+    Returns:
+        Dictionary of Event column values
+
+    Raises:
+        ValueError: If the record is invalid
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Row must be an object")
+
+    for field in ("title", "description", "date", "time", "location", "capacity"):
+        if record.get(field) in (None, ""):
+            raise ValueError(f"Missing {field}")
+
+    date = _parse_datetime(record["date"], "date")
+
+    # Times may be "HH:MM" (on the event date) or a full datetime
+    time_value = str(record["time"])
+    if len(time_value) <= 8 and ":" in time_value:
+        try:
+            hour, minute = (int(part) for part in time_value.split(":")[:2])
+            time = date.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        except ValueError:
+            raise ValueError("Invalid time: expected HH:MM")
+    else:
+        time = _parse_datetime(time_value, "time")
+
+    try:
+        capacity = int(record["capacity"])
+    except (TypeError, ValueError):
+        raise ValueError("Invalid capacity: expected an integer")
+    if capacity < 0:
+        raise ValueError("Invalid capacity: must not be negative")
+
+    # CSV uploads list categories separated by semicolons
+    categories = record.get("categories") or []
+    if isinstance(categories, str):
+        categories = [category.strip() for category in categories.split(";") if category.strip()]
+    if not isinstance(categories, list):
+        raise ValueError("Invalid categories: expected a list")
+
+    row = {
+        "title": str(record["title"])[:200],
+        "description": str(record["description"]),
+        "date": date,
+        "time": time,
+        "location": str(record["location"])[:200],
+        "image_url": record.get("imageUrl") or "",
+        "capacity": capacity,
+        "categories": [str(category) for category in categories],
+        "creator_id": creator_id,
+        "latitude": None,
+        "longitude": None,
+        "geohash": None
+    }
+
+    latitude, longitude = record.get("latitude"), record.get("longitude")
+    if latitude not in (None, "") and longitude not in (None, ""):
+        try:
+            row["latitude"], row["longitude"] = parse_coordinates(latitude, longitude)
+        except ValueError as e:
+            raise ValueError(f"Invalid latitude/longitude: {e}")
+        row["geohash"] = encode_geohash(row["latitude"], row["longitude"])
+
+    return row
+
+def _short_error(error):
+    """
+    One-line description of a failed insert
+
+    Database errors carry the statement and every bound parameter of the
+    batch; only the driver's first message line is reported.
+    """
+    message = str(getattr(error, 'orig', None) or error).strip()
+    return message.splitlines()[0][:200] if message else type(error).__name__
+
+def import_events(session, records, creator_id, on_inserted=None):
+    """
+    Validates and bulk inserts a stream of records
+
+    Args:
+        session: Database session
+        records: Iterable of (line number, record) tuples
+        creator_id: ID of the importing user
+        on_inserted: Optional callback receiving (event_id, row) for each
+            inserted row
+
+    Returns:
+        Dictionary summarizing imported rows and per-row errors
+    """
+    summary = {"imported": 0, "failed": 0, "errors": [], "errorsTruncated": False}
+
+    def record_error(line_number, message):
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"row": line_number, "error": message})
+        else:
+            summary["errorsTruncated"] = True
+
+    def insert_rows(rows):
+        event_ids = session.execute(
+            insert(Event).returning(Event.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        session.commit()
+        return event_ids
+
+    def inserted(event_ids, rows):
+        summary["imported"] += len(rows)
+        if on_inserted:
+            for event_id, row in zip(event_ids, rows):
+                on_inserted(event_id, row)
+
+    def flush(batch):
+        rows = [row for _, row in batch]
+        try:
+            inserted(insert_rows(rows), rows)
+            return
+        except Exception as e:
+            session.rollback()
+            if len(batch) == 1:
+                record_error(batch[0][0], f"Insert failed: {_short_error(e)}")
+                return
+
+        # Retry row by row so only the failing rows are reported
+        for line_number, row in batch:
+            try:
+                inserted(insert_rows([row]), [row])
+            except Exception as e:
+                session.rollback()
+                record_error(line_number, f"Insert failed: {_short_error(e)}")
+
+    batch = []
+    for line_number, record in records:
+        if isinstance(record, Exception):
+            record_error(line_number, str(record))
+            continue
+        try:
+            batch.append((line_number, validate_event(record, creator_id)))
+        except ValueError as e:
+            record_error(line_number, str(e))
+            continue
+
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            flush(batch)
+            batch = []
+
+    if batch:
+        flush(batch)
+
+    return summary
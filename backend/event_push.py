@@ -0,0 +1,59 @@
+"""
+@file event_push.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+New Event Push Notifications
+
+This module tells online users about newly created events that match
+their personality, so clients need not poll the events list. All
+candidates are scored against the event in one vectorized pass and
+only users at or above the match threshold get a new_event push in
+their personal Socket.IO room (the user ID as a string).
+"""
+from ai import batch_event_match_scores
+from database import db_session
+from models import User
+
+# User IDs per IN (...) lookup of personality tags
+PUSH_LOOKUP_BATCH_SIZE = 1000
+
+def push_new_event(socketio, event_payload, categories, user_ids, threshold):
+    """
+    Pushes a new event to the matching users among the given ones
+
+    Args:
+        socketio: SocketIO instance used to emit
+        event_payload: JSON-serializable event summary sent to clients
+        categories: Categories of the event
+        user_ids: Candidate (online) user IDs
+        threshold: Minimum match score (0-100) for a push
+
+    Returns:
+        Number of users notified
+    """
+    user_ids = list(user_ids)
+    try:
+        candidates = []
+        for start in range(0, len(user_ids), PUSH_LOOKUP_BATCH_SIZE):
+            candidates.extend(
+                db_session.query(User.id, User.personality_tags)
+                .filter(
+                    User.id.in_(user_ids[start:start + PUSH_LOOKUP_BATCH_SIZE]),
+                    User.has_completed_personality_test == True
+                )
+                .all()
+            )
+    finally:
+        db_session.remove()
+
+    if not candidates:
+        return 0
+
+    scores = batch_event_match_scores([tags for _, tags in candidates], categories)
+
+    notified = 0
+    for (user_id, _), score in zip(candidates, scores):
+        if score >= threshold:
+            socketio.emit('new_event', {**event_payload, "matchScore": score}, to=str(user_id))
+            notified += 1
+    return notified
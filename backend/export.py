@@ -0,0 +1,130 @@
+"""
+@file export.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Streaming Export Module
+
+This module streams large listings (users, events, feedback) as NDJSON
+or CSV. Rows are read through a server-side cursor and written out in
+chunks as they are produced, so memory stays constant regardless of the
+number of rows exported.
+"""
+import csv
+import io
+import json
+
+from flask import Response, stream_with_context
+
+# Supported export formats and their content types
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Rows fetched per server-side cursor batch and per flushed chunk
+EXPORT_BATCH_SIZE = 1000
+
+def user_row(row):
+    """Formats a (id, name, email, has_completed_personality_test, personality_tags) row"""
+    user_id, name, email, has_completed_personality_test, personality_tags = row
+    return {
+        "id": user_id,
+        "name": name,
+        "email": email,
+        "hasCompletedPersonalityTest": bool(has_completed_personality_test),
+        "personalityTags": personality_tags or []
+    }
+
+def event_row(row):
+    """Formats a (id, title, date, time, location, capacity, categories, creator_id) row"""
+    event_id, title, date, time, location, capacity, categories, creator_id = row
+    return {
+        "id": event_id,
+        "title": title,
+        "date": date.strftime("%Y-%m-%d"),
+        "time": time.strftime("%H:%M"),
+        "location": location,
+        "capacity": capacity,
+        "categories": categories or [],
+        "creatorId": creator_id
+    }
+
+def feedback_row(row):
+    """Formats a (id, event_id, user_id, rating, enjoyed_most, comment, submitted_at) row"""
+    feedback_id, event_id, user_id, rating, enjoyed_most, comment, submitted_at = row
+    return {
+        "id": feedback_id,
+        "eventId": event_id,
+        "userId": user_id,
+        "rating": rating,
+        "enjoyedMost": enjoyed_most or [],
+        "comment": comment or "",
+        "submittedAt": submitted_at.isoformat() if submitted_at else None
+    }
+
+def _csv_value(value):
+    """Flattens list values into a single CSV cell"""
+    if isinstance(value, list):
+        return ";".join(str(item) for item in value)
+    return value
+
+def generate_export(query, format_row, export_format):
+    """
+    Generates export chunks from a query
+
+    Args:
+        query: SQLAlchemy query selecting plain columns
+        format_row: Callable turning a result row into a dictionary
+        export_format: "ndjson" or "csv"
+
+    Yields:
+        Encoded chunks of up to EXPORT_BATCH_SIZE rows
+    """
+    buffer = io.StringIO()
+    writer = None
+    rows_in_chunk = 0
+
+    # yield_per streams rows through a server-side cursor
+    for row in query.yield_per(EXPORT_BATCH_SIZE):
+        record = format_row(row)
+
+        if export_format == "csv":
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(record.keys()))
+                writer.writeheader()
+            writer.writerow({key: _csv_value(value) for key, value in record.items()})
+        else:
+            buffer.write(json.dumps(record))
+            buffer.write("\n")
+
+        rows_in_chunk += 1
+        if rows_in_chunk >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows_in_chunk = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_response(query, format_row, export_format, filename):
+    """
+    Builds a streaming Flask response for an export
+
+    Args:
+        query: SQLAlchemy query selecting plain columns
+        format_row: Callable turning a result row into a dictionary
+        export_format: "ndjson" or "csv"
+        filename: Download filename without extension
+
+    Returns:
+        Streaming Flask response
+    """
+    return Response(
+        stream_with_context(generate_export(query, format_row, export_format)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}.{export_format}",
+            "X-Accel-Buffering": "no"  # Let proxies flush each chunk
+        }
+    )
@@ -0,0 +1,284 @@
+"""
+@file geo.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Geospatial Helpers
+
+This module provides geohash encoding, great-circle distances and the
+"events near a point" filter. Nearby queries are pruned first by the
+geohash cells covering the search area and a latitude/longitude
+bounding box (both B-tree indexed), then refined with the exact
+haversine distance. PostGIS is used instead when it is installed.
+"""
+import math
+
+from sqlalchemy import case, func, or_, text
+
+from models import Event
+
+# Mean Earth radius in kilometers
+EARTH_RADIUS_KM = 6371.0088
+
+# Geohash alphabet and stored precision (~5m cells)
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+
+# Upper bound on geohash cells used to cover a search area
+MAX_COVERING_CELLS = 9
+
+def parse_coordinates(latitude, longitude):
+    """
+    Validates a coordinate
+
+    Args:
+        latitude: Latitude in degrees (number or numeric string)
+        longitude: Longitude in degrees (number or numeric string)
+
+    Returns:
+        Tuple of (latitude, longitude) as floats
+
+    Raises:
+        ValueError: If either value is not a number or is out of range
+    """
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        raise ValueError("latitude and longitude must be numbers")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("latitude must be within [-90, 90] and longitude within [-180, 180]")
+    return latitude, longitude
+
+def parse_near(near, radius):
+    """
+    Parses the near and radius query parameters of a nearby search
+
+    Args:
+        near: "lat,lng" string
+        radius: Search radius in kilometers (number or numeric string)
+
+    Returns:
+        Tuple of (latitude, longitude, radius_km)
+
+    Raises:
+        ValueError: If near is malformed or radius is not positive
+    """
+    parts = near.split(',')
+    if len(parts) != 2:
+        raise ValueError('near must be "lat,lng"')
+    latitude, longitude = parse_coordinates(*parts)
+    try:
+        radius_km = float(radius)
+    except (TypeError, ValueError):
+        raise ValueError("radius must be a number")
+    if not 0 < radius_km < math.inf:
+        raise ValueError("radius must be positive")
+    return latitude, longitude, radius_km
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """
+    Encodes a coordinate as a geohash
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+        precision: Number of geohash characters
+
+    Returns:
+        Geohash string
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even_bit = True
+
+    while len(geohash) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        value, value_range = (longitude, lng_range) if even_bit else (latitude, lat_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            value_range[0] = middle
+        else:
+            bits <<= 1
+            value_range[1] = middle
+        even_bit = not even_bit
+
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(geohash)
+
+def geohash_cell_size(precision):
+    """
+    Returns the size of a geohash cell in degrees
+
+    Args:
+        precision: Number of geohash characters
+
+    Returns:
+        Tuple of (latitude degrees, longitude degrees)
+    """
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance between two coordinates
+
+    Args:
+        lat1, lng1: First coordinate in degrees
+        lat2, lng2: Second coordinate in degrees
+
+    Returns:
+        Distance in kilometers
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Latitude/longitude box enclosing a circle
+
+    Args:
+        latitude: Center latitude in degrees
+        longitude: Center longitude in degrees
+        radius_km: Circle radius in kilometers
+
+    Returns:
+        Tuple of (min_lat, max_lat, min_lng, max_lng); longitude bounds
+        are None when the box spans a pole or the antimeridian
+    """
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = latitude - lat_delta, latitude + lat_delta
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+
+    lng_delta = math.degrees(
+        math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude))))
+    )
+    min_lng, max_lng = longitude - lng_delta, longitude + lng_delta
+    if min_lng < -180 or max_lng > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lng, max_lng
+
+def covering_geohashes(min_lat, max_lat, min_lng, max_lng):
+    """
+    Geohash prefixes whose cells together cover a bounding box
+
+    Picks the finest precision that needs at most MAX_COVERING_CELLS cells.
+
+    Args:
+        min_lat, max_lat, min_lng, max_lng: Bounding box in degrees
+
+    Returns:
+        Set of geohash prefixes, or None if the box is too large to prune
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lng = geohash_cell_size(precision)
+        rows = math.floor(max_lat / cell_lat) - math.floor(min_lat / cell_lat) + 1
+        columns = math.floor(max_lng / cell_lng) - math.floor(min_lng / cell_lng) + 1
+        if rows * columns > MAX_COVERING_CELLS:
+            continue
+
+        prefixes = set()
+        for row in range(rows):
+            lat = min(min_lat + row * cell_lat, max_lat)
+            for column in range(columns):
+                lng = min(min_lng + column * cell_lng, max_lng)
+                prefixes.add(encode_geohash(lat, lng, precision))
+        # Corners guard against floating point edge cases
+        for lat in (min_lat, max_lat):
+            for lng in (min_lng, max_lng):
+                prefixes.add(encode_geohash(lat, lng, precision))
+        return prefixes
+    return None
+
+def distance_expression(latitude, longitude):
+    """
+    SQL haversine distance in kilometers from a point to each event
+
+    Args:
+        latitude: Center latitude in degrees
+        longitude: Center longitude in degrees
+
+    Returns:
+        SQLAlchemy expression
+    """
+    d_phi = func.radians(Event.latitude - latitude)
+    d_lambda = func.radians(Event.longitude - longitude)
+    a = (
+        func.power(func.sin(d_phi / 2), 2) +
+        math.cos(math.radians(latitude)) * func.cos(func.radians(Event.latitude)) *
+        func.power(func.sin(d_lambda / 2), 2)
+    )
+    # Clamp rounding overshoot above 1 (CASE rather than LEAST, which
+    # SQLite lacks)
+    root = func.sqrt(a)
+    return 2 * EARTH_RADIUS_KM * func.asin(case((root > 1.0, 1.0), else_=root))
+
+_postgis_available = None
+
+def postgis_available(session):
+    """
+    Whether the PostGIS extension is installed (checked once)
+
+    Args:
+        session: Database session
+
+    Returns:
+        True if PostGIS can be used
+    """
+    global _postgis_available
+    if _postgis_available is None:
+        bind = session.get_bind()
+        _postgis_available = bind.dialect.name == 'postgresql' and bool(
+            session.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")).first()
+        )
+    return _postgis_available
+
+def apply_nearby_filter(query, session, latitude, longitude, radius_km):
+    """
+    Restricts an event query to events within a radius of a point
+
+    Args:
+        query: SQLAlchemy query over events
+        session: Database session
+        latitude: Center latitude in degrees
+        longitude: Center longitude in degrees
+        radius_km: Search radius in kilometers
+
+    Returns:
+        Tuple of (filtered query, distance expression in kilometers)
+    """
+    if postgis_available(session):
+        # Served by the ix_events_geography GiST index
+        event_point = func.geography(func.ST_SetSRID(func.ST_MakePoint(Event.longitude, Event.latitude), 4326))
+        center = func.geography(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326))
+        distance = func.ST_Distance(event_point, center) / 1000
+        return query.filter(func.ST_DWithin(event_point, center, radius_km * 1000)), distance
+
+    distance = distance_expression(latitude, longitude)
+
+    # Bounding box pruning on the indexed latitude/longitude columns
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    query = query.filter(Event.latitude.between(min_lat, max_lat))
+    if min_lng is not None:
+        query = query.filter(Event.longitude.between(min_lng, max_lng))
+
+        # Geohash cell pruning on the indexed geohash column
+        prefixes = covering_geohashes(min_lat, max_lat, min_lng, max_lng)
+        if prefixes:
+            query = query.filter(or_(*[Event.geohash.like(f"{prefix}%") for prefix in sorted(prefixes)]))
+
+    # Exact distance refinement
+    return query.filter(distance <= radius_km), distance
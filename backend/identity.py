@@ -0,0 +1,94 @@
+"""
+@file identity.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Current User Module
+
+This module loads the user behind the request's JWT. The full User row
+is loaded at most once per request, and the profile fields most
+endpoints need (name, personality tags, test status) are served from a
+short-lived in-process cache, so cache hits skip the users table.
+"""
+import os
+from collections import namedtuple
+
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+
+from cache import TTLCache
+from database import db_session
+from models import User
+
+# Lightweight, read-only view of a user's profile
+Profile = namedtuple('Profile', ['id', 'name', 'personality_tags', 'has_completed_personality_test'])
+
+# Profiles by user ID; invalidated whenever the profile changes
+profile_cache = TTLCache(
+    ttl=int(os.environ.get('PROFILE_CACHE_TTL', 30)),
+    max_size=int(os.environ.get('PROFILE_CACHE_SIZE', 10000))
+)
+
+def _profile_of(user):
+    """
+    Builds a Profile from a User row
+
+    Personality tags stay a list, as on the row, because the ai scoring
+    helpers concatenate trait lists. Callers must not mutate them.
+    """
+    return Profile(
+        id=user.id,
+        name=user.name,
+        personality_tags=list(user.personality_tags or []),
+        has_completed_personality_test=bool(user.has_completed_personality_test)
+    )
+
+def get_current_user():
+    """
+    Returns the User row for the request's JWT identity
+
+    The row is loaded at most once per request.
+
+    Returns:
+        User object, or None if the user does not exist
+    """
+    if 'current_user' not in g:
+        g.current_user = User.query.get(get_jwt_identity())
+        if g.current_user is not None:
+            profile_cache.set(g.current_user.id, _profile_of(g.current_user))
+    return g.current_user
+
+def get_current_profile():
+    """
+    Returns the cached profile for the request's JWT identity
+
+    Returns:
+        Profile, or None if the user does not exist
+    """
+    # Keyed by integer ID whether the token's identity is a string or not
+    user_id = int(get_jwt_identity())
+    profile = profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+
+    # Reuse the row if this request already loaded it
+    if 'current_user' in g:
+        return _profile_of(g.current_user) if g.current_user is not None else None
+
+    row = db_session.query(
+        User.id, User.name, User.personality_tags, User.has_completed_personality_test
+    ).filter(User.id == user_id).first()
+    if row is None:
+        return None
+
+    profile = _profile_of(row)
+    profile_cache.set(row.id, profile)
+    return profile
+
+def invalidate_profile(user_id):
+    """
+    Drops a user's cached profile after it changed
+
+    Args:
+        user_id: ID of the user
+    """
+    profile_cache.invalidate(int(user_id))
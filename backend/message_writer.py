@@ -0,0 +1,222 @@
+"""
+@file message_writer.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Write-Behind Chat Persistence
+
+This module persists real-time chat messages without a database round
+trip per message. Socket handlers hand messages to a MessageWriter,
+which buffers them and writes each batch with one permission query and
+one bulk INSERT, either once the batch size is reached or after the
+flush interval, whichever comes first. Each message is then reported
+back as stored (with its ID) or rejected, so senders can be acked.
+"""
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, insert, select, tuple_
+from sqlalchemy.orm import aliased
+
+from database import db_session
+from messaging import top_up_messaging_grants
+from models import User, Event, Attendance, Message, MessagingGrant
+
+def _permitted_event_messages(session, messages, now):
+    """
+    Finds which event-scoped messages the sender may send
+
+    Applies the same rules as the REST send_message endpoint in one
+    query: both users attend the event, the event starts within 24
+    hours, and the sender holds a messaging grant for the recipient.
+
+    Args:
+        session: Database session
+        messages: Pending messages with an event_id
+        now: Reference time for the 24 hour window
+
+    Returns:
+        Set of permitted (sender_id, event_id, recipient_id) tuples
+    """
+    keys = {(m["sender_id"], m["event_id"], m["recipient_id"]) for m in messages}
+    if not keys:
+        return set()
+
+    sender_attendance = aliased(Attendance)
+    recipient_attendance = aliased(Attendance)
+    rows = session.execute(
+        select(MessagingGrant.user_id, MessagingGrant.event_id, MessagingGrant.recipient_id)
+        .join(Event, Event.id == MessagingGrant.event_id)
+        .join(sender_attendance, and_(
+            sender_attendance.event_id == MessagingGrant.event_id,
+            sender_attendance.user_id == MessagingGrant.user_id
+        ))
+        .join(recipient_attendance, and_(
+            recipient_attendance.event_id == MessagingGrant.event_id,
+            recipient_attendance.user_id == MessagingGrant.recipient_id
+        ))
+        .where(
+            tuple_(MessagingGrant.user_id, MessagingGrant.event_id, MessagingGrant.recipient_id).in_(keys),
+            Event.date <= now + timedelta(hours=24)
+        )
+    ).all()
+    return {tuple(row) for row in rows}
+
+class MessageWriter:
+    """
+    Buffers chat messages and persists them in batches
+
+    Messages are dictionaries with sender_id, recipient_id, content,
+    event_id and sent_at, plus any extra keys the caller needs to ack the
+    sender (they are not persisted).
+
+    Attributes:
+        batch_size: Buffered messages that trigger an immediate flush
+        flush_interval: Seconds between flushes of a partial batch
+        max_pending: Buffered messages beyond which new ones are refused
+        on_flushed: Callback receiving (stored, rejected) after each flush;
+            stored is a list of (message, message_id) pairs and rejected a
+            list of (message, error) pairs
+    """
+
+    def __init__(self, batch_size=100, flush_interval=0.05, max_pending=10000, on_flushed=None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.on_flushed = on_flushed
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = None
+        self._started = False
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def submit(self, message):
+        """
+        Queues a message for the next batch
+
+        Args:
+            message: Message dictionary
+
+        Returns:
+            False if the buffer is full and the message was not queued
+        """
+        with self._lock:
+            if len(self._buffer) >= self.max_pending:
+                return False
+            self._buffer.append(message)
+            full = len(self._buffer) >= self.batch_size
+
+        if full and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """
+        Persists every buffered message
+
+        Returns:
+            Number of messages stored
+        """
+        # One flush at a time keeps batches in submission order
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+
+            try:
+                stored, rejected = self._write(batch)
+            except Exception as e:
+                db_session.rollback()
+                print(f"Message flush error: {str(e)}")
+                stored, rejected = [], [(message, "Message could not be stored") for message in batch]
+            finally:
+                db_session.remove()
+
+        if self.on_flushed:
+            self.on_flushed(stored, rejected)
+        return len(stored)
+
+    def _write(self, batch):
+        """Validates a batch and inserts the valid messages in one statement"""
+        now = datetime.now()
+
+        recipient_ids = {message["recipient_id"] for message in batch}
+        existing_recipients = set(
+            db_session.execute(select(User.id).where(User.id.in_(recipient_ids))).scalars()
+        )
+        event_messages = [message for message in batch if message["event_id"]]
+        permitted = _permitted_event_messages(db_session, event_messages, now)
+
+        # Top up the grants of senders whose share has grown, then recheck
+        ungranted = [
+            message for message in event_messages
+            if (message["sender_id"], message["event_id"], message["recipient_id"]) not in permitted
+        ]
+        if ungranted:
+            pairs = {(message["sender_id"], message["event_id"]) for message in ungranted}
+            attending = db_session.execute(
+                select(Attendance.user_id, Attendance.event_id)
+                .where(tuple_(Attendance.user_id, Attendance.event_id).in_(pairs))
+            ).all()
+            for sender_id, event_id in attending:
+                top_up_messaging_grants(db_session, sender_id, event_id)
+            if attending:
+                db_session.commit()
+                permitted |= _permitted_event_messages(db_session, ungranted, now)
+
+        valid, rejected = [], []
+        for message in batch:
+            if message["recipient_id"] not in existing_recipients:
+                rejected.append((message, "Recipient not found"))
+            elif message["event_id"] and (
+                (message["sender_id"], message["event_id"], message["recipient_id"]) not in permitted
+            ):
+                rejected.append((message, "Cannot message this user for this event"))
+            else:
+                valid.append(message)
+
+        stored = []
+        if valid:
+            rows = [
+                {
+                    "sender_id": message["sender_id"],
+                    "recipient_id": message["recipient_id"],
+                    "content": message["content"],
+                    "event_id": message["event_id"],
+                    "sent_at": message["sent_at"]
+                }
+                for message in valid
+            ]
+            message_ids = db_session.execute(
+                insert(Message).returning(Message.id, sort_by_parameter_order=True), rows
+            ).scalars().all()
+            db_session.commit()
+            stored = list(zip(valid, message_ids))
+        return stored, rejected
+
+    def start(self, socketio):
+        """
+        Starts the background flusher once
+
+        Args:
+            socketio: SocketIO instance used to spawn the background task
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._wakeup = socketio.server.eio.create_event()
+        socketio.start_background_task(self._run)
+
+    def _run(self):
+        """Background loop flushing on a full batch or every interval"""
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Message writer error: {str(e)}")
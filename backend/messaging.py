@@ -0,0 +1,98 @@
+"""
+@file messaging.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Messaging Grants Module
+
+This module materializes which attendees of an event a user may
+message. A user may message a sampled share of the other attendees
+(see ai.message_recipient_count). Grants are stored as MessagingGrant
+rows so permission checks are a single indexed lookup. They are created
+when a seat is booked and topped up as attendance grows, so later
+registrants can be sampled too.
+
+Topping up never loads the attendee list: one single-row query compares
+the grants held with the user's share, and only the missing grants are
+drawn, at random, by the database.
+"""
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from ai import message_recipient_count
+from models import Attendance, MessagingGrant
+
+def _insert_grants(session, rows):
+    """
+    Inserts grant rows, ignoring ones that already exist
+    
+    Concurrent top-ups for the same user and event may pick the same
+    recipients; the unique constraint keeps one row each. The caller
+    commits.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        try:
+            with session.begin_nested():
+                session.execute(insert(MessagingGrant), rows)
+        except IntegrityError:
+            # Another request granted concurrently; its grants stand
+            pass
+        return
+    
+    session.execute(dialect_insert(MessagingGrant).on_conflict_do_nothing(), rows)
+
+def top_up_messaging_grants(session, user_id, event_id):
+    """
+    Tops up a user's messaging grants for an event to their share
+    
+    Grants for attendees who have since cancelled do not count towards
+    the share. Callers check that the user attends the event and commit
+    the session.
+    
+    Args:
+        session: Database session
+        user_id: ID of the sending user
+        event_id: ID of the event
+    
+    Returns:
+        List of recipient IDs granted by this call
+    """
+    user_id, event_id = int(user_id), int(event_id)
+    other_attendees = select(Attendance.user_id).where(
+        Attendance.event_id == event_id,
+        Attendance.user_id != user_id
+    )
+    
+    # Grants held and attendees to choose from, in one row
+    held, attendee_count = session.execute(select(
+        select(func.count(MessagingGrant.id)).where(
+            MessagingGrant.user_id == user_id,
+            MessagingGrant.event_id == event_id,
+            MessagingGrant.recipient_id.in_(other_attendees)
+        ).scalar_subquery(),
+        select(func.count()).select_from(other_attendees.subquery()).scalar_subquery()
+    )).one()
+    
+    missing = message_recipient_count(attendee_count) - held
+    if missing <= 0:
+        return []
+    
+    # Draw only the missing grants from the ungranted attendees
+    already_granted = exists().where(
+        MessagingGrant.user_id == user_id,
+        MessagingGrant.event_id == event_id,
+        MessagingGrant.recipient_id == Attendance.user_id
+    )
+    added = session.execute(
+        other_attendees.where(~already_granted).order_by(func.random()).limit(missing)
+    ).scalars().all()
+    if added:
+        _insert_grants(session, [
+            {"user_id": user_id, "event_id": event_id, "recipient_id": recipient_id}
+            for recipient_id in added
+        ])
+    return added
@@ -0,0 +1,376 @@
+"""
+@file metrics.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Metrics Module
+
+This module instruments the backend and renders the results in the
+Prometheus text exposition format. It records:
+- latency histograms for every HTTP route, Socket.IO event and ai.* call
+- SQL statement counts and database time per request, via SQLAlchemy
+  cursor events
+- cache hit rates, connection pool usage and other gauges read at
+  scrape time
+
+Recording an observation is a bisect and a few additions under a lock,
+so instrumentation adds microseconds to requests that take milliseconds.
+Metrics are per process; scrape each worker separately.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import request
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Buckets for SQL statements per request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _escape(value):
+    """Escapes a label value for the text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=None):
+    """Formats a label set, e.g. {route="/api/events",le="0.1"}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    """Formats a sample value, keeping integers integral"""
+    if value == float('inf'):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """
+    Histogram with fixed buckets per label set
+
+    Attributes:
+        name: Metric name
+        help: Metric description
+        label_names: Names of the labels, in order
+        buckets: Upper bounds of the buckets, ascending
+        lock: Lock guarding the series; histograms always recorded
+            together can share one and be updated under a single acquire
+    """
+
+    def __init__(self, name, help, label_names=(), buckets=LATENCY_BUCKETS, lock=None):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.lock = lock or threading.Lock()
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        """
+        Records one observation
+
+        Args:
+            value: Observed value
+            label_values: Values of the labels, in label_names order
+        """
+        with self.lock:
+            self.observe_locked(value, label_values)
+
+    def observe_locked(self, value, label_values):
+        """Records one observation; the caller holds the lock"""
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        """Renders the histogram in the text format"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(series):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+class Gauge:
+    """
+    Gauge (or externally kept counter) read from a callback at scrape time
+
+    Attributes:
+        name: Metric name
+        help: Metric description
+        read: Callable returning a list of (label values, value) pairs
+        label_names: Names of the labels, in order
+        type: Prometheus metric type reported ("gauge" or "counter")
+    """
+
+    def __init__(self, name, help, read, label_names=(), type='gauge'):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.label_names = tuple(label_names)
+        self.type = type
+
+    def render(self):
+        """Renders the current values in the text format"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in self.read():
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        """
+        Adds a metric, replacing any metric with the same name
+
+        Returns:
+            The metric
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """
+        Renders every metric in the Prometheus text format
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                print(f"Metric {metric.name} render error: {str(e)}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# The per-request histograms are recorded together under one lock
+_http_lock = threading.Lock()
+http_request_duration = registry.register(Histogram(
+    'gathr_http_request_duration_seconds', 'HTTP request latency',
+    ('method', 'route', 'status'), lock=_http_lock
+))
+http_request_queries = registry.register(Histogram(
+    'gathr_http_request_queries', 'SQL statements executed per HTTP request',
+    ('route',), QUERY_COUNT_BUCKETS, lock=_http_lock
+))
+http_request_db_time = registry.register(Histogram(
+    'gathr_http_request_db_seconds', 'Database time per HTTP request', ('route',), lock=_http_lock
+))
+socketio_event_duration = registry.register(Histogram(
+    'gathr_socketio_event_duration_seconds', 'Socket.IO event handler latency', ('event',)
+))
+ai_call_duration = registry.register(Histogram(
+    'gathr_ai_call_duration_seconds', 'Latency of ai module calls', ('function',)
+))
+
+# Statements executed and seconds spent in SQL by this process
+_sql_totals = [0, 0.0]
+_sql_totals_lock = threading.Lock()
+
+registry.register(Gauge(
+    'gathr_sql_queries_total', 'SQL statements executed', lambda: [((), _sql_totals[0])], type='counter'
+))
+registry.register(Gauge(
+    'gathr_sql_seconds_total', 'Time spent executing SQL statements', lambda: [((), _sql_totals[1])], type='counter'
+))
+
+# [start time, statements, database seconds, method, route] of the
+# current request; a context variable is much cheaper than flask.g or
+# the request proxy in the per-statement and per-request hooks
+_request_stats = ContextVar('request_stats', default=None)
+
+def timed(histogram, label):
+    """
+    Decorator recording a function's latency in a histogram
+
+    Args:
+        histogram: Histogram with one label
+        label: Label value for the function
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, label)
+        return wrapper
+    return decorator
+
+def ai_timed(func):
+    """Decorator recording the latency of an ai module function"""
+    return timed(ai_call_duration, func.__name__)(func)
+
+def _route(url_rule):
+    """Route template of a request, bounded in cardinality"""
+    return url_rule.rule if url_rule is not None else 'unmatched'
+
+def instrument_app(app):
+    """
+    Records latency, SQL statement counts and database time per request
+
+    Args:
+        app: Flask application
+    """
+    @app.before_request
+    def start_request_metrics():
+        # Resolve the request proxy once; each lookup costs microseconds
+        current = request._get_current_object()
+        _request_stats.set([time.perf_counter(), 0, 0.0, current.method, _route(current.url_rule)])
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = _request_stats.get()
+        if stats is not None:
+            start, statements, db_seconds, method, route = stats
+            elapsed = time.perf_counter() - start
+            status = str(response.status_code)
+            with _http_lock:
+                http_request_duration.observe_locked(elapsed, (method, route, status))
+                http_request_queries.observe_locked(statements, (route,))
+                http_request_db_time.observe_locked(db_seconds, (route,))
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exception=None):
+        # Runs even when no response was made, so no statement is lost
+        stats = _request_stats.get()
+        if stats is not None:
+            _request_stats.set(None)
+            if stats[1]:
+                with _sql_totals_lock:
+                    _sql_totals[0] += stats[1]
+                    _sql_totals[1] += stats[2]
+
+def instrument_engine(engine):
+    """
+    Counts SQL statements and their execution time
+
+    Statements run during a request are tallied in the request's own
+    stats without locking and added to the process totals when the
+    request ends.
+
+    Args:
+        engine: SQLAlchemy engine
+    """
+    from sqlalchemy import event
+
+    # retval=True spares SQLAlchemy's adapter call around the listener
+    @event.listens_for(engine, 'before_cursor_execute', retval=True)
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.metrics_start = time.perf_counter()
+        return statement, parameters
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.metrics_start
+        stats = _request_stats.get()
+        if stats is not None:
+            stats[1] += 1
+            stats[2] += elapsed
+        else:
+            with _sql_totals_lock:
+                _sql_totals[0] += 1
+                _sql_totals[1] += elapsed
+
+def instrument_socketio(socketio, namespace='/'):
+    """
+    Records the latency of every registered Socket.IO event handler
+
+    Call after all handlers are registered.
+
+    Args:
+        socketio: SocketIO instance
+        namespace: Namespace whose handlers are instrumented
+    """
+    handlers = socketio.server.handlers.get(namespace, {})
+    for event_name, handler in list(handlers.items()):
+        if not getattr(handler, 'metrics_timed', False):
+            wrapper = timed(socketio_event_duration, event_name)(handler)
+            wrapper.metrics_timed = True
+            handlers[event_name] = wrapper
+
+# Caches reported at scrape time, by label
+_caches = {}
+
+def _read_caches(value):
+    """Reads a value from every registered cache"""
+    return lambda: [((name,), value(cache)) for name, cache in sorted(_caches.items())]
+
+registry.register(Gauge(
+    'gathr_cache_hits_total', 'Cache hits', _read_caches(lambda cache: cache.hits), ('cache',), 'counter'
+))
+registry.register(Gauge(
+    'gathr_cache_misses_total', 'Cache misses', _read_caches(lambda cache: cache.misses), ('cache',), 'counter'
+))
+registry.register(Gauge(
+    'gathr_cache_hit_ratio', 'Cache hit ratio since start',
+    _read_caches(lambda cache: cache.hits / (cache.hits + cache.misses) if cache.hits + cache.misses else 0.0),
+    ('cache',)
+))
+registry.register(Gauge(
+    'gathr_cache_entries', 'Cached entries', _read_caches(len), ('cache',)
+))
+
+def register_cache(name, cache):
+    """
+    Reports a TTLCache's hits, misses, hit ratio and size
+
+    Args:
+        name: Cache label value
+        cache: Cache with hits and misses counters
+    """
+    _caches[name] = cache
+
+def register_pool(engine):
+    """
+    Reports connection pool usage
+
+    Args:
+        engine: SQLAlchemy engine
+    """
+    pool = engine.pool
+
+    def read(method):
+        # Not every pool class (e.g. SQLite's) tracks every figure
+        def read_pool():
+            value = getattr(pool, method, None)
+            return [((), value())] if callable(value) else []
+        return read_pool
+
+    registry.register(Gauge('gathr_db_pool_size', 'Configured pool size', read('size')))
+    registry.register(Gauge('gathr_db_pool_checked_out', 'Connections in use', read('checkedout')))
+    registry.register(Gauge('gathr_db_pool_checked_in', 'Idle pooled connections', read('checkedin')))
+    registry.register(Gauge('gathr_db_pool_overflow', 'Connections beyond the pool size', read('overflow')))
+
+def register_gauge(name, help, read):
+    """
+    Reports a single unlabelled value read at scrape time
+
+    Args:
+        name: Metric name
+        help: Metric description
+        read: Zero-argument callable returning the value
+    """
+    registry.register(Gauge(name, help, lambda: [((), read())]))
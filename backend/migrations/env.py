@@ -0,0 +1,60 @@
+"""
+@file env.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Alembic environment for the Gathr backend
+
+Migrations run against the application's own engine (DATABASE_URL), and
+the models' metadata is the autogenerate target.
+"""
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+
+# Make the backend modules importable when alembic runs from elsewhere
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Base, engine
+import models
+
+if context.config.config_file_name is not None:
+    fileConfig(context.config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline():
+    """Emits the migration SQL without connecting to the database"""
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=engine.dialect.name == 'sqlite'
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online():
+    """Runs the migrations on a connection (the caller's, if given)"""
+    connection = context.config.attributes.get('connection')
+    if connection is None:
+        with engine.connect() as connection:
+            _run(connection)
+    else:
+        _run(connection)
+
+def _run(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite cannot alter constraints in place; batch mode rebuilds tables
+        render_as_batch=connection.dialect.name == 'sqlite'
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
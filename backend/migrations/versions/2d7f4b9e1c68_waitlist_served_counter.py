@@ -0,0 +1,32 @@
+"""
+Per-event counter of served waitlist positions
+
+Records the last waitlist position taken off the head of each event's
+queue, so a waiting user's place is a subtraction instead of a count of
+the entries ahead of them.
+
+Revision ID: 2d7f4b9e1c68
+Revises: 9b4e7a2c5d13
+Create Date: 2026-10-18 23:30:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '2d7f4b9e1c68'
+down_revision = '9b4e7a2c5d13'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('events', sa.Column('waitlist_served', sa.Integer(), nullable=False, server_default='0'))
+    
+    # Entries already served or dropped sit below each queue's head
+    op.execute(
+        "UPDATE events SET waitlist_served = COALESCE("
+        "(SELECT MIN(position) - 1 FROM waitlist_entries WHERE waitlist_entries.event_id = events.id),"
+        " waitlist_seq)"
+    )
+
+def downgrade():
+    with op.batch_alter_table('events') as batch:
+        batch.drop_column('waitlist_served')
@@ -0,0 +1,83 @@
+"""
+Baseline schema, as created by init_db() before migrations existed
+
+Databases created that way have no alembic_version table; init_db()
+stamps them at this revision before upgrading.
+
+Revision ID: 6c0f2d1e8a41
+Revises:
+Create Date: 2026-10-18 22:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '6c0f2d1e8a41'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# String arrays; stored as JSON on SQLite
+StringArray = postgresql.ARRAY(sa.String()).with_variant(sa.JSON(), 'sqlite')
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('email', sa.String(100), nullable=False, unique=True),
+        sa.Column('password_hash', sa.String(200), nullable=False),
+        sa.Column('has_completed_personality_test', sa.Boolean()),
+        sa.Column('personality_tags', StringArray)
+    )
+    op.create_table(
+        'events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('time', sa.DateTime(), nullable=False),
+        sa.Column('location', sa.String(200), nullable=False),
+        sa.Column('image_url', sa.String(500)),
+        sa.Column('capacity', sa.Integer()),
+        sa.Column('categories', StringArray),
+        sa.Column('creator_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False)
+    )
+    op.create_table(
+        'attendances',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id'), nullable=False),
+        sa.Column('registered_at', sa.DateTime())
+    )
+    op.create_table(
+        'connections',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('connected_user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime())
+    )
+    op.create_table(
+        'messages',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('sender_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('recipient_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id')),
+        sa.Column('sent_at', sa.DateTime()),
+        sa.Column('read_at', sa.DateTime())
+    )
+    op.create_table(
+        'feedback',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('rating', sa.Integer(), nullable=False),
+        sa.Column('enjoyed_most', StringArray),
+        sa.Column('comment', sa.Text()),
+        sa.Column('submitted_at', sa.DateTime())
+    )
+
+def downgrade():
+    for table in ('feedback', 'messages', 'connections', 'attendances', 'events', 'users'):
+        op.drop_table(table)
@@ -0,0 +1,122 @@
+"""
+Columns, tables and indexes added by the query and booking work
+
+Adds user tiers and activity timestamps, event coordinates and waitlist
+counters, the waitlist and messaging grant tables, and the indexes the
+dashboard, search, filter, messaging and admin queries rely on.
+
+Revision ID: 9b4e7a2c5d13
+Revises: 6c0f2d1e8a41
+Create Date: 2026-10-18 23:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '9b4e7a2c5d13'
+down_revision = '6c0f2d1e8a41'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    
+    # Users: tier and activity timestamps for the admin statistics
+    op.add_column('users', sa.Column('tier', sa.String(20), nullable=False, server_default='free'))
+    op.add_column('users', sa.Column('created_at', sa.DateTime()))
+    op.add_column('users', sa.Column('last_active', sa.DateTime()))
+    op.create_index('ix_users_created_at', 'users', ['created_at'])
+    op.create_index('ix_users_last_active', 'users', ['last_active'])
+    op.create_index('ix_users_tier', 'users', ['tier'])
+    if postgres:
+        # Trigram and prefix indexes for the admin user search
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index('ix_users_name_trgm', 'users', ['name'],
+                        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+        op.create_index('ix_users_email_trgm', 'users', ['email'],
+                        postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+        op.execute("CREATE INDEX ix_users_email_prefix ON users (lower(email) text_pattern_ops)")
+    
+    # Events: venue coordinates, geohash and the waitlist position counter
+    op.add_column('events', sa.Column('latitude', sa.Float()))
+    op.add_column('events', sa.Column('longitude', sa.Float()))
+    op.add_column('events', sa.Column('geohash', sa.String(12)))
+    op.add_column('events', sa.Column('waitlist_seq', sa.Integer(), nullable=False, server_default='0'))
+    op.create_index('ix_events_creator_date', 'events', ['creator_id', 'date'])
+    op.create_index('ix_events_date', 'events', ['date'])
+    op.create_index('ix_events_lat_lng', 'events', ['latitude', 'longitude'])
+    op.create_index('ix_events_geohash', 'events', ['geohash'],
+                    postgresql_ops={'geohash': 'text_pattern_ops'})
+    if postgres:
+        op.create_index('ix_events_categories', 'events', ['categories'], postgresql_using='gin')
+        op.execute(
+            "CREATE INDEX ix_events_search ON events USING gin "
+            "(to_tsvector('english', title || ' ' || description || ' ' || location))"
+        )
+    
+    # Attendances: one booking per user and event, keeping the earliest
+    op.execute(
+        "DELETE FROM attendances WHERE id NOT IN "
+        "(SELECT MIN(id) FROM attendances GROUP BY user_id, event_id)"
+    )
+    with op.batch_alter_table('attendances') as batch:
+        batch.create_unique_constraint('uq_attendances_user_event', ['user_id', 'event_id'])
+    op.create_index('ix_attendances_event_user', 'attendances', ['event_id', 'user_id'])
+    
+    op.create_index('ix_connections_user_connected', 'connections', ['user_id', 'connected_user_id'])
+    op.create_index('ix_connections_connected_user', 'connections', ['connected_user_id', 'user_id'])
+    op.create_index('ix_messages_conversation', 'messages', ['sender_id', 'recipient_id', 'id'])
+    op.create_index('ix_messages_unread', 'messages', ['recipient_id', 'sender_id'],
+                    postgresql_where=sa.text('read_at IS NULL'))
+    op.create_index('ix_feedback_user_event', 'feedback', ['user_id', 'event_id'])
+    
+    op.create_table(
+        'waitlist_entries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('joined_at', sa.DateTime()),
+        sa.UniqueConstraint('event_id', 'position', name='uq_waitlist_event_position'),
+        sa.UniqueConstraint('event_id', 'user_id', name='uq_waitlist_event_user')
+    )
+    op.create_table(
+        'messaging_grants',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('recipient_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+        sa.UniqueConstraint('user_id', 'event_id', 'recipient_id', name='uq_messaging_grants')
+    )
+
+def downgrade():
+    op.drop_table('messaging_grants')
+    op.drop_table('waitlist_entries')
+    
+    for table, index in (
+        ('feedback', 'ix_feedback_user_event'),
+        ('messages', 'ix_messages_unread'),
+        ('messages', 'ix_messages_conversation'),
+        ('connections', 'ix_connections_connected_user'),
+        ('connections', 'ix_connections_user_connected'),
+        ('attendances', 'ix_attendances_event_user'),
+    ):
+        op.drop_index(index, table_name=table)
+    with op.batch_alter_table('attendances') as batch:
+        batch.drop_constraint('uq_attendances_user_event', type_='unique')
+    
+    op.execute("DROP INDEX IF EXISTS ix_events_search")
+    op.execute("DROP INDEX IF EXISTS ix_events_categories")
+    for index in ('ix_events_geohash', 'ix_events_lat_lng', 'ix_events_date', 'ix_events_creator_date'):
+        op.drop_index(index, table_name='events')
+    with op.batch_alter_table('events') as batch:
+        for column in ('waitlist_seq', 'geohash', 'longitude', 'latitude'):
+            batch.drop_column(column)
+    
+    for index in ('ix_users_email_prefix', 'ix_users_email_trgm', 'ix_users_name_trgm'):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+    for index in ('ix_users_tier', 'ix_users_last_active', 'ix_users_created_at'):
+        op.drop_index(index, table_name='users')
+    with op.batch_alter_table('users') as batch:
+        for column in ('last_active', 'created_at', 'tier'):
+            batch.drop_column(column)
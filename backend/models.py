@@ -7,14 +7,19 @@
 Database Models for Gathr Application
 
 This module defines the SQLAlchemy ORM models for the Gathr application.
-Models include User, Event, Attendance, Connection, Message, and Feedback.
+Models include User, Event, Attendance, WaitlistEntry, Connection, Message,
+MessagingGrant, and Feedback.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Table, Float
+from sqlalchemy import func, Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Table, Float, Index, UniqueConstraint, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import ARRAY
 from database import Base
 from datetime import datetime
 
+# String arrays; stored as JSON on SQLite, which stands in for Postgres
+# in local seeding and load tests
+StringArray = ARRAY(String).with_variant(JSON(), 'sqlite')
+
 class User(Base):
     """
     User model representing application users
@@ -26,6 +31,9 @@ class User(Base):
         password_hash: Hashed password
         has_completed_personality_test: Whether personality test is completed
         personality_tags: List of personality traits from test
+        tier: Subscription tier (free, premium, enterprise)
+        created_at: When the user registered
+        last_active: When the user last logged in
         events_created: Events created by this user
         events_attending: Events this user is attending
         connections: Users in this user's Gathr circle
@@ -40,7 +48,31 @@ class User(Base):
     email = Column(String(100), unique=True, nullable=False)
     password_hash = Column(String(200), nullable=False)
     has_completed_personality_test = Column(Boolean, default=False)
-    personality_tags = Column(ARRAY(String), default=[])
+    personality_tags = Column(StringArray, default=[])
+    tier = Column(String(20), default='free', nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+    last_active = Column(DateTime, nullable=True)
+    
+    # Indexes backing the admin statistics aggregates
+    __table_args__ = (
+        Index('ix_users_created_at', 'created_at'),
+        Index('ix_users_last_active', 'last_active'),
+        Index('ix_users_tier', 'tier'),
+        # Trigram indexes serving the admin substring search (pg_trgm)
+        Index(
+            'ix_users_name_trgm', 'name',
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+        Index(
+            'ix_users_email_trgm', 'email',
+            postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+        # Prefix index for email lookups (LIKE 'term%')
+        Index(
+            'ix_users_email_prefix', func.lower(email).label('email_lower'),
+            postgresql_ops={'email_lower': 'text_pattern_ops'}
+        ).ddl_if(dialect='postgresql'),
+    )
     
     # Relationships
     events_created = relationship("Event", back_populates="creator")
@@ -67,6 +99,11 @@ class Event(Base):
         image_url: URL to event image
         capacity: Maximum number of attendees
         categories: List of category tags
+        latitude: Latitude of the venue in degrees (optional)
+        longitude: Longitude of the venue in degrees (optional)
+        geohash: Geohash of the venue, used for spatial pruning
+        waitlist_seq: Last waitlist position handed out for this event
+        waitlist_served: Last waitlist position taken off the queue
         creator_id: ID of user who created the event
         creator: Relationship to creator user
         attendees: Users attending this event
@@ -83,11 +120,26 @@ class Event(Base):
     location = Column(String(200), nullable=False)
     image_url = Column(String(500))
     capacity = Column(Integer, default=0)
-    categories = Column(ARRAY(String), default=[])
+    categories = Column(StringArray, default=[])
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
+    waitlist_seq = Column(Integer, default=0, nullable=False)
+    waitlist_served = Column(Integer, default=0, nullable=False)
     
     # Foreign keys
     creator_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     
+    # Indexes backing the per-user dashboard, date-window and nearby queries
+    __table_args__ = (
+        Index('ix_events_creator_date', 'creator_id', 'date'),
+        Index('ix_events_date', 'date'),
+        Index('ix_events_lat_lng', 'latitude', 'longitude'),
+        Index('ix_events_geohash', 'geohash', postgresql_ops={'geohash': 'text_pattern_ops'}),
+        # Serves category overlap (&&) and containment (@>) filters
+        Index('ix_events_categories', 'categories', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+    
     # Relationships
     creator = relationship("User", back_populates="events_created")
     attendees = relationship("Attendance", back_populates="event")
@@ -97,6 +149,21 @@ class Event(Base):
     def __repr__(self):
         return f"<Event {self.title}>"
 
+def event_search_vector():
+    """
+    Full-text search document for events (title, description and location)
+    
+    The expression matches the ix_events_search GIN index exactly, so
+    queries built from it are served by the index on PostgreSQL.
+    """
+    return func.to_tsvector(
+        'english',
+        Event.title + ' ' + Event.description + ' ' + Event.location
+    )
+
+# GIN index over the event search document
+Index('ix_events_search', event_search_vector(), postgresql_using='gin').ddl_if(dialect='postgresql')
+
 class Attendance(Base):
     """
     Attendance model representing user attendance at events
@@ -118,6 +185,12 @@ class Attendance(Base):
     event_id = Column(Integer, ForeignKey('events.id'), nullable=False)
     registered_at = Column(DateTime, default=datetime.now)
     
+    # One booking per user and event; also serves "events of a user" lookups
+    __table_args__ = (
+        UniqueConstraint('user_id', 'event_id', name='uq_attendances_user_event'),
+        Index('ix_attendances_event_user', 'event_id', 'user_id'),
+    )
+    
     # Relationships
     user = relationship("User", back_populates="events_attending")
     event = relationship("Event", back_populates="attendees")
@@ -125,6 +198,39 @@ class Attendance(Base):
     def __repr__(self):
         return f"<Attendance user_id={self.user_id} event_id={self.event_id}>"
 
+class WaitlistEntry(Base):
+    """
+    WaitlistEntry model representing a user queued for a full event
+    
+    Positions come from a per-event counter, so joining is O(1) and the
+    head of the queue is an index seek on (event_id, position). A second
+    counter records the last position served, so a user's place in the
+    queue is their position minus it.
+    
+    Attributes:
+        id: Unique identifier
+        event_id: ID of the event
+        user_id: ID of the waiting user
+        position: Queue position (lower is served first)
+        joined_at: When the user joined the waitlist
+    """
+    __tablename__ = 'waitlist_entries'
+    
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey('events.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    position = Column(Integer, nullable=False)
+    joined_at = Column(DateTime, default=datetime.now)
+    
+    # Queue order per event, and one entry per user and event
+    __table_args__ = (
+        UniqueConstraint('event_id', 'position', name='uq_waitlist_event_position'),
+        UniqueConstraint('event_id', 'user_id', name='uq_waitlist_event_user'),
+    )
+    
+    def __repr__(self):
+        return f"<WaitlistEntry event_id={self.event_id} user_id={self.user_id} position={self.position}>"
+
 class Connection(Base):
     """
     Connection model representing the Gathr circle relationships
@@ -144,6 +250,12 @@ class Connection(Base):
     connected_user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     created_at = Column(DateTime, default=datetime.now)
     
+    # Indexes for listing a user's circle and finding who follows a user
+    __table_args__ = (
+        Index('ix_connections_user_connected', 'user_id', 'connected_user_id'),
+        Index('ix_connections_connected_user', 'connected_user_id', 'user_id'),
+    )
+    
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
     connected_user = relationship("User", foreign_keys=[connected_user_id])
@@ -177,6 +289,15 @@ class Message(Base):
     sent_at = Column(DateTime, default=datetime.now)
     read_at = Column(DateTime, nullable=True)
     
+    # Indexes for conversation paging and unread lookups
+    __table_args__ = (
+        Index('ix_messages_conversation', 'sender_id', 'recipient_id', 'id'),
+        Index(
+            'ix_messages_unread', 'recipient_id', 'sender_id',
+            postgresql_where=read_at.is_(None)
+        ),
+    )
+    
     # Relationships
     sender = relationship("User", foreign_keys=[sender_id])
     recipient = relationship("User", foreign_keys=[recipient_id])
@@ -185,6 +306,38 @@ class Message(Base):
     def __repr__(self):
         return f"<Message sender_id={self.sender_id} recipient_id={self.recipient_id}>"
 
+class MessagingGrant(Base):
+    """
+    MessagingGrant model materializing who may message whom for an event
+    
+    Grants are sampled per user and event when a seat is booked (see
+    messaging.py) and topped up as attendance grows, so messaging
+    permission checks become a single indexed lookup instead of
+    re-sampling the whole attendee list.
+    
+    Attributes:
+        id: Unique identifier
+        event_id: ID of the event the grant applies to
+        user_id: ID of the user allowed to send messages
+        recipient_id: ID of the attendee that may be messaged
+        created_at: When the grant was materialized
+    """
+    __tablename__ = 'messaging_grants'
+    
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey('events.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    recipient_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+    
+    # One grant per sender, event and recipient
+    __table_args__ = (
+        UniqueConstraint('user_id', 'event_id', 'recipient_id', name='uq_messaging_grants'),
+    )
+    
+    def __repr__(self):
+        return f"<MessagingGrant user_id={self.user_id} event_id={self.event_id} recipient_id={self.recipient_id}>"
+
 class Feedback(Base):
     """
     Feedback model for storing event feedback
@@ -206,10 +359,15 @@ class Feedback(Base):
     event_id = Column(Integer, ForeignKey('events.id'), nullable=False)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     rating = Column(Integer, nullable=False)  # 1-5 rating
-    enjoyed_most = Column(ARRAY(String), default=[])  # Aspects enjoyed most
+    enjoyed_most = Column(StringArray, default=[])  # Aspects enjoyed most
     comment = Column(Text, nullable=True)
     submitted_at = Column(DateTime, default=datetime.now)
     
+    # Index for "has this user given feedback for this event" lookups
+    __table_args__ = (
+        Index('ix_feedback_user_event', 'user_id', 'event_id'),
+    )
+    
     # Relationships
     event = relationship("Event", back_populates="feedback")
     user = relationship("User", back_populates="feedback_given")
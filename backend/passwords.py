@@ -0,0 +1,98 @@
+"""
+@file passwords.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Password Hashing Module
+
+Password hashing is deliberately CPU-heavy. Running it inline under
+eventlet blocks the whole hub, stalling every WebSocket and request on
+the worker during a login burst. This module runs hashing on a bounded
+pool of native threads instead: eventlet's tpool when the process is
+monkey-patched, a ThreadPoolExecutor otherwise. A concurrency limit caps
+the hashes in flight and a pending limit sheds excess load.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Hashes computed concurrently
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+
+# Hashes allowed to wait for a worker before new ones are rejected
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 64))
+
+class HashingBusy(Exception):
+    """Raised when too many password hashes are already queued"""
+
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS)
+_pending_lock = threading.Lock()
+_pending = 0
+_executor = None
+
+def _eventlet_patched():
+    """Whether eventlet has monkey-patched threading in this process"""
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('thread')
+
+def _run(func, *args):
+    """
+    Runs a hashing function on a native thread, within the pool limits
+
+    Raises:
+        HashingBusy: If the pending limit is reached
+    """
+    global _pending, _executor
+
+    with _pending_lock:
+        if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING:
+            raise HashingBusy()
+        _pending += 1
+
+    try:
+        # Under eventlet the semaphore is green, so waiting yields the hub
+        with _slots:
+            if _eventlet_patched():
+                from eventlet import tpool
+                return tpool.execute(func, *args)
+
+            if _executor is None:
+                with _pending_lock:
+                    if _executor is None:
+                        _executor = ThreadPoolExecutor(
+                            max_workers=PASSWORD_HASH_WORKERS,
+                            thread_name_prefix='password-hash'
+                        )
+            return _executor.submit(func, *args).result()
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+def hash_password(password):
+    """
+    Hashes a password off the event loop
+
+    Args:
+        password: Plain-text password
+
+    Returns:
+        Password hash
+    """
+    return _run(generate_password_hash, password)
+
+def verify_password(password_hash, password):
+    """
+    Checks a password against its hash off the event loop
+
+    Args:
+        password_hash: Stored password hash
+        password: Plain-text password
+
+    Returns:
+        True if the password matches
+    """
+    return _run(check_password_hash, password_hash, password)
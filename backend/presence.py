@@ -0,0 +1,343 @@
+"""
+@file presence.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Presence Service
+
+This module tracks which users are online. Per user it keeps only a
+session count and a last-seen timestamp; users are online while they
+have a session and were seen within the heartbeat TTL. Each worker
+heartbeats on behalf of its live sockets, so users whose worker died
+without disconnecting them expire after the TTL.
+
+Presence for thousands of users is answered in one call, and status
+changes are debounced and announced in batches to the users who have
+the changed user in their Gathr circle.
+
+Supported PRESENCE_STORE_URL values:
+- (unset): in-process tracker for a single worker
+- redis:// or rediss://: tracker shared by all workers
+"""
+import threading
+import time
+from datetime import datetime
+
+from database import db_session
+from models import Connection
+
+def _last_seen(timestamp):
+    """Formats a last-seen timestamp for API responses"""
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+class PresenceTracker:
+    """
+    In-process presence tracker
+
+    Attributes:
+        ttl: Seconds without a heartbeat after which a user is offline
+    """
+
+    def __init__(self, ttl=90):
+        self.ttl = ttl
+        # user_id -> [session count, last seen timestamp]
+        self._users = {}
+        self._lock = threading.Lock()
+
+    def connect(self, user_id):
+        """
+        Records a new session of a user
+
+        Returns:
+            True if the user came online
+        """
+        now = time.time()
+        with self._lock:
+            state = self._users.get(user_id)
+            was_online = state is not None and self._is_online(state, now)
+            if state is None or state[0] <= 0:
+                state = self._users[user_id] = [0, now]
+            state[0] += 1
+            state[1] = now
+            return not was_online
+
+    def disconnect(self, user_id):
+        """
+        Records the end of a user's session
+
+        Returns:
+            True if the user went offline
+        """
+        now = time.time()
+        with self._lock:
+            state = self._users.get(user_id)
+            if state is None or state[0] <= 0:
+                return False
+            state[0] -= 1
+            state[1] = now
+            return state[0] == 0
+
+    def touch(self, user_ids):
+        """
+        Refreshes the last-seen time of connected users
+
+        Args:
+            user_ids: IDs of users with live sessions
+        """
+        now = time.time()
+        with self._lock:
+            for user_id in user_ids:
+                state = self._users.get(user_id)
+                if state is not None and state[0] > 0:
+                    state[1] = now
+
+    def expire(self):
+        """
+        Drops users not seen within the TTL
+
+        Returns:
+            IDs of users that were online and have expired
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            stale = [user_id for user_id, state in self._users.items() if state[1] < cutoff]
+            expired = [user_id for user_id in stale if self._users.pop(user_id)[0] > 0]
+        return expired
+
+    def statuses(self, user_ids):
+        """
+        Looks up presence for many users at once
+
+        Args:
+            user_ids: User IDs
+
+        Returns:
+            Dictionary of user ID to {"online": bool, "lastSeen": ISO time or None}
+        """
+        now = time.time()
+        with self._lock:
+            states = {user_id: self._users.get(user_id) for user_id in user_ids}
+        return {
+            user_id: {
+                "online": state is not None and self._is_online(state, now),
+                "lastSeen": _last_seen(state[1] if state else None)
+            }
+            for user_id, state in states.items()
+        }
+
+    def online_user_ids(self):
+        """IDs of every online user"""
+        now = time.time()
+        with self._lock:
+            return {user_id for user_id, state in self._users.items() if self._is_online(state, now)}
+
+    def _is_online(self, state, now):
+        return state[0] > 0 and now - state[1] <= self.ttl
+
+class RedisPresenceTracker:
+    """
+    Presence tracker shared by all workers through Redis
+
+    Same interface as PresenceTracker. Session counts live in a hash and
+    last-seen times in a sorted set, so expiry is a range query.
+
+    Attributes:
+        ttl: Seconds without a heartbeat after which a user is offline
+        prefix: Key prefix for the tracker's Redis keys
+    """
+
+    def __init__(self, url, ttl=90, prefix='gathr:presence'):
+        import redis
+
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._counts = f"{prefix}:sessions"
+        self._seen = f"{prefix}:seen"
+
+    def connect(self, user_id):
+        """Records a new session of a user; returns True if they came online"""
+        pipeline = self._redis.pipeline()
+        pipeline.hincrby(self._counts, user_id, 1)
+        pipeline.zadd(self._seen, {user_id: time.time()})
+        count, _ = pipeline.execute()
+        return count == 1
+
+    def disconnect(self, user_id):
+        """Records the end of a user's session; returns True if they went offline"""
+        count = self._redis.hincrby(self._counts, user_id, -1)
+        self._redis.zadd(self._seen, {user_id: time.time()})
+        if count <= 0:
+            self._redis.hdel(self._counts, user_id)
+        return count == 0
+
+    def touch(self, user_ids):
+        """Refreshes the last-seen time of connected users"""
+        user_ids = list(user_ids)
+        if user_ids:
+            now = time.time()
+            self._redis.zadd(self._seen, {user_id: now for user_id in user_ids})
+
+    def expire(self):
+        """Drops users not seen within the TTL; returns those that were online"""
+        stale = self._redis.zrangebyscore(self._seen, '-inf', time.time() - self.ttl)
+        if not stale:
+            return []
+        counts = self._redis.hmget(self._counts, stale)
+        pipeline = self._redis.pipeline()
+        pipeline.hdel(self._counts, *stale)
+        pipeline.zrem(self._seen, *stale)
+        pipeline.execute()
+        return [int(user_id) for user_id, count in zip(stale, counts) if count and int(count) > 0]
+
+    def statuses(self, user_ids):
+        """Looks up presence for many users in one round trip"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        pipeline = self._redis.pipeline()
+        pipeline.hmget(self._counts, user_ids)
+        pipeline.zmscore(self._seen, user_ids)
+        counts, seen = pipeline.execute()
+
+        cutoff = time.time() - self.ttl
+        return {
+            user_id: {
+                "online": bool(count and int(count) > 0 and last_seen and last_seen >= cutoff),
+                "lastSeen": _last_seen(last_seen)
+            }
+            for user_id, count, last_seen in zip(user_ids, counts, seen)
+        }
+
+    def online_user_ids(self):
+        """IDs of every online user"""
+        recent = self._redis.zrangebyscore(self._seen, time.time() - self.ttl, '+inf')
+        if not recent:
+            return set()
+        counts = self._redis.hmget(self._counts, recent)
+        return {int(user_id) for user_id, count in zip(recent, counts) if count and int(count) > 0}
+
+def make_presence_tracker(url, ttl=90):
+    """
+    Builds the presence tracker for a presence store URL
+
+    Args:
+        url: Redis URL for a shared tracker, or None for a local one
+        ttl: Heartbeat TTL in seconds
+
+    Returns:
+        PresenceTracker or RedisPresenceTracker
+    """
+    if url and url.startswith(('redis://', 'rediss://')):
+        return RedisPresenceTracker(url, ttl=ttl)
+    return PresenceTracker(ttl=ttl)
+
+class PresenceBroadcaster:
+    """
+    Debounced announcer of online status changes
+
+    Changes are collected for one debounce interval; a user who flaps
+    offline and back within it produces no announcement. Each follower
+    then gets a single presence_update event listing every changed user
+    they follow.
+
+    Attributes:
+        tracker: Presence tracker
+        debounce: Seconds changes are collected before announcing
+    """
+
+    def __init__(self, tracker, debounce=5):
+        self.tracker = tracker
+        self.debounce = debounce
+        self._changed = set()
+        # Users last announced as online by this worker
+        self._announced = set()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def changed(self, user_id):
+        """
+        Marks a user whose status may have changed
+
+        Args:
+            user_id: User ID
+        """
+        with self._lock:
+            self._changed.add(user_id)
+
+    def flush(self, socketio):
+        """
+        Announces the status changes collected since the last flush
+
+        Args:
+            socketio: SocketIO instance used to emit
+
+        Returns:
+            Number of users whose change was announced
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        if not changed:
+            return 0
+
+        statuses = self.tracker.statuses(changed)
+        with self._lock:
+            updates = {
+                user_id: status for user_id, status in statuses.items()
+                if status["online"] != (user_id in self._announced)
+            }
+            for user_id, status in updates.items():
+                if status["online"]:
+                    self._announced.add(user_id)
+                else:
+                    self._announced.discard(user_id)
+        if not updates:
+            return 0
+
+        # Followers of the changed users, in one query
+        try:
+            followers = (
+                db_session.query(Connection.user_id, Connection.connected_user_id)
+                .filter(Connection.connected_user_id.in_(list(updates)))
+                .all()
+            )
+        finally:
+            db_session.remove()
+
+        by_follower = {}
+        for follower_id, user_id in followers:
+            by_follower.setdefault(follower_id, []).append(
+                {"userId": user_id, **updates[user_id]}
+            )
+
+        # Only followers who are online can receive the update
+        online_followers = self.tracker.statuses(by_follower)
+        for follower_id, follower_updates in by_follower.items():
+            if online_followers[follower_id]["online"]:
+                socketio.emit('presence_update', {"statuses": follower_updates}, to=str(follower_id))
+        return len(updates)
+
+    def start(self, socketio, live_user_ids):
+        """
+        Starts the background heartbeat, expiry and announcement loop once
+
+        Args:
+            socketio: SocketIO instance used to emit and spawn the task
+            live_user_ids: Callable returning the IDs of users with live
+                sockets on this worker
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        socketio.start_background_task(self._run, socketio, live_user_ids)
+
+    def _run(self, socketio, live_user_ids):
+        """Background loop heartbeating live users and announcing changes"""
+        while True:
+            socketio.sleep(self.debounce)
+            try:
+                self.tracker.touch(live_user_ids())
+                for user_id in self.tracker.expire():
+                    self.changed(user_id)
+                self.flush(socketio)
+            except Exception as e:
+                print(f"Presence broadcast error: {str(e)}")
@@ -0,0 +1,314 @@
+"""
+@file profiling.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Request Profiling Module
+
+This module profiles live requests on demand and writes the result to
+PROFILE_DIR. A request is profiled when:
+- it carries a valid signed X-Profile header (see make_profile_token), or
+- an admin adds ?profile=cprofile or ?profile=sample to it, or
+- it is picked by continuous sampling (PROFILE_SAMPLE_RATE), which is
+  rate limited and keeps only the slowest requests per endpoint
+
+cProfile runs write a .pstats file (open with pstats or snakeviz). The
+sampling profiler reads the request's stack from a native thread every
+few milliseconds, which costs the request almost nothing, and writes a
+.collapsed file of folded stacks for flame graph tools. Under eventlet
+it samples the request's own green thread, including time spent
+waiting on I/O.
+
+Usage:
+    PROFILE_SECRET=... python profiling.py token [seconds]
+"""
+import cProfile
+import heapq
+import hmac
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from hashlib import sha256
+
+from flask import request
+
+from ratelimit import RateLimiter
+
+# Directory receiving profile artifacts
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(os.path.dirname(__file__), 'profiles'))
+
+# Secret for signed X-Profile headers (unset disables them)
+PROFILE_SECRET = os.environ.get('PROFILE_SECRET')
+
+# Fraction of requests considered for continuous sampling (0 disables it)
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+
+# Upper bound on continuously sampled requests per minute
+PROFILE_SAMPLES_PER_MINUTE = float(os.environ.get('PROFILE_SAMPLES_PER_MINUTE', 6))
+
+# Sampled profiles kept per endpoint (the slowest ones)
+PROFILE_KEEP_SLOWEST = int(os.environ.get('PROFILE_KEEP_SLOWEST', 5))
+
+# Seconds between stack samples
+PROFILE_SAMPLE_INTERVAL = int(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', 5)) / 1000
+
+PROFILE_MODES = ('cprofile', 'sample')
+
+def _native_modules():
+    """The real threading and time modules, even under eventlet"""
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return threading, time
+    if patcher.is_monkey_patched('thread'):
+        return patcher.original('threading'), patcher.original('time')
+    return threading, time
+
+def _current_greenlet():
+    """The running greenlet, or None when greenlet is not installed"""
+    try:
+        import greenlet
+    except ImportError:
+        return None
+    return greenlet.getcurrent()
+
+def _sign(expires):
+    return hmac.new(PROFILE_SECRET.encode(), str(expires).encode(), sha256).hexdigest()
+
+def make_profile_token(ttl=300):
+    """
+    Builds an X-Profile header value valid for ttl seconds
+
+    Args:
+        ttl: Seconds the token stays valid
+
+    Returns:
+        Token of the form "<expiry>.<signature>"
+    """
+    expires = int(time.time()) + ttl
+    return f"{expires}.{_sign(expires)}"
+
+def verify_profile_token(token):
+    """
+    Checks an X-Profile header value
+
+    Returns:
+        True if the token is correctly signed and not expired
+    """
+    if not PROFILE_SECRET or not token:
+        return False
+    expires, _, signature = token.partition('.')
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(int(expires)))
+
+class CProfileSession:
+    """Deterministic profile of one request with cProfile"""
+
+    extension = 'pstats'
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def dump(self, path):
+        pstats.Stats(self._profile).dump_stats(path)
+
+class SamplingSession:
+    """
+    Statistical profile of one request from periodic stack samples
+
+    Attributes:
+        interval: Seconds between samples
+    """
+
+    extension = 'collapsed'
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self._threading, self._time = _native_modules()
+        self._stacks = Counter()
+        self._lock = self._threading.Lock()
+        self._running = False
+
+    def start(self):
+        self._thread_id = self._threading.get_ident()
+        self._greenlet = _current_greenlet()
+        self._running = True
+        self._threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def _frame(self):
+        # A suspended green thread keeps its frame; a running one is on top
+        # of its OS thread
+        if self._greenlet is not None and self._greenlet.gr_frame is not None:
+            return self._greenlet.gr_frame
+        return sys._current_frames().get(self._thread_id)
+
+    def _run(self):
+        while self._running:
+            frame = self._frame()
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                with self._lock:
+                    self._stacks[";".join(reversed(stack))] += 1
+            self._time.sleep(self.interval)
+
+    def dump(self, path):
+        with self._lock:
+            stacks = sorted(self._stacks.items())
+        with open(path, 'w') as f:
+            for stack, count in stacks:
+                f.write(f"{stack} {count}\n")
+
+PROFILE_SESSIONS = {'cprofile': CProfileSession, 'sample': SamplingSession}
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and stores their profiles
+
+    Attributes:
+        directory: Directory receiving profile artifacts
+        sample_rate: Fraction of requests considered for sampling
+        keep_slowest: Sampled profiles kept per endpoint
+    """
+
+    def __init__(self, directory=PROFILE_DIR, sample_rate=PROFILE_SAMPLE_RATE,
+                 samples_per_minute=PROFILE_SAMPLES_PER_MINUTE, keep_slowest=PROFILE_KEEP_SLOWEST):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.keep_slowest = keep_slowest
+        self._sample_limiter = RateLimiter(rate=samples_per_minute / 60, burst=max(1, samples_per_minute))
+        # endpoint -> min-heap of (duration, path) of the slowest samples
+        self._slowest = {}
+        self._lock = threading.Lock()
+        # (session, sampled, start time) of the current request
+        self._active = ContextVar('active_profile', default=None)
+
+    def requested_mode(self, is_admin):
+        """
+        Profiling mode explicitly requested for the current request
+
+        Args:
+            is_admin: Zero-argument callable telling whether the caller is
+                an admin; only called when ?profile= is present
+
+        Returns:
+            Mode name, or None
+        """
+        if 'X-Profile' in request.headers:
+            if verify_profile_token(request.headers['X-Profile']):
+                mode = request.headers.get('X-Profile-Mode', 'cprofile')
+                return mode if mode in PROFILE_MODES else 'cprofile'
+            return None
+
+        if request.query_string:
+            mode = request.args.get('profile')
+            if mode in PROFILE_MODES and is_admin():
+                return mode
+        return None
+
+    def begin(self, is_admin):
+        """Starts profiling the current request if requested or sampled"""
+        mode = self.requested_mode(is_admin)
+        sampled = False
+        if mode is None and self.sample_rate > 0 and random.random() < self.sample_rate:
+            if self._sample_limiter.allow('sample'):
+                mode, sampled = 'sample', True
+        if mode is None:
+            return
+
+        session = PROFILE_SESSIONS[mode]()
+        self._active.set((session, sampled, time.perf_counter()))
+        session.start()
+
+    def finish(self, response):
+        """Stops profiling the current request and stores its profile"""
+        active = self._active.get()
+        if active is None:
+            return response
+        self._active.set(None)
+
+        session, sampled, start = active
+        session.stop()
+        duration = time.perf_counter() - start
+        endpoint = request.endpoint or 'unmatched'
+
+        try:
+            if sampled:
+                self._keep_if_slow(session, endpoint, duration)
+            else:
+                path = self._dump(session, endpoint, duration)
+                response.headers['X-Profile-Artifact'] = os.path.basename(path)
+        except OSError as e:
+            print(f"Profile dump error: {str(e)}")
+        return response
+
+    def _dump(self, session, endpoint, duration):
+        """Writes a profile and returns its path"""
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"{endpoint}-{int(time.time() * 1000)}-{int(duration * 1000)}ms.{session.extension}"
+        path = os.path.join(self.directory, name)
+        session.dump(path)
+        return path
+
+    def _keep_if_slow(self, session, endpoint, duration):
+        """Keeps a sampled profile if it is among the endpoint's slowest"""
+        with self._lock:
+            slowest = self._slowest.setdefault(endpoint, [])
+            if len(slowest) >= self.keep_slowest and duration <= slowest[0][0]:
+                return
+
+        path = self._dump(session, endpoint, duration)
+        evicted = None
+        with self._lock:
+            heapq.heappush(slowest, (duration, path))
+            if len(slowest) > self.keep_slowest:
+                evicted = heapq.heappop(slowest)[1]
+        if evicted:
+            os.remove(evicted)
+
+def init_app(app, is_admin, profiler=None):
+    """
+    Profiles requests of a Flask app as described in the module docstring
+
+    Args:
+        app: Flask application
+        is_admin: Zero-argument callable telling whether the caller is an admin
+        profiler: RequestProfiler to use (default settings if omitted)
+
+    Returns:
+        The RequestProfiler
+    """
+    profiler = profiler or RequestProfiler()
+
+    @app.before_request
+    def start_profiling():
+        profiler.begin(is_admin)
+
+    @app.after_request
+    def finish_profiling(response):
+        return profiler.finish(response)
+
+    return profiler
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] != 'token' or not PROFILE_SECRET:
+        print("Usage: PROFILE_SECRET=... python profiling.py token [seconds]")
+        sys.exit(1)
+    print(make_profile_token(int(sys.argv[2]) if len(sys.argv) > 2 else 300))
@@ -0,0 +1,197 @@
+"""
+@file pubsub.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Pluggable Pub/Sub for Socket.IO
+
+This module lets several Socket.IO server processes (workers or nodes)
+share one logical server. Emits and room broadcasts are fanned out
+through a message queue chosen by URL, and room membership is kept in a
+shared registry so presence checks see every worker's clients.
+
+Supported SOCKETIO_MESSAGE_QUEUE URLs:
+- (unset): single process, no message queue
+- local://<name>: in-memory broker shared by servers in one process,
+  used in tests to stand in for a real queue
+- redis:// or rediss://: Redis pub/sub
+- amqp://, kafka:// and other Kombu URLs: Kombu
+- zmq+tcp://: ZeroMQ
+
+Multi-worker deployments also need sticky sessions at the load balancer
+so a client's polling requests reach the worker holding its session.
+"""
+import queue
+import threading
+from collections import defaultdict
+
+import socketio
+
+from rooms import RoomRegistry
+
+class LocalBroker:
+    """
+    In-memory pub/sub broker delivering every message to every subscriber
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """
+        Registers a subscriber on a channel
+
+        Args:
+            channel: Channel name
+
+        Returns:
+            Queue receiving the channel's messages
+        """
+        inbox = queue.Queue()
+        with self._lock:
+            self._subscribers[channel].append(inbox)
+        return inbox
+
+    def publish(self, channel, message):
+        """
+        Delivers a message to every subscriber of a channel
+
+        Args:
+            channel: Channel name
+            message: Message payload
+        """
+        with self._lock:
+            inboxes = list(self._subscribers[channel])
+        for inbox in inboxes:
+            inbox.put(message)
+
+# Brokers for local:// URLs, by name
+_local_brokers = defaultdict(LocalBroker)
+
+class LocalPubSubManager(socketio.PubSubManager):
+    """
+    Socket.IO client manager backed by an in-process LocalBroker
+
+    Messages are JSON encoded on publish, as the network backends do and
+    as the listener expects, so payloads that would not survive a real
+    queue fail here too.
+    """
+    name = 'local'
+
+    def __init__(self, url='local://', channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.broker = _local_brokers[url]
+        self._inbox = None
+
+    def initialize(self):
+        # Subscribe before the listener starts so no message is missed
+        self._inbox = self.broker.subscribe(self.channel)
+        super().initialize()
+
+    def _publish(self, data):
+        self.broker.publish(self.channel, self.json.dumps(data))
+
+    def _listen(self):
+        while True:
+            yield self._inbox.get()
+
+def make_client_manager(url, write_only=False):
+    """
+    Builds the Socket.IO client manager for a message queue URL
+
+    Args:
+        url: Message queue URL (see module docstring), or None
+        write_only: Only publish (for processes that emit but serve no clients)
+
+    Returns:
+        Client manager, or None to use the default single-process manager
+    """
+    if not url:
+        return None
+    if url.startswith('local://'):
+        return LocalPubSubManager(url, write_only=write_only)
+    if url.startswith(('redis://', 'rediss://')):
+        return socketio.RedisManager(url, write_only=write_only)
+    if url.startswith('zmq'):
+        return socketio.ZmqManager(url, write_only=write_only)
+    return socketio.KombuManager(url, write_only=write_only)
+
+class RedisRoomRegistry:
+    """
+    Room registry shared by all workers through Redis sets
+
+    Same interface as rooms.RoomRegistry. Memberships of a worker that
+    dies without disconnecting its clients remain until those sids are
+    removed.
+
+    Attributes:
+        prefix: Key prefix for the registry's Redis keys
+    """
+
+    def __init__(self, url, prefix='gathr:rooms'):
+        import redis
+
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def _room_key(self, room):
+        return f"{self.prefix}:room:{room}"
+
+    def _sid_key(self, sid):
+        return f"{self.prefix}:sid:{sid}"
+
+    def join(self, sid, room):
+        """Adds a session to a room; returns True if newly added"""
+        pipeline = self._redis.pipeline()
+        pipeline.sadd(self._room_key(room), sid)
+        pipeline.sadd(self._sid_key(sid), room)
+        added, _ = pipeline.execute()
+        return bool(added)
+
+    def leave(self, sid, room):
+        """Removes a session from a room; returns True if it was there"""
+        pipeline = self._redis.pipeline()
+        pipeline.srem(self._room_key(room), sid)
+        pipeline.srem(self._sid_key(sid), room)
+        removed, _ = pipeline.execute()
+        return bool(removed)
+
+    def remove_sid(self, sid):
+        """Removes a session from every room; returns the rooms it left"""
+        rooms = list(self._redis.smembers(self._sid_key(sid)))
+        pipeline = self._redis.pipeline()
+        for room in rooms:
+            pipeline.srem(self._room_key(room), sid)
+        pipeline.delete(self._sid_key(sid))
+        pipeline.execute()
+        return rooms
+
+    def room_size(self, room):
+        """Number of sessions in a room across all workers"""
+        return self._redis.scard(self._room_key(room))
+
+    def members(self, room):
+        """Snapshot of the sessions in a room across all workers"""
+        return frozenset(self._redis.smembers(self._room_key(room)))
+
+    def rooms_of(self, sid):
+        """Snapshot of the rooms a session joined"""
+        return frozenset(self._redis.smembers(self._sid_key(sid)))
+
+    def __contains__(self, room):
+        # Empty Redis sets are deleted, so existence means non-empty
+        return bool(self._redis.exists(self._room_key(room)))
+
+def make_room_registry(url):
+    """
+    Builds the room registry for a presence store URL
+
+    Args:
+        url: Redis URL for a shared registry, or None for a local one
+
+    Returns:
+        RoomRegistry or RedisRoomRegistry
+    """
+    if url and url.startswith(('redis://', 'rediss://')):
+        return RedisRoomRegistry(url)
+    return RoomRegistry()
@@ -0,0 +1,82 @@
+"""
+@file ratelimit.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Rate Limiting Module
+
+This module implements token-bucket rate limiting keyed by an arbitrary
+string (client IP, email address, Socket.IO session). Each key gets a
+bucket that refills at a steady rate up to a burst size. Buckets for
+idle keys are evicted so memory stays bounded.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter over many keys
+
+    Attributes:
+        rate: Tokens added per second
+        burst: Maximum tokens a bucket holds
+        max_keys: Maximum number of tracked keys
+    """
+
+    def __init__(self, rate, burst, max_keys=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key, cost=1):
+        """
+        Takes tokens from a key's bucket if enough are available
+
+        Args:
+            key: Bucket key
+            cost: Tokens needed
+
+        Returns:
+            True if the action is allowed
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+
+            # Most recently used keys stay at the end; evict from the front
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def retry_after(self, key, cost=1):
+        """
+        Seconds until a key's bucket holds enough tokens
+
+        Args:
+            key: Bucket key
+            cost: Tokens needed
+
+        Returns:
+            Seconds to wait (0 if allowed now)
+        """
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, time.monotonic()))
+        tokens = min(self.burst, tokens + (time.monotonic() - updated_at) * self.rate)
+        return max(0.0, (cost - tokens) / self.rate)
+
+    def reset(self, key):
+        """
+        Forgets a key's bucket
+
+        Args:
+            key: Bucket key
+        """
+        with self._lock:
+            self._buckets.pop(key, None)
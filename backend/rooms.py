@@ -0,0 +1,128 @@
+"""
+@file rooms.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Socket.IO Room Registry
+
+This module tracks which Socket.IO sessions are in which rooms. Room
+membership is kept in sets with a reverse index from session ID to
+rooms, so joins and leaves are O(1), disconnects are O(rooms of the
+session), and room sizes are O(1).
+"""
+import threading
+
+class RoomRegistry:
+    """
+    Set-based registry of room memberships with a sid -> rooms index
+    """
+
+    def __init__(self):
+        self._members = {}
+        self._sid_rooms = {}
+        self._lock = threading.Lock()
+
+    def join(self, sid, room):
+        """
+        Adds a session to a room
+
+        Args:
+            sid: Socket.IO session ID
+            room: Room name
+
+        Returns:
+            True if the session was not already in the room
+        """
+        with self._lock:
+            members = self._members.setdefault(room, set())
+            if sid in members:
+                return False
+            members.add(sid)
+            self._sid_rooms.setdefault(sid, set()).add(room)
+            return True
+
+    def leave(self, sid, room):
+        """
+        Removes a session from a room, dropping the room when empty
+
+        Args:
+            sid: Socket.IO session ID
+            room: Room name
+
+        Returns:
+            True if the session was in the room
+        """
+        with self._lock:
+            return self._leave(sid, room)
+
+    def _leave(self, sid, room):
+        members = self._members.get(room)
+        if not members or sid not in members:
+            return False
+        members.discard(sid)
+        if not members:
+            del self._members[room]
+
+        rooms = self._sid_rooms.get(sid)
+        if rooms is not None:
+            rooms.discard(room)
+            if not rooms:
+                del self._sid_rooms[sid]
+        return True
+
+    def remove_sid(self, sid):
+        """
+        Removes a session from every room it joined
+
+        Args:
+            sid: Socket.IO session ID
+
+        Returns:
+            List of rooms the session left
+        """
+        with self._lock:
+            rooms = list(self._sid_rooms.get(sid, ()))
+            for room in rooms:
+                self._leave(sid, room)
+            return rooms
+
+    def room_size(self, room):
+        """
+        Number of sessions in a room
+
+        Args:
+            room: Room name
+        """
+        members = self._members.get(room)
+        return len(members) if members else 0
+
+    def members(self, room):
+        """
+        Snapshot of the sessions in a room
+
+        Args:
+            room: Room name
+
+        Returns:
+            Frozen set of session IDs
+        """
+        with self._lock:
+            return frozenset(self._members.get(room, ()))
+
+    def rooms_of(self, sid):
+        """
+        Snapshot of the rooms a session joined
+
+        Args:
+            sid: Socket.IO session ID
+
+        Returns:
+            Frozen set of room names
+        """
+        with self._lock:
+            return frozenset(self._sid_rooms.get(sid, ()))
+
+    def __contains__(self, room):
+        return room in self._members
+
+    def __len__(self):
+        return len(self._members)
@@ -1,4 +1,3 @@
-
 """
 @author Huy Le (huyisme-005)
 @organization Gathr
@@ -7,26 +6,128 @@ Run Script for Gathr Backend
 This script initializes and runs the Gathr Flask application
 with proper environment settings and Socket.IO support.
 
+In production mode the app is served by gunicorn with eventlet workers.
+The process is monkey-patched and psycopg2 made green (psycogreen)
+before the app is imported, so each worker serves many requests and
+database queries concurrently instead of blocking on every query. The
+app and the AI libraries are loaded once in the master and shared by
+forked workers, debug is off, and SIGTERM drains each worker's sockets
+and queues before it exits.
+
 Usage:
-    python run.py
+    python run.py               # development server (debug, reloader)
+    python run.py --production  # or GATHR_ENV=production python run.py
+
+Production settings:
+    WEB_CONCURRENCY: Worker processes (default 1); more than one needs
+        SOCKETIO_MESSAGE_QUEUE and sticky sessions at the load balancer
+    WORKER_CONNECTIONS: Concurrent connections per worker (default 1000)
+    GRACEFUL_TIMEOUT: Seconds a worker may spend draining (default 30)
 """
 import os
 import secrets
-from app import app, socketio, init_db
+import sys
 
-if __name__ == '__main__':
-    # Generate a secret key if not set
+PRODUCTION = '--production' in sys.argv or os.environ.get('GATHR_ENV') == 'production'
+
+if PRODUCTION:
+    # Must run before anything imports socket, threading or psycopg2
+    import eventlet
+    eventlet.monkey_patch()
+
+    from psycogreen.eventlet import patch_psycopg
+    patch_psycopg()
+
+def ensure_secret_key():
+    """Generate a JWT secret key if not set"""
     if not os.environ.get('JWT_SECRET_KEY'):
         secret_key = secrets.token_hex(32)
         os.environ['JWT_SECRET_KEY'] = secret_key
         print(f"Generated JWT secret key: {secret_key}")
-    
+
+def run_development(port):
+    """Run the single-process development server with the debugger"""
+    from app import app, socketio, init_db
+
     # Initialize the database
     init_db()
-    
-    # Get port from environment variable or use default
-    port = int(os.environ.get('PORT', 5000))
-    
+
     # Run the Flask application with Socket.IO
     print(f"Gathr backend running on port {port}")
     socketio.run(app, host='0.0.0.0', port=port, debug=True)
+
+def run_production(port):
+    """Run the app under gunicorn with eventlet workers"""
+    import signal
+
+    from gunicorn.app.base import BaseApplication
+
+    import app as gathr
+    from ai import warm_up
+
+    # Preload: schema, app and AI libraries are set up once in the master
+    gathr.init_db()
+    warm_up()
+
+    workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+    if workers > 1 and not gathr.SOCKETIO_MESSAGE_QUEUE:
+        print("Warning: multiple workers without SOCKETIO_MESSAGE_QUEUE; "
+              "Socket.IO emits will not reach clients on other workers")
+
+    def post_fork(server, worker):
+        # Connections opened in the master must not be shared with workers
+        gathr.engine.dispose(close=False)
+
+    def post_worker_init(worker):
+        # Drain sockets and queues as soon as shutdown begins, so clients
+        # disconnect and the worker can exit within the graceful timeout
+        handle_exit = signal.getsignal(signal.SIGTERM)
+
+        def drain_and_exit(signum, frame):
+            eventlet.spawn_n(gathr.drain)
+            handle_exit(signum, frame)
+
+        signal.signal(signal.SIGTERM, drain_and_exit)
+
+    def worker_exit(server, worker):
+        # Store anything still buffered if draining was cut short
+        gathr.message_writer.flush()
+        gathr.engine.dispose()
+
+    class GathrServer(BaseApplication):
+        """Gunicorn application serving the preloaded Flask app"""
+
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return gathr.app
+
+    print(f"Gathr backend running on port {port} with {workers} worker(s)")
+    GathrServer({
+        'bind': f"0.0.0.0:{port}",
+        'workers': workers,
+        'worker_class': 'eventlet',
+        'worker_connections': int(os.environ.get('WORKER_CONNECTIONS', 1000)),
+        'graceful_timeout': int(os.environ.get('GRACEFUL_TIMEOUT', 30)),
+        'preload_app': True,
+        'post_fork': post_fork,
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit
+    }).run()
+
+if __name__ == '__main__':
+    ensure_secret_key()
+
+    # Get port from environment variable or use default
+    port = int(os.environ.get('PORT', 5000))
+
+    if PRODUCTION:
+        run_production(port)
+    else:
+        run_development(port)
@@ -0,0 +1,303 @@
+"""
+@file search.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+In-Process Search Indexes
+
+This module provides in-memory search indexes used when the database
+cannot serve indexed text search itself (anything but PostgreSQL with
+pg_trgm). Indexes are built lazily from the database on first use and
+then updated incrementally by the endpoints that write the data.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+# Words too common to help ranking
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in",
+    "is", "it", "of", "on", "or", "the", "to", "with"
+}
+
+def tokenize(text):
+    """
+    Splits text into lowercase word tokens without stop words
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of tokens
+    """
+    return [token for token in re.findall(r"\w+", (text or "").lower()) if token not in STOP_WORDS]
+
+class NGramIndex:
+    """
+    Trigram inverted index for substring and prefix search
+
+    Mirrors what pg_trgm offers: candidates are found through trigram
+    postings, verified as real substrings, and ranked by trigram
+    similarity, with exact prefix matches ranked first.
+
+    Attributes:
+        n: Length of the indexed grams
+    """
+
+    def __init__(self, n=3):
+        self.n = n
+        self._postings = defaultdict(set)
+        self._documents = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._built = False
+
+    def _grams(self, text):
+        """Returns the set of n-grams of a lowercased string"""
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def _prefix_keys(self, text):
+        """Returns word-prefix keys used to answer terms shorter than n"""
+        return {
+            "^" + word[:length]
+            for word in text.replace("@", " ").replace(".", " ").split()
+            for length in range(1, self.n)
+        }
+
+    def _keys(self, fields):
+        """Returns every posting key for a document's fields"""
+        keys = set()
+        for field in fields:
+            keys |= self._grams(field) | self._prefix_keys(field)
+        return keys
+
+    def add(self, doc_id, *fields):
+        """
+        Adds or replaces a document
+
+        Args:
+            doc_id: Identifier of the document
+            fields: Text fields to index
+        """
+        fields = tuple((field or "").lower() for field in fields)
+        with self._lock:
+            self._remove(doc_id)
+            self._documents[doc_id] = fields
+            for key in self._keys(fields):
+                self._postings[key].add(doc_id)
+
+    def remove(self, doc_id):
+        """
+        Removes a document if present
+
+        Args:
+            doc_id: Identifier of the document
+        """
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        fields = self._documents.pop(doc_id, None)
+        if fields is None:
+            return
+        for key in self._keys(fields):
+            postings = self._postings.get(key)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[key]
+
+    @property
+    def is_built(self):
+        """Whether the index has been populated from its source"""
+        return self._built
+
+    def ensure_built(self, load_documents):
+        """
+        Builds the index once from a document source
+
+        Args:
+            load_documents: Callable returning an iterable of (doc_id, *fields)
+        """
+        if self._built:
+            return
+        with self._build_lock:
+            if self._built:
+                return
+            for doc_id, *fields in load_documents():
+                self.add(doc_id, *fields)
+            self._built = True
+
+    def search(self, term):
+        """
+        Finds documents containing a term in any field
+
+        Args:
+            term: Search term
+
+        Returns:
+            List of document IDs, best match first
+        """
+        term = term.lower().strip()
+        if not term:
+            return []
+
+        with self._lock:
+            # Gather candidates from the rarest posting list first
+            if len(term) < self.n:
+                candidates = set(self._postings.get("^" + term, ()))
+            else:
+                posting_lists = sorted(
+                    (self._postings.get(gram, set()) for gram in self._grams(term)),
+                    key=len
+                )
+                candidates = set(posting_lists[0])
+                for postings in posting_lists[1:]:
+                    candidates &= postings
+                    if not candidates:
+                        break
+            documents = {doc_id: self._documents[doc_id] for doc_id in candidates}
+
+        term_grams = self._grams(term)
+        ranked = []
+        for doc_id, fields in documents.items():
+            if len(term) >= self.n and not any(term in field for field in fields):
+                continue
+            prefix_match = any(field.startswith(term) for field in fields)
+            similarity = max(
+                len(term_grams & self._grams(field)) / (len(term_grams | self._grams(field)) or 1)
+                for field in fields
+            )
+            ranked.append((prefix_match, similarity, doc_id))
+
+        ranked.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [doc_id for _, _, doc_id in ranked]
+
+
+class InvertedIndex:
+    """
+    Word-level inverted index with BM25 ranking
+
+    Used as the full-text search fallback for events when PostgreSQL
+    tsvector search is not available. Every query term must match
+    (the same AND semantics as websearch_to_tsquery).
+
+    Attributes:
+        k1: BM25 term frequency saturation
+        b: BM25 document length normalization
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(dict)
+        self._document_terms = {}
+        self._lengths = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._built = False
+
+    @property
+    def is_built(self):
+        """Whether the index has been populated from its source"""
+        return self._built
+
+    def add(self, doc_id, *fields):
+        """
+        Adds or replaces a document
+
+        Args:
+            doc_id: Identifier of the document
+            fields: Text fields to index
+        """
+        tokens = [token for field in fields for token in tokenize(field)]
+        with self._lock:
+            self._remove(doc_id)
+            frequencies = Counter(tokens)
+            for token, frequency in frequencies.items():
+                self._postings[token][doc_id] = frequency
+            self._document_terms[doc_id] = tuple(frequencies)
+            self._lengths[doc_id] = len(tokens)
+            self._total_length += len(tokens)
+
+    def remove(self, doc_id):
+        """
+        Removes a document if present
+
+        Args:
+            doc_id: Identifier of the document
+        """
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for token in self._document_terms.pop(doc_id):
+            del self._postings[token][doc_id]
+            if not self._postings[token]:
+                del self._postings[token]
+
+    def ensure_built(self, load_documents):
+        """
+        Builds the index once from a document source
+
+        Args:
+            load_documents: Callable returning an iterable of (doc_id, *fields)
+        """
+        if self._built:
+            return
+        with self._build_lock:
+            if self._built:
+                return
+            for doc_id, *fields in load_documents():
+                self.add(doc_id, *fields)
+            self._built = True
+
+    def search(self, query, limit=None):
+        """
+        Finds documents containing every query term, ranked by BM25
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+
+        Returns:
+            List of (doc_id, relevance) tuples, best match first, with
+            relevance normalized to the 0-1 range
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            postings = [self._postings.get(term, {}) for term in terms]
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+
+            candidates = set(postings[0])
+            for term_postings in postings[1:]:
+                candidates &= term_postings.keys()
+                if not candidates:
+                    return []
+
+            document_count = len(self._lengths)
+            average_length = self._total_length / document_count if document_count else 0
+            scores = {}
+            for doc_id in candidates:
+                length_norm = 1 - self.b + self.b * self._lengths[doc_id] / (average_length or 1)
+                score = 0.0
+                for term_postings in postings:
+                    frequency = term_postings[doc_id]
+                    idf = math.log(1 + (document_count - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+                    score += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+                scores[doc_id] = score
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(doc_id, score / (score + 1)) for doc_id, score in ranked]
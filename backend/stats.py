@@ -0,0 +1,178 @@
+"""
+@file stats.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Admin Statistics Module
+
+This module computes the admin dashboard statistics with a handful of
+aggregate queries and keeps the result in a periodically refreshed
+in-process snapshot, so loading the dashboard never scans the users table.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from database import db_session
+from models import User, Event
+
+def _month_starts(now, months):
+    """
+    Lists the first day of the last N calendar months, oldest first
+
+    Args:
+        now: Reference datetime
+        months: Number of months including the current one
+
+    Returns:
+        List of datetimes at midnight on the first day of each month
+    """
+    year, month = now.year, now.month
+    starts = []
+    for _ in range(months):
+        starts.append(datetime(year, month, 1))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return list(reversed(starts))
+
+def _month_bucket(column):
+    """
+    Groups a timestamp column by calendar month
+
+    date_trunc only exists on PostgreSQL; other databases (the SQLite
+    stand-in used for local seeding and load tests) group by strftime.
+    """
+    if db_session.get_bind().dialect.name == 'postgresql':
+        return func.date_trunc('month', column)
+    return func.strftime('%Y-%m', column)
+
+def _month_key(value):
+    """Normalizes a month bucket (a datetime or a "YYYY-MM" string) to "YYYY-MM" """
+    return value.strftime('%Y-%m') if isinstance(value, datetime) else value
+
+def compute_admin_stats():
+    """
+    Computes the admin dashboard statistics
+
+    Uses one aggregate query for users, one for events and one
+    per-month GROUP BY for the user growth series.
+
+    Returns:
+        Dictionary with user stats, event stats and user growth
+    """
+    now = datetime.now()
+
+    # User statistics in a single pass
+    total_users, active_users, premium_users = db_session.query(
+        func.count(User.id),
+        func.count(User.id).filter(User.last_active > now - timedelta(days=30)),
+        func.count(User.id).filter(User.tier.in_(["premium", "enterprise"]))
+    ).one()
+
+    # Event statistics in a single pass
+    total_events, upcoming_events = db_session.query(
+        func.count(Event.id),
+        func.count(Event.id).filter(Event.date > now)
+    ).one()
+
+    # User growth for the last seven calendar months
+    months = _month_starts(now, 7)
+    month = _month_bucket(User.created_at)
+    signups = {
+        _month_key(bucket): count
+        for bucket, count in db_session.query(month, func.count(User.id))
+        .filter(User.created_at >= months[0])
+        .group_by(month)
+    }
+    user_growth = [
+        {"month": month_start.strftime("%b"), "users": signups.get(month_start.strftime('%Y-%m'), 0)}
+        for month_start in months
+    ]
+
+    return {
+        "userStats": {
+            "totalUsers": total_users,
+            "activeUsers": active_users,
+            "premiumUsers": premium_users,
+            "conversionRate": (premium_users / total_users * 100) if total_users > 0 else 0
+        },
+        "eventStats": {
+            "totalEvents": total_events,
+            "upcomingEvents": upcoming_events,
+            "pastEvents": total_events - upcoming_events
+        },
+        "userGrowth": user_growth,
+        "securityAlerts": 3,  # Placeholder for security alerts count
+        "generatedAt": now.isoformat()
+    }
+
+class StatsSnapshot:
+    """
+    Periodically refreshed snapshot of a computed payload
+
+    The payload is computed once on first use and then refreshed in a
+    background task, so readers always get the cached copy; age() tells
+    them how stale it is.
+
+    Attributes:
+        compute: Zero-argument callable producing the payload
+        interval: Seconds between background refreshes
+    """
+
+    def __init__(self, compute, interval=60):
+        self.compute = compute
+        self.interval = interval
+        self._payload = None
+        self._refreshed_at = 0
+        self._lock = threading.Lock()
+        self._started = False
+
+    def refresh(self):
+        """Recomputes the payload and swaps it in"""
+        payload = self.compute()
+        with self._lock:
+            self._payload = payload
+            self._refreshed_at = time.time()
+        return payload
+
+    def get(self):
+        """
+        Returns the latest payload, computing it if none exists yet
+
+        Returns:
+            The cached payload
+        """
+        if self._payload is None:
+            return self.refresh()
+        return self._payload
+
+    def age(self):
+        """Seconds since the payload was last computed, or None before the first"""
+        if self._payload is None:
+            return None
+        return time.time() - self._refreshed_at
+
+    def start(self, socketio):
+        """
+        Starts the background refresher once
+
+        Args:
+            socketio: SocketIO instance used to spawn the background task
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        socketio.start_background_task(self._run, socketio)
+
+    def _run(self, socketio):
+        """Background loop refreshing the snapshot every interval"""
+        while True:
+            socketio.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Stats snapshot refresh error: {str(e)}")
+            finally:
+                # The refresher's own session; request threads keep theirs
+                db_session.remove()
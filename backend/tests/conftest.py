@@ -0,0 +1,130 @@
+"""
+@file conftest.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Shared fixtures for the backend tests
+
+The tests run against a throwaway SQLite database (the same stand-in
+the benchmarks use), recreated for every test.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Configure the backend before it is imported
+DATABASE_FILE = os.path.join(tempfile.mkdtemp(prefix='gathr-tests-'), 'test.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_FILE}'
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+
+@pytest.fixture
+def app():
+    """The Flask app over freshly created tables"""
+    import app as gathr
+    import database
+    from database import Base, engine, db_session
+    from identity import profile_cache
+    from ratelimit import RateLimiter
+    from search import NGramIndex, InvertedIndex
+
+    # Keep JSON backups out of the source tree
+    database.BACKUP_FILE = os.path.join(os.path.dirname(DATABASE_FILE), 'data_backup.json')
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    profile_cache.clear()
+    # In-process search indexes are built from the database on first use
+    gathr.user_search_index = NGramIndex()
+    gathr.event_search_index = InvertedIndex()
+    # Fresh auth throttles, so earlier tests do not use up the burst
+    for name in ('auth_ip_limiter', 'login_email_limiter'):
+        limiter = getattr(gathr, name)
+        setattr(gathr, name, RateLimiter(limiter.rate, limiter.burst))
+    flask_app = gathr.app
+    yield flask_app
+    db_session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Creates a user and returns its ID"""
+    from database import db_session
+    from models import User
+
+    def make_user(name, **fields):
+        user = User(name=name, email=f"{name}@gathr.test", password_hash="x", **fields)
+        db_session.add(user)
+        db_session.commit()
+        return user.id
+
+    return make_user
+
+
+@pytest.fixture
+def make_event(app):
+    """Creates an event starting the given time from now and returns its ID"""
+    from database import db_session
+    from models import Event
+
+    def make_event(creator_id, starts_in=timedelta(days=2), **fields):
+        date = datetime.now() + starts_in
+        values = dict(title="Meetup", description="Synthetic event", date=date, time=date,
+                      location="Cafe", capacity=10, categories=["social"])
+        values.update(fields)
+        event = Event(creator_id=creator_id, **values)
+        db_session.add(event)
+        db_session.commit()
+        return event.id
+
+    return make_event
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Builds an Authorization header for a user ID"""
+    from flask_jwt_extended import create_access_token
+
+    def auth_headers(user_id):
+        with app.app_context():
+            return {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+    return auth_headers
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager counting the SQL statements run inside it"""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+    from database import engine
+
+    @contextmanager
+    def count_queries():
+        counter = {"count": 0}
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            counter["count"] += 1
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield counter
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return count_queries
+
+
+@pytest.fixture
+def admin_headers(monkeypatch, make_user, auth_headers):
+    """Headers of an admin user (admins are flagged outside the users table)"""
+    from models import User
+
+    monkeypatch.setattr(User, "is_admin", True, raising=False)
+    return auth_headers(make_user("admin"))
@@ -0,0 +1,42 @@
+"""
+@file test_admin_stats.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the admin statistics and their snapshot
+"""
+from datetime import datetime, timedelta
+
+from stats import StatsSnapshot, compute_admin_stats, _month_starts
+
+
+def test_admin_stats_aggregate_users_events_and_monthly_signups(make_user, make_event):
+    now = datetime.now()
+    months = _month_starts(now, 7)
+    make_user("new", tier="premium", created_at=now, last_active=now)
+    make_user("recent", tier="enterprise", created_at=months[-2] + timedelta(days=3), last_active=now - timedelta(days=40))
+    make_user("older", created_at=months[0] + timedelta(hours=1))
+    host = make_user("ancient", created_at=months[0] - timedelta(days=40))
+    make_event(host)
+    make_event(host, starts_in=timedelta(days=-1))
+
+    stats = compute_admin_stats()
+
+    assert stats["userStats"] == {
+        "totalUsers": 4, "activeUsers": 1, "premiumUsers": 2, "conversionRate": 50.0
+    }
+    assert stats["eventStats"] == {"totalEvents": 2, "upcomingEvents": 1, "pastEvents": 1}
+    assert [month["month"] for month in stats["userGrowth"]] == [start.strftime("%b") for start in months]
+    assert [month["users"] for month in stats["userGrowth"]] == [1, 0, 0, 0, 0, 1, 1]
+
+
+def test_snapshot_serves_the_cached_payload_and_reports_its_age():
+    calls = []
+    snapshot = StatsSnapshot(lambda: calls.append(1) or {"calls": len(calls)})
+    assert snapshot.age() is None
+
+    assert snapshot.get() == {"calls": 1}
+    assert snapshot.get() == {"calls": 1}
+    assert 0 <= snapshot.age() < 5
+
+    snapshot.refresh()
+    assert snapshot.get() == {"calls": 2}
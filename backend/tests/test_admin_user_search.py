@@ -0,0 +1,54 @@
+"""
+@file test_admin_user_search.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the admin user search
+"""
+from search import NGramIndex
+
+
+def test_trigram_index_finds_substrings_and_ranks_prefixes_first():
+    index = NGramIndex()
+    index.add(1, "Maria Lopez", "maria@example.com")
+    index.add(2, "Amaria Stone", "stone@example.com")
+    index.add(3, "Mario Rossi", "mario@example.com")
+
+    assert index.search("maria") == [1, 2]
+    assert index.search("ma") == [1, 3]
+    assert index.search("ROSSI") == [3]
+    assert index.search("xyz") == []
+
+    index.add(1, "Maria Perez", "perez@example.com")
+    index.remove(2)
+    assert index.search("perez") == [1]
+    assert index.search("stone") == []
+
+
+def test_admin_search_pages_through_matching_users(client, make_user, admin_headers):
+    for name in ("Jordan Lee", "Jordana Park", "Riley Jordan", "Casey Smith"):
+        make_user(name)
+
+    response = client.get("/api/admin/users?search=jordan&limit=2", headers=admin_headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [user["name"] for user in body["users"]] == ["Jordan Lee", "Jordana Park"]
+    assert body["pagination"]["total"] == 3
+    assert body["pagination"]["hasNext"] is True
+
+
+def test_admin_search_sees_users_registered_after_the_index_was_built(client, make_user, admin_headers):
+    make_user("Quinn Early")
+    assert client.get("/api/admin/users?search=quinn", headers=admin_headers).get_json()["pagination"]["total"] == 1
+
+    response = client.post("/api/register", json={"name": "Quinn Later", "email": "quinn@gathr.test", "password": "secret-pass"})
+    assert response.status_code == 201
+
+    body = client.get("/api/admin/users?search=quinn", headers=admin_headers).get_json()
+    assert sorted(user["name"] for user in body["users"]) == ["Quinn Early", "Quinn Later"]
+
+
+def test_admin_users_requires_an_admin(client, make_user, auth_headers):
+    response = client.get("/api/admin/users?search=a", headers=auth_headers(make_user("user")))
+
+    assert response.status_code == 403
@@ -0,0 +1,90 @@
+"""
+@file test_auth.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for registration, login, auth throttling and pooled password hashing
+"""
+import pytest
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+import passwords
+
+
+def register(client, email="ada@gathr.test", password="secret", **headers):
+    return client.post("/api/register", headers=headers,
+                       json={"name": "Ada", "email": email, "password": password})
+
+
+def login(client, email="ada@gathr.test", password="secret", **headers):
+    return client.post("/api/login", headers=headers, json={"email": email, "password": password})
+
+
+def test_issued_tokens_authenticate(client):
+    registered = register(client)
+    logged_in = login(client)
+
+    assert (registered.status_code, logged_in.status_code) == (201, 200)
+    for response in (registered, logged_in):
+        headers = {"Authorization": f"Bearer {response.get_json()['token']}"}
+        assert client.get("/api/events/upcoming", headers=headers).status_code == 200
+
+
+def test_duplicate_email_and_wrong_password(client):
+    register(client)
+
+    assert register(client).status_code == 409
+    assert login(client, password="wrong").status_code == 401
+    assert login(client, email="nobody@gathr.test").status_code == 401
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/register", None),
+    ("/api/register", {"name": "Ada", "email": "ada@gathr.test"}),
+    ("/api/register", {"name": "Ada", "email": ["ada@gathr.test"], "password": "secret"}),
+    ("/api/login", None),
+    ("/api/login", {"email": "ada@gathr.test", "password": 1234})
+])
+def test_malformed_auth_bodies_are_rejected(client, path, body):
+    assert client.post(path, json=body).status_code == 400
+
+
+def test_logins_are_throttled_per_account(client):
+    import app as gathr
+    register(client)
+
+    statuses = [login(client, password="wrong").status_code
+                for _ in range(gathr.login_email_limiter.burst + 1)]
+
+    assert statuses[:-1] == [401] * gathr.login_email_limiter.burst
+    throttled = login(client)
+    assert throttled.status_code == 429
+    assert int(throttled.headers["Retry-After"]) >= 1
+
+
+def test_trusted_proxies_throttle_each_forwarded_client(app, client, monkeypatch):
+    import app as gathr
+    monkeypatch.setattr(app, "wsgi_app", ProxyFix(app.wsgi_app, x_for=1))
+    burst = gathr.auth_ip_limiter.burst
+
+    first = [login(client, email=f"x{i}@gathr.test", X_Forwarded_For="203.0.113.1").status_code
+             for i in range(burst + 1)]
+    second = login(client, email="y@gathr.test", X_Forwarded_For="203.0.113.2")
+
+    assert first[-1] == 429
+    assert second.status_code == 401
+
+
+def test_hashing_round_trips_on_the_pool():
+    password_hash = passwords.hash_password("secret")
+
+    assert passwords.verify_password(password_hash, "secret")
+    assert not passwords.verify_password(password_hash, "wrong")
+
+
+def test_hashing_sheds_load_beyond_the_pending_limit(client, monkeypatch):
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_WORKERS", 0)
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_MAX_PENDING", 0)
+
+    with pytest.raises(passwords.HashingBusy):
+        passwords.hash_password("secret")
+    assert register(client).status_code == 503
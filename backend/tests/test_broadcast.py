@@ -0,0 +1,92 @@
+"""
+@file test_broadcast.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for room broadcast backpressure and coalescing
+"""
+import pytest
+
+from broadcast import RoomBroadcaster
+
+
+@pytest.fixture
+def room(app):
+    """Two Socket.IO clients in the room "lobby": (fast, slow)"""
+    import app as gathr
+
+    sockets = [gathr.socketio.test_client(app) for _ in range(2)]
+    for socket in sockets:
+        socket.emit("join", {"room": "lobby"})
+        socket.get_received()
+    yield sockets
+    for socket in sockets:
+        if socket.is_connected():
+            socket.disconnect()
+
+
+def frames(socket):
+    return [packet["name"] for packet in socket.get_received() if packet["name"] != "user_joined"]
+
+
+def make_broadcaster(monkeypatch, slow, **options):
+    """A started broadcaster that sees a deep send queue for the slow client"""
+    import app as gathr
+
+    broadcaster = RoomBroadcaster(**options)
+    broadcaster.start(gathr.socketio)
+    monkeypatch.setattr(broadcaster, "_queue_size", lambda eio_sid: 1000 if eio_sid == slow.eio_sid else 0)
+    return broadcaster
+
+
+def test_slow_clients_are_skipped_without_coalescing(room, monkeypatch):
+    fast, slow = room
+    broadcaster = make_broadcaster(monkeypatch, slow, max_queued=256)
+
+    broadcaster.publish("lobby", {"content": "hi"})
+
+    assert frames(fast) == ["message"]
+    assert frames(slow) == []
+
+
+def test_clients_that_stay_behind_are_disconnected(room, monkeypatch):
+    fast, slow = room
+    broadcaster = make_broadcaster(monkeypatch, slow, max_dropped=3)
+
+    for i in range(4):
+        broadcaster.publish("lobby", {"content": i})
+
+    assert frames(fast) == ["message"] * 4
+    assert not slow.is_connected()
+
+
+def test_catching_up_resets_the_drop_count(room, monkeypatch):
+    import app as gathr
+    fast, slow = room
+    broadcaster = RoomBroadcaster(max_dropped=2)
+    broadcaster.start(gathr.socketio)
+    depth = {"slow": 1000}
+    monkeypatch.setattr(broadcaster, "_queue_size",
+                        lambda eio_sid: depth["slow"] if eio_sid == slow.eio_sid else 0)
+
+    for behind in (True, True, False, True, True):
+        depth["slow"] = 1000 if behind else 0
+        broadcaster.publish("lobby", {"content": "hi"})
+
+    assert slow.is_connected()
+    assert frames(slow) == ["message"]
+
+
+def test_coalescing_batches_a_window_of_messages(room, monkeypatch):
+    fast, slow = room
+    # A long window, so only the explicit flush sends
+    broadcaster = make_broadcaster(monkeypatch, slow, window=60)
+
+    broadcaster.publish("lobby", {"content": "one"})
+    broadcaster.publish("lobby", {"content": "two"})
+    assert frames(fast) == []
+    assert broadcaster.flush() == 1
+
+    received = fast.get_received()
+    assert [packet["name"] for packet in received] == ["message_batch"]
+    assert received[0]["args"][0] == {"room": "lobby", "messages": [{"content": "one"}, {"content": "two"}]}
+    assert frames(slow) == []
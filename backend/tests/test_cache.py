@@ -0,0 +1,45 @@
+"""
+@file test_cache.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the TTL cache
+"""
+import cache
+from cache import TTLCache
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    profiles = TTLCache(ttl=30)
+    profiles.set(1, "profile")
+
+    now[0] += 29
+    assert profiles.get(1) == "profile"
+    now[0] += 2
+    assert profiles.get(1) is None
+    assert len(profiles) == 0
+    assert (profiles.hits, profiles.misses) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted():
+    profiles = TTLCache(max_size=2)
+    profiles.set(1, "one")
+    profiles.set(2, "two")
+    profiles.get(1)
+    profiles.set(3, "three")
+
+    assert profiles.get(2) is None
+    assert (profiles.get(1), profiles.get(3)) == ("one", "three")
+
+
+def test_invalidate_and_clear():
+    profiles = TTLCache()
+    profiles.set(1, "one")
+    profiles.set(2, "two")
+
+    profiles.invalidate(1)
+    profiles.invalidate(99)
+    assert profiles.get(1) is None
+    profiles.clear()
+    assert len(profiles) == 0
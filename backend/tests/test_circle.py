@@ -0,0 +1,54 @@
+"""
+@file test_circle.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the batched circle computation
+"""
+from ai import batch_user_compatibility, calculate_user_compatibility
+from database import db_session
+from models import Attendance, Connection
+
+USER_TAGS = ["adventurous", "social", "creative", "music lover"]
+OTHER_TAGS = [
+    ["social", "calm", "music lover", "bookworm", "foodie"],
+    ["adventurous", "social", "creative", "music lover"],
+    ["introvert"],
+    ["tech enthusiast", "analytical", "creative"],
+    [],
+    None,
+]
+
+
+def test_batch_compatibility_matches_pairwise_scores():
+    expected = [calculate_user_compatibility(USER_TAGS, tags) for tags in OTHER_TAGS]
+
+    assert batch_user_compatibility(USER_TAGS, OTHER_TAGS) == expected
+    assert batch_user_compatibility([], OTHER_TAGS) == [50] * len(OTHER_TAGS)
+
+
+def test_circle_counts_shared_events_per_connection(client, make_user, make_event, auth_headers):
+    user = make_user("user", personality_tags=USER_TAGS)
+    friend = make_user("friend", personality_tags=OTHER_TAGS[0])
+    twin = make_user("twin", personality_tags=OTHER_TAGS[1])
+    stranger = make_user("stranger", personality_tags=OTHER_TAGS[1])
+    first, second, third = (make_event(user) for _ in range(3))
+    db_session.add_all([
+        Connection(user_id=user, connected_user_id=friend),
+        Connection(user_id=user, connected_user_id=twin),
+        Attendance(user_id=user, event_id=first),
+        Attendance(user_id=user, event_id=second),
+        Attendance(user_id=friend, event_id=first),
+        Attendance(user_id=friend, event_id=second),
+        Attendance(user_id=friend, event_id=third),
+        Attendance(user_id=stranger, event_id=first),
+    ])
+    db_session.commit()
+
+    response = client.get("/api/circle", headers=auth_headers(user))
+
+    assert response.status_code == 200
+    connections = response.get_json()["connections"]
+    assert [(c["id"], c["eventsAttended"], c["personalityMatch"]) for c in connections] == [
+        (twin, 0, calculate_user_compatibility(USER_TAGS, OTHER_TAGS[1])),
+        (friend, 2, calculate_user_compatibility(USER_TAGS, OTHER_TAGS[0])),
+    ]
@@ -0,0 +1,78 @@
+"""
+@file test_event_filters.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the multi-facet event filters
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from werkzeug.datastructures import MultiDict
+
+from database import db_session
+from event_filters import parse_event_filters, category_filter
+from models import Attendance
+
+
+@pytest.fixture
+def catalog(make_user, make_event):
+    """A host and events tagged with categories, keyed by title"""
+    host = make_user("host")
+    other_host = make_user("other")
+    events = {
+        "concert": make_event(host, title="concert", categories=["music", "social"], starts_in=timedelta(days=1)),
+        "jam": make_event(host, title="jam", categories=["music"], starts_in=timedelta(days=10), capacity=1),
+        "hike": make_event(other_host, title="hike", categories=["outdoors", "social"], starts_in=timedelta(days=3)),
+        "talk": make_event(other_host, title="talk", categories=["tech"], starts_in=timedelta(days=5)),
+    }
+    db_session.add(Attendance(user_id=other_host, event_id=events["jam"]))
+    db_session.commit()
+    return host, events
+
+
+def titles(client, headers, query):
+    response = client.get(f"/api/events?{query}", headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return [event["title"] for event in response.get_json()["events"]]
+
+
+def test_category_and_facet_filters(client, catalog, auth_headers):
+    host, _ = catalog
+    headers = auth_headers(host)
+    tomorrow = datetime.now() + timedelta(days=1)
+
+    assert titles(client, headers, "category=music") == ["concert", "jam"]
+    assert titles(client, headers, "categories=music,outdoors") == ["concert", "hike", "jam"]
+    assert titles(client, headers, "categories=music&categories=social&categoryMatch=all") == ["concert"]
+    assert titles(client, headers, "categories=music&hasSpots=true") == ["concert"]
+    assert titles(client, headers, f"creatorId={host}&categories=social") == ["concert"]
+    assert titles(client, headers, f"dateFrom={(tomorrow + timedelta(days=1)).date()}&dateTo={(tomorrow + timedelta(days=4)).date()}") == ["hike", "talk"]
+
+
+def test_event_listing_rejects_malformed_filters_and_paging(client, make_user, auth_headers):
+    headers = auth_headers(make_user("user"))
+
+    for query in ("limit=ten", "page=x", "categoryMatch=some", "dateFrom=tomorrow", "creatorId=me"):
+        assert client.get(f"/api/events?{query}", headers=headers).status_code == 400
+
+
+def test_event_listing_clamps_the_page_size(client, catalog, auth_headers):
+    host, _ = catalog
+
+    body = client.get("/api/events?limit=0", headers=auth_headers(host)).get_json()
+
+    assert body["pagination"]["limit"] == 1
+    assert body["pagination"]["pages"] == 4
+    assert len(body["events"]) == 1
+
+
+def test_postgres_category_filters_use_the_gin_indexed_operators(monkeypatch):
+    monkeypatch.setattr(db_session, "get_bind", lambda: type("Bind", (), {"dialect": postgresql.dialect()})())
+    filters = parse_event_filters(MultiDict({"categories": "music,social"}))
+
+    any_match = str(category_filter(db_session, filters["categories"], False).compile(dialect=postgresql.dialect()))
+    all_match = str(category_filter(db_session, filters["categories"], True).compile(dialect=postgresql.dialect()))
+
+    assert "events.categories && " in any_match
+    assert "events.categories @> " in all_match
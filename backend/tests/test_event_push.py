@@ -0,0 +1,72 @@
+"""
+@file test_event_push.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for pushing new events to matching online users
+"""
+import pytest
+
+import event_push
+from event_push import push_new_event
+
+EVENT = {"id": 1, "title": "Jam session"}
+CATEGORIES = ["music", "social"]
+
+
+@pytest.fixture
+def connect(app, auth_headers):
+    """Connects a Socket.IO client, which joins the user's personal room"""
+    import app as gathr
+    sockets = []
+
+    def connect(user_id):
+        token = auth_headers(user_id)["Authorization"].split()[1]
+        socket = gathr.socketio.test_client(app, auth={"token": token})
+        socket.get_received()
+        sockets.append(socket)
+        return socket
+
+    yield connect
+    for socket in sockets:
+        if socket.is_connected():
+            socket.disconnect()
+
+
+def pushes(socket):
+    return [packet["args"][0] for packet in socket.get_received() if packet["name"] == "new_event"]
+
+
+def test_only_matching_users_are_notified(make_user, connect):
+    import app as gathr
+
+    fan = make_user("fan", has_completed_personality_test=True, personality_tags=CATEGORIES)
+    other = make_user("other", has_completed_personality_test=True, personality_tags=["bookworm"])
+    untested = make_user("untested", personality_tags=CATEGORIES)
+    sockets = {user_id: connect(user_id) for user_id in (fan, other, untested)}
+
+    notified = push_new_event(gathr.socketio, EVENT, CATEGORIES, [fan, other, untested], threshold=70)
+
+    assert notified == 1
+    (push,) = pushes(sockets[fan])
+    assert push["title"] == EVENT["title"] and push["matchScore"] >= 70
+    assert pushes(sockets[other]) == pushes(sockets[untested]) == []
+
+
+def test_candidates_are_looked_up_in_batches(app, make_user, monkeypatch, count_queries):
+    import app as gathr
+
+    users = [make_user(f"fan{i}", has_completed_personality_test=True, personality_tags=CATEGORIES)
+             for i in range(5)]
+    monkeypatch.setattr(event_push, "PUSH_LOOKUP_BATCH_SIZE", 2)
+
+    with count_queries() as queries:
+        notified = push_new_event(gathr.socketio, EVENT, CATEGORIES, users, threshold=70)
+
+    assert notified == 5
+    assert queries["count"] == 3
+
+
+def test_no_candidates_means_no_pushes(app):
+    import app as gathr
+
+    assert push_new_event(gathr.socketio, EVENT, CATEGORIES, [], threshold=0) == 0
@@ -0,0 +1,53 @@
+"""
+@file test_event_search.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the full-text event search
+"""
+from ai import batch_match_scores, calculate_match_score
+from search import InvertedIndex
+
+TRAITS = ["music lover", "social", "creative"]
+
+
+def test_inverted_index_requires_every_term_and_ranks_by_bm25():
+    index = InvertedIndex()
+    index.add(1, "Jazz night", "Live jazz and jazz records", "Blue Note")
+    index.add(2, "Jazz brunch", "Food with a little music", "Cafe")
+    index.add(3, "Board games", "Games night at the library", "Library")
+
+    assert [doc_id for doc_id, _ in index.search("jazz")] == [1, 2]
+    assert [doc_id for doc_id, _ in index.search("jazz night")] == [1]
+    assert index.search("jazz opera") == []
+    assert index.search("the and") == []
+    assert all(0 < relevance < 1 for _, relevance in index.search("jazz"))
+
+    index.remove(1)
+    assert [doc_id for doc_id, _ in index.search("jazz")] == [2]
+
+
+def test_batch_match_scores_match_pairwise_scores():
+    categories = [["music", "social"], ["sports"], ["creative", "art", "music"], [], None]
+
+    assert batch_match_scores(TRAITS, categories) == [calculate_match_score(TRAITS, c) for c in categories]
+
+
+def test_search_endpoint_ranks_and_pages_events(client, make_user, make_event, auth_headers):
+    user = make_user("user", has_completed_personality_test=True, personality_tags=TRAITS)
+    host = make_user("host")
+    best = make_event(host, title="Jazz jam", description="Jazz for everyone, bring jazz records",
+                      location="Hall", categories=["music"])
+    other = make_event(host, title="Picnic", description="Some jazz in the park", location="Park",
+                       categories=["outdoors"])
+    make_event(host, title="Chess club", description="Weekly games", location="Library")
+    headers = auth_headers(user)
+
+    first = client.get("/api/events/search?q=jazz&limit=1", headers=headers).get_json()
+    second = client.get("/api/events/search?q=jazz&limit=1&page=2", headers=headers).get_json()
+
+    assert [event["id"] for event in first["events"]] == [best]
+    assert first["events"][0]["matchScore"] == calculate_match_score(TRAITS, ["music"])
+    assert first["pagination"]["hasNext"] is True
+    assert [event["id"] for event in second["events"]] == [other]
+    assert second["pagination"]["hasNext"] is False
+    assert client.get("/api/events/search?q=", headers=headers).get_json() == {"events": []}
@@ -0,0 +1,59 @@
+"""
+@file test_export.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the streaming NDJSON and CSV exports
+"""
+import csv
+import io
+import json
+
+import export
+from database import db_session
+from models import Feedback
+
+
+def test_users_stream_as_ndjson_in_chunks(client, make_user, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 2)
+    for i in range(5):
+        make_user(f"user{i}", personality_tags=["social"] if i % 2 else None)
+
+    response = client.get("/api/users?format=ndjson")
+    chunks = list(response.response)
+
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["Content-Disposition"] == "attachment; filename=users.ndjson"
+    assert len(chunks) == 3
+    records = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert [record["name"] for record in records] == [f"user{i}" for i in range(5)]
+    assert [record["personalityTags"] for record in records][:2] == [[], ["social"]]
+
+
+def test_users_listing_keeps_the_json_default(client, make_user):
+    make_user("user")
+
+    response = client.get("/api/users")
+
+    assert response.get_json()["users"][0]["email"] == "user@gathr.test"
+
+
+def test_admin_exports_events_and_feedback_as_csv(client, make_user, make_event, admin_headers):
+    host = make_user("host")
+    event = make_event(host, title="Jazz night", categories=["music", "social"])
+    db_session.add(Feedback(event_id=event, user_id=host, rating=5, enjoyed_most=["music"], comment="Great"))
+    db_session.commit()
+
+    events = list(csv.DictReader(io.StringIO(
+        client.get("/api/admin/export/events?format=csv", headers=admin_headers).get_data(as_text=True)
+    )))
+    feedback = list(csv.DictReader(io.StringIO(
+        client.get("/api/admin/export/feedback?format=csv", headers=admin_headers).get_data(as_text=True)
+    )))
+
+    assert [(row["title"], row["categories"], row["creatorId"]) for row in events] == [("Jazz night", "music;social", str(host))]
+    assert [(row["rating"], row["enjoyedMost"], row["comment"]) for row in feedback] == [("5", "music", "Great")]
+
+
+def test_admin_export_rejects_unknown_formats_and_resources(client, admin_headers):
+    assert client.get("/api/admin/export/users?format=xml", headers=admin_headers).status_code == 400
+    assert client.get("/api/admin/export/secrets", headers=admin_headers).status_code == 404
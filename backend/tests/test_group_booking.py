@@ -0,0 +1,103 @@
+"""
+@file test_group_booking.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for all-or-nothing group bookings
+"""
+import pytest
+
+from booking import bookable_user_ids
+from database import db_session
+from models import Attendance, Connection
+
+
+def circle(leader, members):
+    db_session.add_all(Connection(user_id=leader, connected_user_id=member) for member in members)
+    db_session.commit()
+
+
+def booked_users(event_id):
+    return {user_id for (user_id,) in db_session.query(Attendance.user_id).filter_by(event_id=event_id)}
+
+
+def test_string_identity_may_book_for_itself(make_user):
+    leader, friend, stranger = make_user("leader"), make_user("friend"), make_user("stranger")
+    circle(leader, [friend])
+
+    assert bookable_user_ids(db_session, str(leader), [leader, friend, stranger]) == {leader, friend}
+
+
+def test_group_including_the_caller_is_booked(client, make_user, make_event, auth_headers):
+    leader, friend = make_user("leader"), make_user("friend")
+    circle(leader, [friend])
+    event = make_event(leader)
+
+    response = client.post("/api/events/group-book", headers=auth_headers(leader),
+                           json={"eventId": event, "userIds": [leader, friend]})
+
+    assert response.status_code == 201
+    assert {result["status"] for result in response.get_json()["results"]} == {"booked"}
+    assert booked_users(event) == {leader, friend}
+
+
+def test_users_outside_the_circle_block_the_group(client, make_user, make_event, auth_headers):
+    leader, stranger = make_user("leader"), make_user("stranger")
+    event = make_event(leader)
+
+    response = client.post("/api/events/group-book", headers=auth_headers(leader),
+                           json={"eventId": event, "userIds": [leader, stranger]})
+
+    assert response.status_code == 409
+    statuses = {result["userId"]: result["status"] for result in response.get_json()["results"]}
+    assert statuses == {leader: "not_booked", stranger: "not_permitted"}
+    assert booked_users(event) == set()
+
+
+def test_group_larger_than_the_seats_left_books_nobody(client, make_user, make_event, auth_headers):
+    leader = make_user("leader")
+    friends = [make_user(f"friend{i}") for i in range(2)]
+    circle(leader, friends)
+    event = make_event(leader, capacity=2)
+
+    response = client.post("/api/events/group-book", headers=auth_headers(leader),
+                           json={"eventId": event, "userIds": [leader] + friends})
+
+    assert response.status_code == 409
+    assert {result["status"] for result in response.get_json()["results"]} == {"insufficient_capacity"}
+    assert booked_users(event) == set()
+
+
+def test_caller_books_several_events(client, make_user, make_event, auth_headers):
+    user = make_user("user")
+    events = [make_event(user), make_event(user)]
+
+    response = client.post("/api/events/group-book", headers=auth_headers(user),
+                           json={"eventIds": [str(event) for event in events] + [999]})
+
+    assert response.status_code == 409
+    assert [result["status"] for result in response.get_json()["results"]] == [
+        "not_booked", "not_booked", "event_not_found"
+    ]
+
+    response = client.post("/api/events/group-book", headers=auth_headers(user),
+                           json={"eventIds": events})
+
+    assert response.status_code == 201
+    assert all(booked_users(event) == {user} for event in events)
+
+
+@pytest.mark.parametrize("body", [
+    None,
+    {"eventIds": "1,2"},
+    {"eventIds": []},
+    {"eventIds": ["one"]},
+    {"eventIds": [True]},
+    {"eventId": "abc", "userIds": [1]},
+    {"eventId": 1, "userIds": [1, "x"]},
+    {"eventId": 1, "userIds": [-1]},
+    {"eventId": 1}
+])
+def test_malformed_requests_are_rejected(client, make_user, auth_headers, body):
+    response = client.post("/api/events/group-book", headers=auth_headers(make_user("user")), json=body)
+
+    assert response.status_code == 400
@@ -0,0 +1,85 @@
+"""
+@file test_identity.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the cached current-user profile
+"""
+from datetime import datetime, timedelta
+
+from ai import calculate_user_compatibility
+from database import db_session
+from identity import profile_cache
+from models import Event, Attendance
+
+VIEWER_TAGS = ["adventurous", "social", "creative", "music lover"]
+OTHER_TAGS = ["social", "calm", "music lover", "bookworm", "foodie"]
+
+
+def attendee_scores(client, headers, event_id):
+    response = client.get(f"/api/events/{event_id}/attendees", headers=headers)
+    assert response.status_code == 200
+    return {attendee["id"]: attendee["personalityMatch"] for attendee in response.get_json()["attendees"]}
+
+
+def test_attendee_scores_match_before_and_after_profile_caching(client, make_user, auth_headers):
+    viewer = make_user("viewer", has_completed_personality_test=True, personality_tags=VIEWER_TAGS)
+    other = make_user("other", has_completed_personality_test=True, personality_tags=OTHER_TAGS)
+    date = datetime.now() + timedelta(hours=2)
+    event = Event(title="Meetup", description="Soon", date=date, time=date, location="Cafe",
+                  capacity=10, categories=["social"], creator_id=viewer)
+    db_session.add(event)
+    db_session.commit()
+    event_id = event.id
+    db_session.add_all([Attendance(user_id=viewer, event_id=event_id), Attendance(user_id=other, event_id=event_id)])
+    db_session.commit()
+    headers = auth_headers(viewer)
+
+    expected = calculate_user_compatibility(VIEWER_TAGS, OTHER_TAGS)
+    assert profile_cache.get(viewer) is None
+    uncached = attendee_scores(client, headers, event_id)
+    assert profile_cache.get(viewer) is not None
+    cached = attendee_scores(client, headers, event_id)
+
+    assert uncached == cached == {other: expected}
+
+
+def test_current_user_is_loaded_once_per_request(app, make_user, auth_headers, count_queries):
+    from identity import get_current_user, get_current_profile
+    from flask_jwt_extended import verify_jwt_in_request
+
+    user = make_user("user", personality_tags=VIEWER_TAGS)
+    with app.test_request_context(headers=auth_headers(user)):
+        verify_jwt_in_request()
+        with count_queries() as queries:
+            first = get_current_user()
+            assert get_current_user() is first
+            profile = get_current_profile()
+
+    assert queries["count"] == 1
+    assert (profile.id, profile.personality_tags) == (user, VIEWER_TAGS)
+    assert profile_cache.get(user) == profile
+
+
+def test_cached_profile_is_reused_across_requests(app, make_user, auth_headers, count_queries):
+    from identity import get_current_profile
+    from flask_jwt_extended import verify_jwt_in_request
+
+    user = make_user("user")
+    for expected_queries in (1, 0):
+        with app.test_request_context(headers=auth_headers(user)):
+            verify_jwt_in_request()
+            with count_queries() as queries:
+                assert get_current_profile().name == "user"
+        assert queries["count"] == expected_queries
+
+
+def test_personality_test_invalidates_the_cached_profile(client, make_user, auth_headers):
+    user = make_user("user")
+    headers = auth_headers(user)
+    profile_cache.set(user, "stale")
+
+    response = client.post("/api/personality-test", headers=headers,
+                           json={"answers": {"1": "adventurous", "2": "social"}})
+
+    assert response.status_code == 200
+    assert profile_cache.get(user) is None
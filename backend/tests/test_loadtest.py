@@ -0,0 +1,128 @@
+"""
+@file test_loadtest.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the synthetic dataset generator and the load test harness
+"""
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from models import Attendance, Connection, Event, Message, User
+
+
+@pytest.fixture
+def seeded(app):
+    """A small seeded dataset: (row counts, hot event count)"""
+    import seed
+    counts = seed.seed(users=30, events=20, attendances_per_user=3, connections_per_user=4,
+                       messages=50, hot_events=3, rng_seed=7)
+    return counts, 3
+
+
+def test_seed_inserts_the_requested_dataset(seeded):
+    counts, _ = seeded
+
+    assert counts == {
+        "users": User.query.count(),
+        "events": Event.query.count(),
+        "attendances": Attendance.query.count(),
+        "connections": Connection.query.count(),
+        "messages": Message.query.count()
+    }
+    assert (counts["users"], counts["events"], counts["messages"]) == (30, 20, 50)
+    assert counts["connections"] == 30 * 4
+
+
+def test_seed_respects_capacity_and_leaves_hot_events_empty(seeded):
+    _, hot_events = seeded
+    now = datetime.now()
+
+    hot = Event.query.filter(Event.title.like("Hot event %")).all()
+    assert len(hot) == hot_events
+    for event in hot:
+        assert 10 <= event.capacity <= 30
+        assert now < event.date < now + timedelta(hours=24)
+        assert Attendance.query.filter_by(event_id=event.id).count() == 0
+    for event in Event.query.all():
+        assert Attendance.query.filter_by(event_id=event.id).count() <= event.capacity
+
+
+def test_seeded_users_can_log_in(client, seeded):
+    import seed
+    user = User.query.first()
+
+    response = client.post("/api/login", json={"email": user.email, "password": seed.SEED_PASSWORD})
+
+    assert response.status_code == 200
+
+
+def test_population_reads_seeded_users_circles_and_hot_events(seeded):
+    import loadtest
+
+    population, hot_event_ids = loadtest.load_population(10)
+
+    assert len(population) == 10
+    assert all(len(circle) == 4 for _, circle in population)
+    assert len(hot_event_ids) == seeded[1]
+
+
+def test_parse_mix():
+    import loadtest
+
+    assert loadtest.parse_mix("browse=6, book=2,chat=2") == (["browse", "book", "chat"], [6.0, 2.0, 2.0])
+    with pytest.raises(ValueError):
+        loadtest.parse_mix("browse=1,shop=1")
+
+
+def test_recorder_summarizes_each_endpoint(app):
+    import loadtest
+    recorder = loadtest.Recorder()
+
+    for ms in range(1, 101):
+        recorder.record("GET /api/events", ms / 1000, error=ms > 98)
+
+    stats = recorder.summary(elapsed=10)["GET /api/events"]
+    assert (stats["count"], stats["errors"], stats["rps"]) == (100, 2, 10.0)
+    assert stats["p50"] == pytest.approx(50.5)
+    assert stats["p50"] < stats["p95"] < stats["p99"] <= 100
+
+
+def test_regressions_compare_p95_and_throughput(app):
+    import loadtest
+    baseline = {"a": {"p95": 10.0, "rps": 100.0}, "b": {"p95": 10.0, "rps": 100.0}}
+    summary = {"a": {"p95": 12.5, "rps": 100.0}, "b": {"p95": 10.0, "rps": 70.0}, "new": {"p95": 1.0, "rps": 1.0}}
+
+    assert loadtest.regressions(summary, baseline, max_regression=20) == ["a p95", "b throughput"]
+    assert loadtest.regressions(summary, baseline, max_regression=50) == []
+
+
+def test_virtual_users_run_every_scenario_in_process(app, seeded):
+    import loadtest
+    from flask_jwt_extended import create_access_token
+
+    population, hot_event_ids = loadtest.load_population(1)
+    user_id, circle = population[0]
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    recorder = loadtest.Recorder()
+    transport = loadtest.LocalTransport(token)
+    user = loadtest.VirtualUser(user_id, circle, "loadtest-0", transport, recorder,
+                                hot_event_ids, random.Random(1))
+    try:
+        user.browse()
+        user.book()
+        user.chat()
+    finally:
+        transport.close()
+
+    summary = recorder.summary(elapsed=1)
+    assert {"GET /api/events", "GET /api/events/upcoming", "GET /api/circle",
+            "POST /api/events/<id>/book", "socket connect", "socket message"} <= set(summary)
+    assert sum(stats["errors"] for stats in summary.values()) == 0
+    assert Attendance.query.filter(Attendance.event_id.in_(hot_event_ids)).count() <= 1
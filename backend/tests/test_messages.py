@@ -0,0 +1,56 @@
+"""
+@file test_messages.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for message history and sending
+"""
+from database import db_session
+from models import Message
+
+
+def add_messages(sender, recipient, count):
+    messages = [Message(sender_id=sender, recipient_id=recipient, content=f"message {i}") for i in range(count)]
+    db_session.add_all(messages)
+    db_session.commit()
+    return [message.id for message in messages]
+
+
+def test_history_pages_newest_first_and_marks_received_messages_read(client, make_user, auth_headers):
+    user = make_user("user")
+    other = make_user("other")
+    received = add_messages(other, user, 3)
+    sent = add_messages(user, other, 2)
+    add_messages(other, make_user("third"), 1)
+    headers = auth_headers(user)
+
+    first = client.get(f"/api/messages/{other}?limit=3", headers=headers).get_json()
+    second = client.get(f"/api/messages/{other}?limit=3&before={first['nextCursor']}", headers=headers).get_json()
+
+    assert [m["id"] for m in first["messages"]] == (received + sent)[::-1][:3]
+    assert first["hasMore"] is True
+    assert first["markedRead"] == 3
+    assert [m["id"] for m in second["messages"]] == received[:2][::-1]
+    assert second["hasMore"] is False
+    assert second["nextCursor"] is None
+    assert second["markedRead"] == 0
+    assert all(message.read_at is not None for message in Message.query.filter(Message.id.in_(received)))
+    assert all(message.read_at is None for message in Message.query.filter(Message.id.in_(sent)))
+
+
+def test_history_leaves_messages_unread_when_asked(client, make_user, auth_headers):
+    user = make_user("user")
+    other = make_user("other")
+    add_messages(other, user, 2)
+
+    response = client.get(f"/api/messages/{other}?markRead=false", headers=auth_headers(user))
+
+    assert response.get_json()["markedRead"] == 0
+    assert Message.query.filter(Message.read_at != None).count() == 0
+
+
+def test_history_rejects_non_integer_paging(client, make_user, auth_headers):
+    user = make_user("user")
+    headers = auth_headers(user)
+
+    assert client.get(f"/api/messages/{user}?limit=ten", headers=headers).status_code == 400
+    assert client.get(f"/api/messages/{user}?before=abc", headers=headers).status_code == 400
@@ -0,0 +1,90 @@
+"""
+@file test_messaging_grants.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for materialized messaging grants
+"""
+from datetime import timedelta
+
+from database import db_session
+from messaging import top_up_messaging_grants
+from models import Attendance, MessagingGrant
+
+
+def grants_of(user_id, event_id):
+    return {
+        grant.recipient_id for grant in
+        MessagingGrant.query.filter_by(user_id=user_id, event_id=event_id)
+    }
+
+
+def attend(event_id, user_ids):
+    db_session.add_all(Attendance(user_id=user_id, event_id=event_id) for user_id in user_ids)
+    db_session.commit()
+
+
+def test_booking_draws_the_share_of_grants(client, make_user, make_event, auth_headers):
+    host = make_user("host")
+    event = make_event(host, capacity=30)
+    others = [make_user(f"attendee{i}") for i in range(20)]
+    attend(event, others)
+    user = make_user("user")
+
+    response = client.post(f"/api/events/{event}/book", headers=auth_headers(user))
+
+    assert response.status_code == 201
+    granted = grants_of(user, event)
+    assert len(granted) == 2
+    assert granted <= set(others)
+
+
+def test_grants_are_topped_up_as_attendance_grows(make_user, make_event):
+    event = make_event(make_user("host"), capacity=50)
+    user = make_user("user")
+    attend(event, [user] + [make_user(f"early{i}") for i in range(10)])
+    assert len(top_up_messaging_grants(db_session, user, event)) == 1
+    db_session.commit()
+    assert top_up_messaging_grants(db_session, user, event) == []
+
+    late = [make_user(f"late{i}") for i in range(10)]
+    attend(event, late)
+    added = top_up_messaging_grants(db_session, user, event)
+    db_session.commit()
+
+    assert len(added) == 1
+    assert len(grants_of(user, event)) == 2
+
+
+def test_denied_send_cost_does_not_grow_with_the_event(client, make_user, make_event, auth_headers, count_queries):
+    def denied_send_queries(attendee_count):
+        event = make_event(make_user(f"host{attendee_count}"), starts_in=timedelta(hours=2), capacity=500)
+        user = make_user(f"user{attendee_count}")
+        others = [make_user(f"a{attendee_count}-{i}") for i in range(attendee_count)]
+        attend(event, [user] + others)
+        top_up_messaging_grants(db_session, user, event)
+        db_session.commit()
+        recipient = next(other for other in others if other not in grants_of(user, event))
+        headers = auth_headers(user)
+
+        with count_queries() as queries:
+            response = client.post("/api/messages", headers=headers, json={
+                "recipientId": recipient, "content": "hi", "eventId": event
+            })
+        assert response.status_code == 403
+        return queries["count"]
+
+    assert denied_send_queries(5) == denied_send_queries(60)
+
+
+def test_send_message_allows_granted_recipients(client, make_user, make_event, auth_headers):
+    event = make_event(make_user("host"), starts_in=timedelta(hours=2))
+    user = make_user("user")
+    other = make_user("other")
+    attend(event, [user, other])
+
+    response = client.post("/api/messages", headers=auth_headers(user), json={
+        "recipientId": other, "content": "hi", "eventId": event
+    })
+
+    assert response.status_code == 201
+    assert grants_of(user, event) == {other}
@@ -0,0 +1,93 @@
+"""
+@file test_metrics.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for request instrumentation and the /api/metrics endpoint
+"""
+import re
+
+from sqlalchemy import text
+
+import metrics
+from database import engine
+from metrics import Histogram
+
+
+def sample(body, name, **labels):
+    """Value of one sample in the exposition text (0 if absent)"""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = rf"^{re.escape(name)}{re.escape('{' + label_text + '}') if labels else ''} (\S+)$"
+    match = re.search(pattern, body, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def scrape(client, **headers):
+    response = client.get("/api/metrics", headers=headers)
+    return response.status_code, response.get_data(as_text=True)
+
+
+def test_histograms_render_cumulative_buckets():
+    histogram = Histogram("test_latency", "Test latency", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, "/x")
+
+    lines = histogram.render()
+
+    assert lines[:2] == ["# HELP test_latency Test latency", "# TYPE test_latency histogram"]
+    assert lines[2:] == [
+        'test_latency_bucket{route="/x",le="0.1"} 1',
+        'test_latency_bucket{route="/x",le="1.0"} 2',
+        'test_latency_bucket{route="/x",le="+Inf"} 3',
+        'test_latency_sum{route="/x"} 5.55',
+        'test_latency_count{route="/x"} 3',
+    ]
+
+
+def test_requests_are_recorded_by_route_template(client, make_user, make_event, auth_headers):
+    event = make_event(make_user("host"))
+    route = "/api/events/<event_id>/book"
+    labels = dict(method="POST", route=route, status="201")
+    _, before = scrape(client)
+
+    response = client.post(f"/api/events/{event}/book", headers=auth_headers(make_user("user")))
+    _, after = scrape(client)
+
+    assert response.status_code == 201
+    count = "gathr_http_request_duration_seconds_count"
+    assert sample(after, count, **labels) == sample(before, count, **labels) + 1
+    queries = "gathr_http_request_queries_sum"
+    statements = sample(after, queries, route=route) - sample(before, queries, route=route)
+    assert statements > 0
+    total = "gathr_sql_queries_total"
+    assert sample(after, total) - sample(before, total) >= statements
+
+
+def test_statements_outside_requests_reach_the_totals(client):
+    _, before = scrape(client)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    _, after = scrape(client)
+
+    # The scrape itself runs no SQL
+    assert sample(after, "gathr_sql_queries_total") == sample(before, "gathr_sql_queries_total") + 1
+
+
+def test_metrics_token_is_required_when_configured(client, monkeypatch):
+    import app as gathr
+    monkeypatch.setattr(gathr, "METRICS_TOKEN", "scrape-secret")
+
+    assert scrape(client)[0] == 401
+    status, body = scrape(client, Authorization="Bearer scrape-secret")
+    assert status == 200
+    assert "# TYPE gathr_http_request_duration_seconds histogram" in body
+
+
+def test_timed_functions_are_recorded():
+    histogram = Histogram("test_calls", "Test calls", ("function",))
+
+    @metrics.timed(histogram, "double")
+    def double(value):
+        return value * 2
+
+    assert double(2) == 4
+    assert histogram.render()[-1] == 'test_calls_count{function="double"} 1'
@@ -0,0 +1,89 @@
+"""
+@file test_migrations.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the schema migrations
+"""
+import os
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from database import Base, BASELINE_REVISION, migrate_db
+from models import User, Event
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), '..', 'migrations')
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    engines = []
+
+    def make_engine(name):
+        engine = create_engine(f"sqlite:///{tmp_path / name}")
+        engines.append(engine)
+        return engine
+
+    yield make_engine
+    for engine in engines:
+        engine.dispose()
+
+
+def schema_differences(engine):
+    """Differences between a database and the models, as comparable strings"""
+    with engine.connect() as connection:
+        return sorted(repr(diff) for diff in compare_metadata(MigrationContext.configure(connection), Base.metadata))
+
+
+def create_legacy_database(engine):
+    """A database as init_db() created it before migrations existed"""
+    with engine.begin() as connection:
+        config = Config()
+        config.set_main_option('script_location', MIGRATIONS)
+        config.attributes['connection'] = connection
+        command.upgrade(config, BASELINE_REVISION)
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(text(
+            "INSERT INTO users (name, email, password_hash, personality_tags) VALUES ('Ann', 'ann@gathr.test', 'x', '[]')"
+        ))
+        connection.execute(text(
+            "INSERT INTO events (title, description, date, time, location, capacity, categories, creator_id) "
+            "VALUES ('Meetup', 'Soon', '2030-01-01 18:00:00', '2030-01-01 18:00:00', 'Cafe', 5, '[]', 1)"
+        ))
+        connection.execute(text("INSERT INTO attendances (user_id, event_id) VALUES (1, 1), (1, 1)"))
+
+
+def test_legacy_database_is_upgraded_to_the_models(make_engine):
+    fresh = make_engine("fresh.db")
+    with fresh.begin() as connection:
+        migrate_db(connection)
+    legacy = make_engine("legacy.db")
+    create_legacy_database(legacy)
+
+    with legacy.begin() as connection:
+        migrate_db(connection)
+
+    assert schema_differences(legacy) == schema_differences(fresh)
+    with Session(legacy) as session:
+        assert session.query(User.tier, User.created_at).one() == ("free", None)
+        assert session.query(Event.waitlist_seq, Event.latitude).one() == (0, None)
+        assert session.execute(text("SELECT COUNT(*) FROM attendances")).scalar() == 1
+
+
+def test_migrating_twice_changes_nothing(make_engine):
+    engine = make_engine("gathr.db")
+    with engine.begin() as connection:
+        migrate_db(connection)
+    before = schema_differences(engine)
+
+    with engine.begin() as connection:
+        migrate_db(connection)
+
+    assert schema_differences(engine) == before
+    with engine.connect() as connection:
+        assert MigrationContext.configure(connection).get_current_revision() is not None
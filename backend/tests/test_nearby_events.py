@@ -0,0 +1,63 @@
+"""
+@file test_nearby_events.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for geohashing and the nearby events filter
+"""
+import pytest
+
+from geo import encode_geohash, haversine_km, parse_near
+
+# Around central Paris
+CENTER = (48.8566, 2.3522)
+
+
+def test_geohash_and_haversine_reference_values():
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    assert haversine_km(51.5007, -0.1246, 40.6892, -74.0445) == pytest.approx(5574.8, abs=0.5)
+
+
+@pytest.mark.parametrize("near, radius", [
+    ("48.85", 10), ("abc,2.35", 10), ("95,2.35", 10), ("48.85,2.35", 0), ("48.85,2.35", "far")
+])
+def test_parse_near_rejects_malformed_input(near, radius):
+    with pytest.raises(ValueError):
+        parse_near(near, radius)
+
+
+def add_event(make_event, host, title, latitude, longitude):
+    return make_event(host, title=title, latitude=latitude, longitude=longitude,
+                      geohash=encode_geohash(latitude, longitude))
+
+
+def test_nearby_events_are_filtered_by_radius_and_sorted_by_distance(client, make_user, make_event, auth_headers):
+    host = make_user("host")
+    louvre = add_event(make_event, host, "Louvre", 48.8606, 2.3376)
+    notre_dame = add_event(make_event, host, "Notre-Dame", 48.8530, 2.3499)
+    add_event(make_event, host, "Versailles", 48.8049, 2.1204)
+    add_event(make_event, host, "Lyon", 45.7640, 4.8357)
+    make_event(host, title="Online")
+
+    response = client.get(f"/api/events?near={CENTER[0]},{CENTER[1]}&radius=5", headers=auth_headers(host))
+
+    assert response.status_code == 200
+    events = response.get_json()["events"]
+    assert [event["id"] for event in events] == [notre_dame, louvre]
+    assert events[0]["distanceKm"] == pytest.approx(haversine_km(*CENTER, 48.8530, 2.3499), abs=0.001)
+    assert response.get_json()["pagination"]["total"] == 2
+
+
+def test_nearby_search_rejects_a_malformed_center(client, make_user, auth_headers):
+    response = client.get("/api/events?near=paris", headers=auth_headers(make_user("user")))
+
+    assert response.status_code == 400
+
+
+def test_create_event_rejects_out_of_range_coordinates(client, make_user, auth_headers):
+    response = client.post("/api/events", headers=auth_headers(make_user("host")), json={
+        "title": "Nowhere", "description": "Off the map", "date": "2030-01-01T18:00:00",
+        "time": "2030-01-01T18:00:00", "location": "?", "capacity": 5, "categories": [],
+        "latitude": 91, "longitude": 0
+    })
+
+    assert response.status_code == 400
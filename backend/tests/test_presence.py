@@ -0,0 +1,121 @@
+"""
+@file test_presence.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for presence tracking, debounced announcements and presence queries
+"""
+import pytest
+
+import presence as presence_module
+from database import db_session
+from models import Connection
+from presence import PresenceTracker, PresenceBroadcaster
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(presence_module.time, "time", lambda: now[0])
+    return now
+
+
+def follow(follower, user):
+    db_session.add(Connection(user_id=follower, connected_user_id=user))
+    db_session.commit()
+
+
+def test_users_stay_online_while_any_session_is_open(clock):
+    tracker = PresenceTracker()
+
+    assert tracker.connect(1)
+    assert not tracker.connect(1)
+    assert not tracker.disconnect(1)
+    assert tracker.online_user_ids() == {1}
+    assert tracker.disconnect(1)
+    assert not tracker.disconnect(1)
+
+    status = tracker.statuses([1, 2])
+    assert status[1]["online"] is False and status[1]["lastSeen"] is not None
+    assert status[2] == {"online": False, "lastSeen": None}
+
+
+def test_users_without_heartbeats_expire(clock):
+    tracker = PresenceTracker(ttl=90)
+    tracker.connect(1)
+    tracker.connect(2)
+
+    clock[0] += 60
+    tracker.touch([1])
+    clock[0] += 60
+
+    assert tracker.online_user_ids() == {1}
+    assert tracker.expire() == [2]
+    assert tracker.statuses([2])[2] == {"online": False, "lastSeen": None}
+
+
+def test_changes_are_announced_to_online_followers(app, make_user, auth_headers):
+    import app as gathr
+
+    user, follower, offline_follower = make_user("user"), make_user("follower"), make_user("offline")
+    follow(follower, user)
+    follow(offline_follower, user)
+    tracker = PresenceTracker()
+    broadcaster = PresenceBroadcaster(tracker)
+    tracker.connect(follower)
+    token = auth_headers(follower)["Authorization"].split()[1]
+    socket = gathr.socketio.test_client(app, auth={"token": token})
+    socket.get_received()
+
+    try:
+        tracker.connect(user)
+        broadcaster.changed(user)
+        assert broadcaster.flush(gathr.socketio) == 1
+
+        updates = [packet["args"][0] for packet in socket.get_received() if packet["name"] == "presence_update"]
+        assert [[status["userId"] for status in update["statuses"]] for update in updates] == [[user]]
+        assert updates[0]["statuses"][0]["online"] is True
+    finally:
+        socket.disconnect()
+
+
+def test_flapping_within_the_debounce_is_not_announced(app):
+    import app as gathr
+
+    tracker = PresenceTracker()
+    broadcaster = PresenceBroadcaster(tracker)
+    tracker.connect(1)
+    broadcaster.changed(1)
+    broadcaster.flush(gathr.socketio)
+
+    tracker.disconnect(1)
+    broadcaster.changed(1)
+    tracker.connect(1)
+    broadcaster.changed(1)
+
+    assert broadcaster.flush(gathr.socketio) == 0
+
+
+def test_presence_query_covers_only_the_callers_circle(client, make_user, auth_headers, monkeypatch):
+    import app as gathr
+
+    viewer, friend, stranger = make_user("viewer"), make_user("friend"), make_user("stranger")
+    follow(viewer, friend)
+    tracker = PresenceTracker()
+    monkeypatch.setattr(gathr, "presence", tracker)
+    for user_id in (friend, stranger):
+        tracker.connect(user_id)
+
+    response = client.post("/api/presence", headers=auth_headers(viewer),
+                           json={"userIds": [stranger, friend, viewer]})
+
+    assert response.status_code == 200
+    assert [(status["userId"], status["online"]) for status in response.get_json()["statuses"]] == [
+        (friend, True), (viewer, False)
+    ]
+
+
+@pytest.mark.parametrize("body", [{"userIds": "1,2"}, {"userIds": ["x"]}, {"userIds": list(range(5001))}])
+def test_presence_query_rejects_bad_input(client, make_user, auth_headers, body):
+    response = client.post("/api/presence", headers=auth_headers(make_user("viewer")), json=body)
+
+    assert response.status_code == 400
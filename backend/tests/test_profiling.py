@@ -0,0 +1,111 @@
+"""
+@file test_profiling.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for on-demand and sampled request profiling
+"""
+import os
+import pstats
+import time
+
+import pytest
+from flask import Flask
+
+import profiling
+from profiling import RequestProfiler, SamplingSession
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_SECRET", "profile-secret")
+
+
+@pytest.fixture
+def profile_dir(app, tmp_path, monkeypatch):
+    """Sends the app's profiles to a temporary directory"""
+    import app as gathr
+    monkeypatch.setattr(gathr.request_profiler, "directory", str(tmp_path))
+    return tmp_path
+
+
+def test_profile_tokens_are_signed_and_expire(secret, monkeypatch):
+    token = profiling.make_profile_token(ttl=60)
+    expires, _, signature = token.partition(".")
+
+    assert profiling.verify_profile_token(token)
+    assert not profiling.verify_profile_token(f"{int(expires) + 1}.{signature}")
+    assert not profiling.verify_profile_token(profiling.make_profile_token(ttl=-1))
+    assert not profiling.verify_profile_token("garbage")
+
+    monkeypatch.setattr(profiling, "PROFILE_SECRET", None)
+    assert not profiling.verify_profile_token(token)
+
+
+def test_signed_header_profiles_the_request(client, secret, profile_dir):
+    response = client.get("/api/healthcheck", headers={"X-Profile": profiling.make_profile_token()})
+
+    artifact = response.headers["X-Profile-Artifact"]
+    assert artifact.startswith("healthcheck-") and artifact.endswith(".pstats")
+    assert pstats.Stats(str(profile_dir / artifact)).total_calls > 0
+
+
+def test_invalid_header_is_ignored(client, secret, profile_dir):
+    response = client.get("/api/healthcheck", headers={"X-Profile": "1.forged"})
+
+    assert "X-Profile-Artifact" not in response.headers
+    assert os.listdir(profile_dir) == []
+
+
+def test_users_may_not_profile_by_query(client, make_user, auth_headers, profile_dir):
+    response = client.get("/api/healthcheck?profile=sample", headers=auth_headers(make_user("user")))
+
+    assert "X-Profile-Artifact" not in response.headers
+    assert os.listdir(profile_dir) == []
+
+
+def test_admins_may_profile_by_query(client, admin_headers, profile_dir):
+    response = client.get("/api/healthcheck?profile=sample", headers=admin_headers)
+
+    artifact = response.headers["X-Profile-Artifact"]
+    assert artifact.endswith(".collapsed")
+    assert (profile_dir / artifact).exists()
+
+
+def test_sampling_session_records_the_request_stack(tmp_path):
+    session = SamplingSession(interval=0.001)
+
+    def busy_request():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+
+    session.start()
+    busy_request()
+    session.stop()
+    path = tmp_path / "profile.collapsed"
+    session.dump(str(path))
+
+    lines = path.read_text().splitlines()
+    assert any("test_profiling.py:busy_request" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_sampling_keeps_the_slowest_profiles_per_endpoint(tmp_path):
+    app = Flask("sampled")
+    profiler = profiling.init_app(app, lambda: False, RequestProfiler(
+        directory=str(tmp_path), sample_rate=1, samples_per_minute=60, keep_slowest=2
+    ))
+
+    @app.route("/work/<int:ms>")
+    def work(ms):
+        time.sleep(ms / 1000)
+        return "done"
+
+    client = app.test_client()
+    for ms in (30, 1, 20, 2):
+        assert client.get(f"/work/{ms}").status_code == 200
+
+    kept = sorted(int(name.rsplit("-", 1)[1].split("ms")[0]) for name in os.listdir(tmp_path))
+    assert len(kept) == 2
+    assert kept[0] >= 20
+    assert len(profiler._slowest["work"]) == 2
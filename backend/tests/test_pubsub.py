@@ -0,0 +1,40 @@
+"""
+@file test_pubsub.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the pluggable Socket.IO message queue
+
+Flask-SocketIO's test client refuses message queues, so these drive two
+python-socketio servers directly and capture the packets the receiving
+server would write to its clients.
+"""
+import queue
+
+import socketio
+
+from pubsub import make_client_manager
+
+
+def make_server(url):
+    """A Socket.IO server on the given message queue, with its listener started"""
+    server = socketio.Server(client_manager=make_client_manager(url))
+    server.manager.initialize()
+    return server
+
+
+def test_local_queue_delivers_emits_from_another_server():
+    receiving = make_server('local://test-fanout')
+    sending = make_server('local://test-fanout')
+
+    # A client connected to the receiving server only
+    delivered = queue.Queue()
+    receiving._send_eio_packet = lambda eio_sid, eio_packet: delivered.put((eio_sid, eio_packet))
+    receiving.manager.connect('eio-client', '/')
+
+    sending.emit('announcement', {"text": "hello", "count": 2})
+
+    eio_sid, eio_packet = delivered.get(timeout=2)
+    assert eio_sid == 'eio-client'
+    assert socketio.packet.Packet(encoded_packet=eio_packet.data).data == [
+        'announcement', {"text": "hello", "count": 2}
+    ]
@@ -0,0 +1,114 @@
+"""
+@file test_realtime_messages.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for real-time chat relaying and write-behind persistence
+"""
+import pytest
+
+from models import Message
+
+
+@pytest.fixture
+def connect(app, auth_headers, monkeypatch):
+    """Connects a Socket.IO test client, authenticated when given a user ID"""
+    import app as gathr
+
+    # Flush the write-behind buffer explicitly instead of in the background
+    monkeypatch.setattr(gathr.message_writer, "start", lambda socketio: None)
+    sockets = []
+
+    def connect(user_id=None, room=None):
+        auth = None
+        if user_id is not None:
+            auth = {"token": auth_headers(user_id)["Authorization"].split()[1]}
+        socket = gathr.socketio.test_client(app, auth=auth)
+        if room:
+            socket.emit("join", {"room": room})
+        socket.get_received()
+        sockets.append(socket)
+        return socket
+
+    yield connect
+    for socket in sockets:
+        if socket.is_connected():
+            socket.disconnect()
+
+
+def received(socket, name):
+    # The test client records the reserved message event unwrapped
+    return [
+        packet["args"] if name == "message" else packet["args"][0]
+        for packet in socket.get_received() if packet["name"] == name
+    ]
+
+
+def flush():
+    import app as gathr
+    gathr.message_writer.flush()
+
+
+def test_room_messages_reach_the_room(connect):
+    sender, listener = connect(room="lobby"), connect(room="lobby")
+
+    sender.emit("message", {"room": "lobby", "content": "hi"})
+
+    assert [message["content"] for message in received(listener, "message")] == ["hi"]
+
+
+def test_senders_must_join_the_room(connect):
+    listener = connect(room="lobby")
+    outsider = connect()
+
+    outsider.emit("message", {"room": "lobby", "content": "hi", "clientId": "c1"})
+
+    assert received(outsider, "message_rejected") == [{"clientId": "c1", "error": "Join the room first"}]
+    assert received(listener, "message") == []
+
+
+def test_personal_rooms_are_closed_to_other_users(connect, make_user):
+    owner, intruder = make_user("owner"), make_user("intruder")
+    owner_socket = connect(owner)
+    intruder_socket = connect(intruder, room=str(owner))
+
+    intruder_socket.emit("message", {"room": str(owner), "content": "boo", "clientId": "c1"})
+
+    assert received(intruder_socket, "message_rejected")[0]["error"] == "Join the room first"
+    assert received(owner_socket, "message") == []
+
+
+def test_direct_messages_are_relayed_once_stored(connect, make_user):
+    sender, recipient = make_user("sender"), make_user("recipient")
+    sender_socket, recipient_socket = connect(sender, room="chat"), connect(recipient, room="chat")
+
+    sender_socket.emit("message", {"room": "chat", "recipientId": recipient, "content": "hello", "clientId": "c1"})
+    assert received(recipient_socket, "message") == []
+    flush()
+
+    stored = received(sender_socket, "message_stored")
+    relayed = received(recipient_socket, "message")
+    assert [ack["clientId"] for ack in stored] == ["c1"]
+    assert [(message["id"], message["senderId"], message["content"]) for message in relayed] == [
+        (stored[0]["id"], sender, "hello")
+    ]
+    assert Message.query.count() == 1
+
+
+def test_rejected_direct_messages_are_not_relayed(connect, make_user):
+    sender = make_user("sender")
+    sender_socket, listener = connect(sender, room="chat"), connect(room="chat")
+
+    sender_socket.emit("message", {"room": "chat", "recipientId": 999, "content": "hello", "clientId": "c1"})
+    flush()
+
+    assert received(sender_socket, "message_rejected") == [{"clientId": "c1", "error": "Recipient not found"}]
+    assert received(listener, "message") == []
+    assert Message.query.count() == 0
+
+
+def test_direct_messages_need_an_authenticated_sender(connect, make_user):
+    socket = connect(room="chat")
+
+    socket.emit("message", {"room": "chat", "recipientId": make_user("recipient"), "content": "hi", "clientId": "c1"})
+
+    assert received(socket, "message_rejected")[0]["error"] == "Authentication required"
@@ -0,0 +1,66 @@
+"""
+@file test_rooms.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the Socket.IO room registry
+"""
+from rooms import RoomRegistry
+
+
+def test_join_and_leave_report_changes():
+    rooms = RoomRegistry()
+
+    assert rooms.join("sid1", "event-1")
+    assert not rooms.join("sid1", "event-1")
+    assert rooms.join("sid2", "event-1")
+    assert rooms.room_size("event-1") == 2
+    assert rooms.members("event-1") == {"sid1", "sid2"}
+
+    assert rooms.leave("sid1", "event-1")
+    assert not rooms.leave("sid1", "event-1")
+    assert not rooms.leave("sid1", "unknown")
+    assert rooms.members("event-1") == {"sid2"}
+
+
+def test_empty_rooms_are_dropped():
+    rooms = RoomRegistry()
+    rooms.join("sid1", "event-1")
+
+    rooms.leave("sid1", "event-1")
+
+    assert "event-1" not in rooms
+    assert len(rooms) == 0
+    assert rooms.room_size("event-1") == 0
+    assert rooms.rooms_of("sid1") == frozenset()
+
+
+def test_removing_a_session_leaves_only_its_rooms():
+    rooms = RoomRegistry()
+    for room in ("7", "event-1", "event-2"):
+        rooms.join("sid1", room)
+    rooms.join("sid2", "event-1")
+
+    left = rooms.remove_sid("sid1")
+
+    assert sorted(left) == ["7", "event-1", "event-2"]
+    assert set(rooms.members("event-1")) == {"sid2"}
+    assert "7" not in rooms and "event-2" not in rooms
+    assert rooms.remove_sid("sid1") == []
+
+
+def test_socket_sessions_are_tracked_through_join_and_disconnect(app, make_user, auth_headers):
+    import app as gathr
+
+    user = make_user("user")
+    token = auth_headers(user)["Authorization"].split()[1]
+    socket = gathr.socketio.test_client(app, auth={"token": token})
+    sid = gathr.socketio.server.manager.sid_from_eio_sid(socket.eio_sid, "/")
+
+    socket.emit("join", {"room": "event-1"})
+    assert gathr.active_rooms.rooms_of(sid) == {str(user), "event-1"}
+    socket.emit("leave", {"room": "event-1"})
+    assert "event-1" not in gathr.active_rooms
+
+    socket.disconnect()
+    assert gathr.active_rooms.rooms_of(sid) == frozenset()
+    assert str(user) not in gathr.active_rooms
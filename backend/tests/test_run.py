@@ -0,0 +1,62 @@
+"""
+@file test_run.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the server entry points
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def run_backend(*args, **env):
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND, capture_output=True, text=True, timeout=120,
+        env={**os.environ, **env}
+    )
+
+
+def test_app_refuses_production_mode_outside_run_py():
+    result = run_backend("app.py", GATHR_ENV="production")
+
+    assert result.returncode != 0
+    assert "python run.py --production" in result.stderr
+
+
+def test_run_py_defaults_to_the_development_server(monkeypatch):
+    monkeypatch.delenv("GATHR_ENV", raising=False)
+    monkeypatch.setattr(sys, "argv", ["run.py"])
+    sys.modules.pop("run", None)
+    import run
+
+    assert run.PRODUCTION is False
+
+
+def test_missing_jwt_secret_is_generated(monkeypatch):
+    import run
+
+    monkeypatch.delenv("JWT_SECRET_KEY", raising=False)
+    run.ensure_secret_key()
+    generated = os.environ["JWT_SECRET_KEY"]
+    run.ensure_secret_key()
+
+    assert len(generated) == 64
+    assert os.environ["JWT_SECRET_KEY"] == generated
+
+
+def test_production_mode_makes_database_io_green():
+    pytest.importorskip("eventlet")
+    pytest.importorskip("psycogreen")
+
+    result = run_backend(
+        "-c",
+        "import run, psycopg2.extensions as ext; from eventlet import patcher; "
+        "print(patcher.is_monkey_patched('socket'), ext.get_wait_callback() is not None)",
+        GATHR_ENV="production"
+    )
+
+    assert result.stdout.split() == ["True", "True"]
@@ -0,0 +1,40 @@
+"""
+@file test_upcoming_events.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for the upcoming events dashboard
+"""
+from datetime import timedelta
+
+from database import db_session
+from models import Attendance, Feedback
+
+
+def test_upcoming_events_groups_events_by_role(client, make_user, make_event, auth_headers, count_queries):
+    user = make_user("user")
+    host = make_user("host")
+    attending = make_event(host, title="Attending")
+    created = make_event(user, title="Created")
+    needs_feedback = make_event(host, starts_in=timedelta(days=-3), title="Needs feedback")
+    reviewed = make_event(host, starts_in=timedelta(days=-5), title="Reviewed")
+    make_event(host, title="Not related")
+    db_session.add_all([
+        Attendance(user_id=user, event_id=attending),
+        Attendance(user_id=make_user("other"), event_id=attending),
+        Attendance(user_id=user, event_id=needs_feedback),
+        Attendance(user_id=user, event_id=reviewed),
+        Feedback(event_id=reviewed, user_id=user, rating=4),
+    ])
+    db_session.commit()
+
+    headers = auth_headers(user)
+    with count_queries() as queries:
+        response = client.get("/api/events/upcoming", headers=headers)
+
+    assert response.status_code == 200
+    assert queries["count"] == 1
+    body = response.get_json()
+    assert [(e["id"], e["attendees"], e["isCreator"]) for e in body["attendingEvents"]] == [(attending, 2, False)]
+    assert [(e["id"], e["isCreator"], e["creator"]["id"]) for e in body["createdEvents"]] == [(created, True, user)]
+    assert [e["id"] for e in body["feedbackEvents"]] == [needs_feedback]
+    assert body["attendingEvents"][0]["creator"]["name"] == "host"
@@ -0,0 +1,107 @@
+"""
+@file test_waitlist.py
+@author Huy Le (huyisme-005)
+@organization Gathr
+Tests for event waitlists and promotion on cancellation
+"""
+from booking import join_waitlist, WAITLISTED
+from database import db_session
+from models import Attendance, WaitlistEntry
+
+
+def full_event(make_user, make_event, capacity=1, prefix=""):
+    """Creates an event whose seats are all booked; returns (event, attendees)"""
+    event = make_event(make_user(f"{prefix}host"), capacity=capacity)
+    attendees = [make_user(f"{prefix}attendee{i}") for i in range(capacity)]
+    db_session.add_all(Attendance(event_id=event, user_id=user_id) for user_id in attendees)
+    db_session.commit()
+    return event, attendees
+
+
+def booked_users(event_id):
+    return {user_id for (user_id,) in db_session.query(Attendance.user_id).filter_by(event_id=event_id)}
+
+
+def test_only_full_events_have_a_waitlist(client, make_user, make_event, auth_headers):
+    event = make_event(make_user("host"))
+
+    response = client.post(f"/api/events/{event}/waitlist", headers=auth_headers(make_user("user")))
+
+    assert response.status_code == 409
+    assert WaitlistEntry.query.count() == 0
+
+
+def test_places_follow_join_order(client, make_user, make_event, auth_headers):
+    event, _ = full_event(make_user, make_event)
+    first, second = make_user("first"), make_user("second")
+
+    responses = [client.post(f"/api/events/{event}/waitlist", headers=auth_headers(user))
+                 for user in (first, second, first)]
+
+    assert [response.status_code for response in responses] == [201, 201, 200]
+    assert [response.get_json()["waitlistPosition"] for response in responses] == [1, 2, 1]
+
+
+def test_booking_a_full_event_can_join_the_waitlist(client, make_user, make_event, auth_headers):
+    event, _ = full_event(make_user, make_event)
+    headers = auth_headers(make_user("user"))
+
+    assert client.post(f"/api/events/{event}/book", headers=headers).status_code == 400
+    response = client.post(f"/api/events/{event}/book", headers=headers, json={"joinWaitlist": True})
+
+    assert response.status_code == 202
+    assert response.get_json()["waitlistPosition"] == 1
+
+
+def test_cancelling_promotes_the_head_of_the_queue(client, make_user, make_event, auth_headers):
+    event, (attendee,) = full_event(make_user, make_event)
+    first, second = make_user("first"), make_user("second")
+    for user in (first, second):
+        client.post(f"/api/events/{event}/waitlist", headers=auth_headers(user))
+
+    response = client.post(f"/api/events/{event}/cancel", headers=auth_headers(attendee))
+
+    assert response.status_code == 200
+    assert booked_users(event) == {first}
+    rejoin = client.post(f"/api/events/{event}/waitlist", headers=auth_headers(second))
+    assert rejoin.get_json()["waitlistPosition"] == 1
+
+
+def test_promotion_skips_heads_that_already_booked(client, make_user, make_event, auth_headers):
+    event, (leaving, cancelling) = full_event(make_user, make_event, capacity=2)
+    first, second = make_user("first"), make_user("second")
+    for user in (first, second):
+        client.post(f"/api/events/{event}/waitlist", headers=auth_headers(user))
+    # The head took a freed seat directly and is still queued
+    db_session.query(Attendance).filter_by(event_id=event, user_id=leaving).delete()
+    db_session.add(Attendance(event_id=event, user_id=first))
+    db_session.commit()
+
+    client.post(f"/api/events/{event}/cancel", headers=auth_headers(cancelling))
+
+    assert booked_users(event) == {first, second}
+    assert WaitlistEntry.query.count() == 0
+
+
+def test_leaving_the_waitlist(client, make_user, make_event, auth_headers):
+    event, _ = full_event(make_user, make_event)
+    headers = auth_headers(make_user("user"))
+    client.post(f"/api/events/{event}/waitlist", headers=headers)
+
+    assert client.delete(f"/api/events/{event}/waitlist", headers=headers).status_code == 200
+    assert client.delete(f"/api/events/{event}/waitlist", headers=headers).status_code == 404
+
+
+def test_joining_cost_does_not_grow_with_the_queue(make_user, make_event, count_queries):
+    def join_queries(queue_length):
+        event, _ = full_event(make_user, make_event, prefix=f"queue{queue_length}-")
+        waiting = [make_user(f"waiting{queue_length}-{i}") for i in range(queue_length)]
+        for user_id in waiting:
+            join_waitlist(db_session, event, user_id)
+        user = make_user(f"last{queue_length}")
+        with count_queries() as queries:
+            status, place = join_waitlist(db_session, event, user)
+        assert (status, place) == (WAITLISTED, queue_length + 1)
+        return queries["count"]
+
+    assert join_queries(2) == join_queries(40)
@@ -29,6 +29,18 @@ apiClient.interceptors.request.use((config) => {
   return config;
 });
 
+/**
+ * Server-side event filters accepted by GET /events
+ */
+export interface EventFilters {
+  categories?: string[];            // Categories to filter by
+  categoryMatch?: 'any' | 'all';    // Match any (default) or all categories
+  dateFrom?: string;                // ISO date/datetime lower bound
+  dateTo?: string;                  // ISO date/datetime upper bound
+  hasSpots?: boolean;               // Only events with free spots
+  creatorId?: number;               // Only events created by this user
+}
+
 /**
  * Authentication API
  */
@@ -112,11 +124,22 @@ export const eventsApi = {
    * @param page - Page number for pagination
    * @param limit - Number of events per page
    * @param category - Optional category to filter by
+   * @param filters - Optional server-side filters (categories, date window, free spots, creator)
    * @returns List of events with match scores and pagination metadata
    */
-  getEvents: async (page = 1, limit = 10, category?: string) => {
+  getEvents: async (page = 1, limit = 10, category?: string, filters: EventFilters = {}) => {
     try {
-      const params = { page, limit, ...(category && { category }) };
+      const params = {
+        page,
+        limit,
+        ...(category && { category }),
+        ...(filters.categories?.length && { categories: filters.categories.join(',') }),
+        ...(filters.categoryMatch && { categoryMatch: filters.categoryMatch }),
+        ...(filters.dateFrom && { dateFrom: filters.dateFrom }),
+        ...(filters.dateTo && { dateTo: filters.dateTo }),
+        ...(filters.hasSpots && { hasSpots: true }),
+        ...(filters.creatorId && { creatorId: filters.creatorId }),
+      };
       const response = await apiClient.get('/events', { params });
       return response.data;
     } catch (error) {
@@ -125,6 +148,27 @@ export const eventsApi = {
     }
   },
 
+  /**
+   * Full-text search over event title, description and location
+   * 
+   * @param query - Search query (all words must match)
+   * @param page - Page number for pagination
+   * @param limit - Number of events per page
+   * @param blend - Weight (0-1) of the personality match score in the ranking
+   * @returns Events ranked by relevance and pagination metadata
+   */
+  searchEvents: async (query: string, page = 1, limit = 10, blend = 0) => {
+    try {
+      const response = await apiClient.get('/events/search', {
+        params: { q: query, page, limit, blend },
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Search events error:', error);
+      throw error;
+    }
+  },
+
   /**
    * Create a new event
    * 